@@ -3,34 +3,216 @@ Sintesa - Main Application
 Simple Research Paper Analyzer
 """
 
-import webview
+import time
+
+# Startup clock starts before any heavy import
+_STARTUP_T0 = time.perf_counter()
+
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from collections import OrderedDict
 import json
-import traceback
+import logging
+import multiprocessing
+import threading
 import config
+from modules import metrics
+
+# pywebview is imported in main(), so the API class also serves headless
+# front ends (server.py).
+#
+# Heavy modules (DataFetcher, Visualizer, Exporter, KeywordExtractor) pull in
+# pandas, plotly, networkx, wordcloud, fpdf, requests and scholarly. They are
+# imported on first use, or by the warm-up thread once the window is shown.
 
-# Import modules
-from modules.data_fetcher import DataFetcher
-from modules.visualizer import Visualizer
-from modules.exporter import Exporter
-from modules.keyword_extractor import KeywordExtractor
+logger = logging.getLogger('app')
 
 # Application version
 APP_VERSION = "1.0.0"
 
+# Components warmed in the background, in order of first use in the UI
+WARM_UP_ORDER = ['data_fetcher', 'keyword_extractor', 'visualizer', 'exporter']
+
+# Search results kept for background exports, newest last
+MAX_STORED_RESULTS = 4
+
 
 class API:
     """API class for communication between frontend and backend"""
     
-    def __init__(self):
+    def __init__(self, components: Optional[Dict[str, Any]] = None, shared_with: Optional['API'] = None):
+        """
+        Args:
+            components: Pre-built components by name, e.g. a DataFetcher
+                with stubbed sources under 'data_fetcher'
+            shared_with: API whose components this instance shares; search
+                results stay per instance (one instance per client session)
+        """
         self.current_papers = []
+        self._results = OrderedDict()
         
-        # Initialize components
-        self.data_fetcher = DataFetcher()
-        self.visualizer = Visualizer()
-        self.exporter = Exporter(str(config.EXPORTS_DIR))
-        self.keyword_extractor = KeywordExtractor()
+        # Components are created lazily; names start with an underscore so
+        # pywebview does not walk (and thereby instantiate) them when exposing the API
+        if shared_with is not None:
+            self._components = shared_with._components
+            self._components_lock = shared_with._components_lock
+            self._startup_timings = shared_with._startup_timings
+        else:
+            self._components = {}
+            self._components_lock = threading.RLock()
+            self._startup_timings = {}
+        if components:
+            self._components.update(components)
+    
+    # ------------------------------------------------------------------
+    # Lazy components
+    # ------------------------------------------------------------------
+    
+    @property
+    def _data_fetcher(self):
+        return self._component('data_fetcher')
+    
+    @property
+    def _visualizer(self):
+        return self._component('visualizer')
+    
+    @property
+    def _exporter(self):
+        return self._component('exporter')
+    
+    @property
+    def _keyword_extractor(self):
+        return self._component('keyword_extractor')
+    
+    @property
+    def _text_processor(self):
+        return self._component('text_processor')
+    
+    @property
+    def _statistics_engine(self):
+        return self._component('statistics_engine')
+    
+    @property
+    def _export_jobs(self):
+        return self._component('export_jobs')
+    
+    def _component(self, name: str):
+        """Return a backend component, importing and creating it on first use"""
+        component = self._components.get(name)
+        if component is None:
+            with self._components_lock:
+                component = self._components.get(name)
+                if component is None:
+                    start = time.perf_counter()
+                    component = getattr(self, f'_create_{name}')()
+                    self._components[name] = component
+                    self._record_timing(f'load_{name}', time.perf_counter() - start)
+        return component
+    
+    def _create_data_fetcher(self):
+        from modules.data_fetcher import DataFetcher
+        return DataFetcher(source_config=config.SOURCE_CONFIG)
+    
+    def _create_visualizer(self):
+        from modules.visualizer import Visualizer
+        return Visualizer(
+            output_format=config.CHART_OUTPUT_FORMAT,
+            webgl_threshold=config.TIMELINE_WEBGL_THRESHOLD,
+            density_threshold=config.TIMELINE_DENSITY_THRESHOLD,
+            binning_threshold=config.CITATION_BINNING_THRESHOLD,
+            citation_bins=config.CITATION_BINS,
+            text_processor=self._text_processor
+        )
+    
+    def _create_exporter(self):
+        from modules.exporter import Exporter
+        exporter = Exporter(str(config.EXPORTS_DIR), statistics=self._statistics_engine, **self._exporter_options())
+        metrics.REGISTRY.track_cache('exports', exporter)
+        return exporter
+    
+    def _create_keyword_extractor(self):
+        from modules.keyword_extractor import KeywordExtractor
+        idf_table = None
+        if config.KEYWORD_SCORING == 'tfidf':
+            from modules.corpus_idf import CorpusIDF
+            idf_table = CorpusIDF(
+                config.KEYWORD_IDF_FILE,
+                max_terms=config.KEYWORD_IDF_MAX_TERMS,
+                max_docs=config.KEYWORD_IDF_MAX_DOCS,
+                save_interval=config.KEYWORD_IDF_SAVE_INTERVAL
+            )
+        return KeywordExtractor(
+            ngram_range=(1, config.KEYWORD_MAX_NGRAM),
+            include_abstracts=config.KEYWORD_INCLUDE_ABSTRACTS,
+            scoring=config.KEYWORD_SCORING,
+            idf_table=idf_table,
+            text_processor=self._text_processor,
+            parallel_threshold=config.KEYWORD_PARALLEL_THRESHOLD
+        )
+    
+    def _create_text_processor(self):
+        from modules.text_processing import TextProcessor
+        processor = TextProcessor(
+            max_cached_papers=config.TEXT_CACHE_MAX_PAPERS,
+            normalize=config.KEYWORD_NORMALIZE
+        )
+        metrics.REGISTRY.track_cache('paper_tokens', processor)
+        return processor
+    
+    def _create_export_jobs(self):
+        from modules.export_jobs import ExportJobManager
+        return ExportJobManager(
+            str(config.EXPORTS_DIR),
+            max_workers=config.EXPORT_WORKERS,
+            exporter_options=self._exporter_options(),
+            statistics=self._statistics_engine,
+            max_pending=config.EXPORT_MAX_PENDING
+        )
+    
+    def _exporter_options(self) -> Dict:
+        """Exporter settings shared by the API's exporter and export workers"""
+        return {
+            'cache_max_age': config.EXPORT_CACHE_MAX_AGE_HOURS * 3600,
+            'max_dir_bytes': config.EXPORTS_MAX_MB * 1024 * 1024
+        }
+    
+    def _create_statistics_engine(self):
+        from modules.statistics import StatisticsEngine
+        # Resolved per call so the keyword extractor loads only when tokens are needed
+        engine = StatisticsEngine(token_counter=lambda papers: self._keyword_extractor.count_tokens(papers))
+        metrics.REGISTRY.track_cache('statistics', engine)
+        return engine
+    
+    def _write_metrics(self, force: bool = False):
+        """Refresh the Prometheus metrics file (throttled unless forced)"""
+        interval = 0 if force else config.METRICS_WRITE_INTERVAL
+        metrics.REGISTRY.write_prometheus(config.METRICS_FILE, min_interval=interval)
+    
+    def _record_timing(self, stage: str, seconds: float):
+        """Record a startup stage duration in milliseconds"""
+        self._startup_timings[stage] = round(seconds * 1000, 1)
+    
+    def _warm_up(self):
+        """Load heavy components in the background once the UI is visible"""
+        start = time.perf_counter()
+        try:
+            config.ensure_directories()
+            for name in WARM_UP_ORDER:
+                self._component(name)
+        except Exception as e:
+            logger.exception("Warm-up error: %s", e)
+        self._record_timing('warm_up_total', time.perf_counter() - start)
+        
+        logger.info("Startup timings (ms)", extra=dict(self._startup_timings))
+    
+    def _on_window_shown(self):
+        """Window event handler: report time to window and start warm-up"""
+        self._record_timing('window_shown', time.perf_counter() - _STARTUP_T0)
+        threading.Thread(target=self._warm_up, name='warm-up', daemon=True).start()
+    
+    # ------------------------------------------------------------------
+    # Public API (exposed to JavaScript)
+    # ------------------------------------------------------------------
     
     def search_papers(self, params: Dict) -> Dict:
         """Search for academic papers"""
@@ -48,11 +230,12 @@ class API:
                     'papers': []
                 }
             
-            print(f"\n[API] Searching for: {query}")
-            print(f"[API] Source: {source}, Type: {search_type}, Max: {max_results}, Year: {from_year}")
+            logger.info("Searching for: %s", query, extra={
+                'source': source, 'search_type': search_type, 'max_results': max_results, 'from_year': from_year
+            })
             
             # Search papers
-            papers = self.data_fetcher.search(
+            papers = self._data_fetcher.search(
                 query=query,
                 source=source,
                 max_results=max_results,
@@ -61,17 +244,18 @@ class API:
             )
             
             self.current_papers = papers
+            result_id = self._store_result(papers)
+            self._write_metrics()
             
             return {
                 'success': True,
                 'papers': papers,
-                'count': len(papers)
+                'count': len(papers),
+                'result_id': result_id
             }
-            
+        
         except Exception as e:
-            print(f"[API] Error in search_papers: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in search_papers: %s", e)
             return {
                 'success': False,
                 'error': str(e),
@@ -88,53 +272,64 @@ class API:
                     'visualizations': {}
                 }
             
-            print(f"[API] Generating visualizations for {len(papers)} papers")
+            logger.info("Generating visualizations", extra={'papers': len(papers)})
             
             visualizations = {}
             
+            # Cached per result set; only papers appended since the last call are folded in
+            aggregates = self._statistics_engine.aggregates(papers, tokens=True)
+            
             # Extract keywords for network
-            print("[API] Extracting keywords...")
-            keywords = self.keyword_extractor.extract_keywords(papers, top_n=20)
-            print(f"[API] Extracted {len(keywords)} keywords: {keywords[:10]}")
+            logger.info("Extracting keywords...")
+            keywords = self._keyword_extractor.top_keywords(aggregates.token_counts, top_n=20)
+            logger.info("Extracted keywords: %s", ', '.join(keywords[:10]), extra={'keywords': len(keywords)})
             
             # Word cloud (full width first)
-            viz_wordcloud = self.visualizer.create_wordcloud(papers)
+            viz_wordcloud = self._visualizer.create_wordcloud(papers)
             visualizations['wordcloud'] = viz_wordcloud
-            print("[API] [OK] Word cloud created")
+            logger.info("Word cloud created")
             
             # Keyword network (full width second)
             if keywords and len(keywords) >= 2:
-                viz_network = self.visualizer.create_keyword_network(keywords, papers)
+                viz_network = self._visualizer.create_keyword_network(keywords, papers)
                 visualizations['network'] = viz_network
-                print("[API] [OK] Keyword network created")
+                logger.info("Keyword network created")
             else:
-                print("[API] ! Not enough keywords for network")
+                logger.info("Not enough keywords for network")
             
             # Publications per year
-            viz_years = self.visualizer.plot_publications_per_year(papers)
+            viz_years = self._visualizer.plot_publications_per_year(papers, aggregates)
             visualizations['years'] = viz_years
             
             # Citation distribution
-            viz_citations = self.visualizer.plot_citations_distribution(papers)
+            viz_citations = self._visualizer.plot_citations_distribution(papers)
             visualizations['citations'] = viz_citations
             
             # Timeline
-            viz_timeline = self.visualizer.create_timeline_chart(papers)
+            viz_timeline = self._visualizer.create_timeline_chart(papers)
             visualizations['timeline'] = viz_timeline
             
             # Source distribution
-            viz_sources = self.visualizer.plot_source_distribution(papers)
+            viz_sources = self._visualizer.plot_source_distribution(papers, aggregates)
             visualizations['sources'] = viz_sources
             
+            # Emerging keywords
+            trends = self._keyword_extractor.keyword_trends(
+                papers,
+                top_n=config.TREND_TOP_TERMS,
+                method=config.TREND_METHOD,
+                recent_years=config.TREND_RECENT_YEARS
+            )
+            visualizations['trends'] = self._visualizer.plot_keyword_trends(trends)
+            self._write_metrics()
+            
             return {
                 'success': True,
                 'visualizations': visualizations
             }
-            
+        
         except Exception as e:
-            print(f"[API] Error generating visualizations: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error generating visualizations: %s", e)
             return {
                 'success': False,
                 'error': str(e),
@@ -151,110 +346,58 @@ class API:
                     'statistics': {}
                 }
             
-            print(f"[API] Analyzing statistics for {len(papers)} papers")
-            
-            # Basic statistics
-            total_papers = len(papers)
-            
-            # Collect all authors
-            all_authors = []
-            years = []
-            sources = set()
+            logger.info("Analyzing statistics", extra={'papers': len(papers)})
             
-            for paper in papers:
-                # Extract authors
-                authors = paper.get('authors', [])
-                if isinstance(authors, list):
-                    for author in authors:
-                        author_name = ''
-                        author_affiliation = ''
-                        
-                        # Handle both string and dict formats
-                        if isinstance(author, dict):
-                            author_name = author.get('name', '').strip()
-                            author_affiliation = author.get('affiliation', '')
-                        elif isinstance(author, str):
-                            author_name = author.strip()
-                        
-                        if author_name:
-                            all_authors.append({
-                                'name': author_name,
-                                'affiliation': author_affiliation,
-                                'paper_title': paper.get('title', '')
-                            })
-                
-                # Extract year
-                year = paper.get('year')
-                if year and isinstance(year, (int, str)):
-                    try:
-                        year_int = int(str(year))
-                        if 1900 <= year_int <= 2030:
-                            years.append(year_int)
-                    except (ValueError, TypeError):
-                        pass
-                
-                # Extract source
-                source = paper.get('source', '')
-                if source:
-                    sources.add(source)
-            
-            # Count unique authors
-            unique_authors = {}
-            for author in all_authors:
-                name = author['name']
-                if name not in unique_authors:
-                    unique_authors[name] = {
-                        'name': name,
-                        'affiliation': author['affiliation'],
-                        'paper_count': 0,
-                        'papers': []
-                    }
-                unique_authors[name]['paper_count'] += 1
-                unique_authors[name]['papers'].append(author['paper_title'])
-            
-            # Get top 5 authors
-            top_authors = sorted(
-                unique_authors.values(),
-                key=lambda x: x['paper_count'],
-                reverse=True
-            )[:5]
+            aggregates = self._statistics_engine.aggregates(papers)
             
             # Year range
             year_range = "-"
+            years = aggregates.year_range(1900, 2030)
             if years:
-                min_year = min(years)
-                max_year = max(years)
+                min_year, max_year = years
                 if min_year == max_year:
                     year_range = str(min_year)
                 else:
                     year_range = f"{min_year}-{max_year}"
             
+            total_papers = aggregates.paper_count
+            total_authors = len(aggregates.author_counts)
+            
             statistics = {
                 'total_papers': total_papers,
-                'total_authors': len(unique_authors),
+                'total_authors': total_authors,
                 'year_range': year_range,
-                'data_sources': len(sources),
-                'top_authors': top_authors
+                'data_sources': len(aggregates.source_counts),
+                'top_authors': aggregates.top_authors(5)
             }
             
-            print(f"[API] [OK] Statistics calculated: {total_papers} papers, {len(unique_authors)} authors")
+            logger.info("Statistics calculated", extra={'papers': total_papers, 'authors': total_authors})
             
             return {
                 'success': True,
                 'statistics': statistics
             }
-            
+        
         except Exception as e:
-            print(f"[API] Error in get_paper_statistics: {e}")
-            traceback.print_exc()
+            logger.exception("Error in get_paper_statistics: %s", e)
             return {
                 'success': False,
                 'error': str(e),
                 'statistics': {}
             }
     
-    def export_data(self, format: str, papers: List[Dict]) -> Dict:
-        """Export data to various formats"""
+    def export_data(self, format: str, papers: List[Dict], options: Dict = None) -> Dict:
+        """
+        Export data to various formats
+        
+        Args:
+            format: 'csv', 'excel', 'json', 'jsonl', 'parquet', 'feather', 'pdf',
+                'bibtex' or 'ris'
+            papers: Papers to export
+            options: Format-specific exporter options, e.g. for csv
+                {'compress': True, 'sort': 'external'}
+        """
+        options = options or {}
         try:
             if not papers:
                 return {
@@ -262,48 +405,106 @@ class API:
                     'error': 'No papers to export'
                 }
             
-            print(f"[API] Exporting to {format}")
-            
-            filepath = None
+            logger.info("Exporting", extra={'format': format})
             
-            if format == 'csv':
-                filepath = self.exporter.export_to_csv(papers)
-            elif format == 'excel':
-                filepath = self.exporter.export_to_excel(papers)
-            elif format == 'json':
-                filepath = self.exporter.export_to_json(papers)
-            elif format == 'pdf':
-                filepath = self.exporter.export_to_pdf(papers)
-            else:
+            from modules.exporter import EXPORT_FORMATS
+            if format not in EXPORT_FORMATS:
                 return {
                     'success': False,
                     'error': f'Unsupported format: {format}'
                 }
             
+            filepath = self._exporter.export(format, papers, **options)
+            self._write_metrics()
+            
             return {
                 'success': True,
                 'filepath': filepath
             }
+        
+        except Exception as e:
+            logger.exception("Error exporting data: %s", e)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def start_export(self, result_id: str, formats: List[str], options: Dict = None,
+                     bundle: bool = False) -> Dict:
+        """
+        Start a background export of a search result in one or more formats
+        
+        Args:
+            result_id: Result id returned by search_papers
+            formats: Export formats, e.g. ['csv', 'excel', 'json', 'pdf']
+            options: Exporter options per format, e.g. {'pdf': {'max_listed': None}}
+            bundle: Also package all exported files into one zip
+        
+        Returns:
+            Job id to poll with get_export_job
+        """
+        try:
+            papers = self._results.get(result_id)
+            if not papers:
+                return {
+                    'success': False,
+                    'error': 'Unknown or expired result set, please search again'
+                }
             
+            from modules.export_jobs import ExportQueueFull
+            try:
+                job_id = self._export_jobs.start(papers, formats, options, bundle)
+            except ExportQueueFull as e:
+                return {
+                    'success': False,
+                    'error': f'Too many exports running ({e})',
+                    'busy': True
+                }
+            return {
+                'success': True,
+                'job_id': job_id
+            }
+        
         except Exception as e:
-            print(f"[API] Error exporting data: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error starting export: %s", e)
             return {
                 'success': False,
                 'error': str(e)
             }
     
+    def get_export_job(self, job_id: str) -> Dict:
+        """Progress of an export job, with file paths once formats finish"""
+        job = self._export_jobs.get(job_id)
+        if job is None:
+            return {
+                'success': False,
+                'error': f'Unknown export job: {job_id}'
+            }
+        return {
+            'success': True,
+            'job': job
+        }
+    
+    def _store_result(self, papers: List[Dict]) -> str:
+        """Remember a search result for background exports, returning its id"""
+        from modules.statistics import StatisticsEngine
+        result_id = StatisticsEngine.fingerprint(papers)
+        self._results[result_id] = papers
+        self._results.move_to_end(result_id)
+        while len(self._results) > MAX_STORED_RESULTS:
+            self._results.popitem(last=False)
+        return result_id
+    
     def open_file_manager(self, filepath: str) -> Dict:
         """Open file manager to show exported file"""
         try:
-            success = self.exporter.open_file_manager(filepath)
+            success = self._exporter.open_file_manager(filepath)
             return {
                 'success': success,
                 'message': 'File manager opened' if success else 'Failed to open file manager'
             }
         except Exception as e:
-            print(f"[API] Error opening file manager: {e}")
+            logger.error("Error opening file manager: %s", e)
             return {
                 'success': False,
                 'error': str(e)
@@ -312,13 +513,13 @@ class API:
     def open_file(self, filepath: str) -> Dict:
         """Open exported file directly with default application"""
         try:
-            success = self.exporter.open_file(filepath)
+            success = self._exporter.open_file(filepath)
             return {
                 'success': success,
                 'message': 'File opened successfully' if success else 'Failed to open file'
             }
         except Exception as e:
-            print(f"[API] Error opening file: {e}")
+            logger.error("Error opening file: %s", e)
             return {
                 'success': False,
                 'error': str(e)
@@ -333,11 +534,12 @@ class API:
                     'name': 'Sintesa',
                     'version': APP_VERSION,
                     'description': 'Academic Paper Search and Analysis Tool',
-                    'author': 'ArtonLabs'
+                    'author': 'ArtonLabs',
+                    'startup_timings': dict(self._startup_timings)
                 }
             }
         except Exception as e:
-            print(f"[API] Error getting app info: {e}")
+            logger.error("Error getting app info: %s", e)
             return {
                 'success': False,
                 'error': str(e)
@@ -346,7 +548,7 @@ class API:
     def get_source_info(self) -> Dict:
         """Get information about data sources"""
         try:
-            info = self.data_fetcher.get_source_info()
+            info = self._data_fetcher.get_source_info()
             return {
                 'success': True,
                 'sources': info
@@ -356,17 +558,49 @@ class API:
                 'success': False,
                 'error': str(e)
             }
+    
+    def get_metrics(self) -> Dict:
+        """
+        Counters, latency histograms (per source, page, chart and export)
+        and cache hit rates; also rewrites the Prometheus metrics file
+        """
+        try:
+            self._write_metrics(force=True)
+            return {
+                'success': True,
+                'metrics': metrics.REGISTRY.snapshot(),
+                'metrics_file': str(config.METRICS_FILE)
+            }
+        except Exception as e:
+            logger.exception("Error getting metrics: %s", e)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+
+if config.PROFILE_ENABLED:
+    from modules.profiling import CallProfiler
+    CallProfiler(
+        config.PROFILES_DIR,
+        sample_rate=config.PROFILE_SAMPLE_RATE,
+        memory=config.PROFILE_MEMORY
+    ).instrument(API, config.PROFILE_METHODS)
 
 
 def main():
     """Main application entry point"""
-    print("="*60)
-    print("Sintesa - Simple Research Paper Analyzer")
-    print("="*60)
-    print()
+    # Worker processes (parallel keyword counting) in frozen builds
+    multiprocessing.freeze_support()
+    
+    import webview
+    
+    metrics.configure_logging(config.LOG_LEVEL, config.LOG_FORMAT)
+    logger.info("Sintesa - Simple Research Paper Analyzer")
     
-    # Initialize API
+    # Initialize API (components load lazily)
     api = API()
+    api._record_timing('imports', time.perf_counter() - _STARTUP_T0)
     
     # Get UI directory
     ui_dir = Path(__file__).parent / "ui"
@@ -381,8 +615,10 @@ def main():
         resizable=True,
         min_size=(1000, 600)
     )
+    window.events.shown += api._on_window_shown
+    api._record_timing('window_created', time.perf_counter() - _STARTUP_T0)
     
-    print("[App] Starting Sintesa...")
+    logger.info("Starting Sintesa...")
     webview.start(debug=True)
 
 
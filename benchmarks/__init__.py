@@ -0,0 +1,7 @@
+"""
+Sintesa Benchmarks
+Offline, repeatable timings of the search, analysis and export hot paths
+
+Run from the repository root:
+    python -m benchmarks.run --sizes 100,1000,10000
+"""
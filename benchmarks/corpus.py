@@ -0,0 +1,82 @@
+"""
+Synthetic paper corpora for benchmarks
+Deterministic result sets shaped like DataFetcher output, at any size
+"""
+
+from typing import List, Dict, Any
+import random
+
+# Standard corpus sizes
+CORPUS_SIZES = (100, 1000, 10000, 100000)
+
+# Topic vocabulary; a Zipf-like draw makes some terms dominate, as in real titles
+VOCABULARY = (
+    'learning', 'neural', 'network', 'networks', 'deep', 'graph', 'model', 'models', 'data',
+    'transformer', 'attention', 'language', 'image', 'segmentation', 'medical', 'clinical',
+    'federated', 'privacy', 'robust', 'adversarial', 'optimization', 'reinforcement', 'policy',
+    'quantum', 'computing', 'climate', 'forecasting', 'energy', 'battery', 'materials',
+    'protein', 'genomic', 'sequencing', 'detection', 'classification', 'regression',
+    'bayesian', 'inference', 'uncertainty', 'causal', 'embedding', 'representation',
+    'generative', 'diffusion', 'contrastive', 'supervised', 'unsupervised', 'benchmark',
+    'efficient', 'scalable', 'distributed', 'hardware', 'accelerator', 'sparse', 'pruning',
+    'quantization', 'retrieval', 'recommendation', 'ranking', 'dialogue', 'translation',
+    'speech', 'vision', 'video', 'tracking', 'robotics', 'control', 'planning', 'navigation',
+    'autonomous', 'driving', 'sensor', 'fusion', 'spatial', 'temporal', 'dynamics', 'physics',
+    'simulation', 'modelling', 'behaviour', 'analysis', 'survey', 'evaluation', 'towards'
+)
+FILLER_WORDS = ('the', 'of', 'for', 'and', 'with', 'in', 'a', 'on', 'using', 'via', 'from')
+
+GIVEN_NAMES = ('Ana', 'Budi', 'Chen', 'David', 'Elena', 'Farah', 'Grace', 'Hiro', 'Ivan',
+               'Julia', 'Kofi', 'Lina', 'Maria', 'Nadia', 'Omar', 'Priya', 'Rahul', 'Sara',
+               'Tomas', 'Wei', 'Yuki', 'Zanele', 'José', 'Søren')
+FAMILY_NAMES = ('Santoso', 'Wang', 'Smith', 'Garcia', 'Müller', 'Kim', 'Nguyen', 'Okafor',
+                'Rossi', 'Tanaka', 'Ivanova', 'Kowalski', 'Haddad', 'Silva', 'Patel',
+                'Johansson', 'Dubois', 'Cohen', 'Hassan', 'Lee', 'Martin', 'Novak')
+
+SOURCES = ('CrossRef', 'arXiv')
+
+
+def synthetic_corpus(size: int, seed: int = 0, duplicate_rate: float = 0.05) -> List[Dict[str, Any]]:
+    """
+    Papers shaped like DataFetcher results
+    
+    Args:
+        size: Number of papers
+        seed: Random seed; the same seed and size give the same corpus
+        duplicate_rate: Fraction of papers repeating an earlier title
+            (with different case), for deduplication
+    """
+    rng = random.Random(seed)
+    weights = [1.0 / rank for rank in range(1, len(VOCABULARY) + 1)]
+    journals = [f"Journal of {rng.choice(VOCABULARY).title()} {rng.choice(VOCABULARY).title()}"
+                for _ in range(200)]
+    authors_pool = [f"{rng.choice(GIVEN_NAMES)} {rng.choice(FAMILY_NAMES)}"
+                    for _ in range(max(50, size // 3))]
+    
+    def text(words: int) -> str:
+        tokens = rng.choices(VOCABULARY, weights=weights, k=words)
+        for position in range(1, words, 3):
+            tokens[position] = rng.choice(FILLER_WORDS)
+        return ' '.join(tokens)
+    
+    papers = []
+    for index in range(size):
+        source = SOURCES[index % 4 == 3]
+        year = rng.randint(1995, 2025)
+        if papers and rng.random() < duplicate_rate:
+            title = rng.choice(papers)['title'].upper()
+        else:
+            title = f"{text(rng.randint(6, 12)).capitalize()} {index}"
+        papers.append({
+            'title': title,
+            'authors': rng.sample(authors_pool, rng.randint(1, 6)),
+            'abstract': text(rng.randint(80, 150)),
+            'doi': f"10.5555/bench.{index}" if source == 'CrossRef' else '',
+            'url': f"https://doi.org/10.5555/bench.{index}" if source == 'CrossRef'
+                   else f"https://arxiv.org/abs/{year % 100:02d}01.{index:05d}",
+            'publication_date': f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'journal': rng.choice(journals) if source == 'CrossRef' else 'arXiv preprint',
+            'citations': int(rng.paretovariate(1.2)) - 1,
+            'source': source
+        })
+    return papers
@@ -0,0 +1,389 @@
+"""
+Sintesa benchmark runner
+Times each hot path on synthetic corpora and writes the timings as JSON
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 100,1000 --stages dedup,chart --repeat 5
+    python -m benchmarks.run --baseline data/benchmarks/bench_before.json
+
+Stages (timed separately, each on a fresh app instance so caches start cold):
+    fetch_parse.<source>   Search through the stub server: HTTP, JSON/Atom parsing
+    dedup                  DataFetcher._remove_duplicates
+    extract_keywords       KeywordExtractor.extract_keywords
+    chart.<name>           Each Visualizer chart
+    statistics             API.get_paper_statistics
+    export.<format>        Each Exporter format
+
+With --baseline, stages whose median time grew by more than --threshold are
+listed and the exit status is 1, so the run can gate a change.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics as stats
+import subprocess
+import sys
+import tempfile
+import time
+
+# Run from the repository root or as python benchmarks/run.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config
+from app import API
+from benchmarks.corpus import CORPUS_SIZES, synthetic_corpus
+from benchmarks.stub_server import StubSourceServer
+from modules import metrics
+
+logger = logging.getLogger('benchmarks')
+
+# Largest corpus fetched through the stub server; CrossRef searches stop at
+# offset 10000, and larger corpora only lengthen the run
+FETCH_MAX_PAPERS = 10000
+
+# Charts in the order the app renders them
+CHARTS = ('wordcloud', 'network', 'years', 'citations', 'timeline', 'sources', 'trends')
+
+# Stage groups selectable with --stages
+STAGE_GROUPS = ('fetch_parse', 'dedup', 'extract_keywords', 'chart', 'statistics', 'export')
+
+# Median slowdowns below this many seconds are never reported as regressions (timer noise)
+REGRESSION_MIN_SECONDS = 0.01
+
+
+class BenchmarkAPI(API):
+    """API whose keyword IDF table and exports stay off the user's data directory"""
+    
+    def __init__(self, export_dir: Path):
+        super().__init__()
+        self._export_dir = export_dir
+    
+    def _create_keyword_extractor(self):
+        from modules.keyword_extractor import KeywordExtractor
+        from modules.corpus_idf import CorpusIDF
+        idf_table = None
+        if config.KEYWORD_SCORING == 'tfidf':
+            idf_table = CorpusIDF(None, max_terms=config.KEYWORD_IDF_MAX_TERMS)
+        return KeywordExtractor(
+            ngram_range=(1, config.KEYWORD_MAX_NGRAM),
+            include_abstracts=config.KEYWORD_INCLUDE_ABSTRACTS,
+            scoring=config.KEYWORD_SCORING,
+            idf_table=idf_table,
+            text_processor=self._text_processor,
+            parallel_threshold=config.KEYWORD_PARALLEL_THRESHOLD
+        )
+    
+    def _create_exporter(self):
+        from modules.exporter import Exporter
+        return Exporter(str(self._export_dir), statistics=self._statistics_engine)
+
+
+class BenchmarkRunner:
+    """Runs the selected stages over each corpus size and collects timings"""
+    
+    def __init__(self, sizes: List[int], repeat: int = 3, stages: Optional[List[str]] = None,
+                 formats: Optional[List[str]] = None, seed: int = 0):
+        """
+        Args:
+            sizes: Corpus sizes (papers)
+            repeat: Timed runs per stage; the median is compared across runs
+            stages: Stage groups to run (default: all of STAGE_GROUPS)
+            formats: Export formats to time (default: all available)
+            seed: Corpus random seed
+        """
+        from modules.exporter import EXPORT_FORMATS, PYARROW_AVAILABLE
+        
+        self.sizes = sizes
+        self.repeat = repeat
+        self.stages = stages or list(STAGE_GROUPS)
+        self.formats = formats or [
+            format for format in EXPORT_FORMATS
+            if PYARROW_AVAILABLE or format not in ('parquet', 'feather')
+        ]
+        self.seed = seed
+        self.results: List[Dict[str, Any]] = []
+    
+    def run(self) -> Dict[str, Any]:
+        """Run every stage on every size; returns the report"""
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix='sintesa_bench_') as tmp_dir:
+            for size in self.sizes:
+                papers = synthetic_corpus(size, seed=self.seed)
+                logger.info("Corpus of %d papers", size)
+                if 'fetch_parse' in self.stages and size <= FETCH_MAX_PAPERS:
+                    self._bench_fetch(papers)
+                if 'dedup' in self.stages:
+                    self._bench_dedup(papers)
+                if 'extract_keywords' in self.stages:
+                    self._bench_keywords(papers, Path(tmp_dir))
+                if 'chart' in self.stages:
+                    self._bench_charts(papers, Path(tmp_dir))
+                if 'statistics' in self.stages:
+                    self._bench_statistics(papers, Path(tmp_dir))
+                if 'export' in self.stages:
+                    self._bench_exports(papers, Path(tmp_dir))
+        
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'environment': _environment(),
+            'seed': self.seed,
+            'sizes': self.sizes,
+            'repeat': self.repeat,
+            'total_seconds': round(time.perf_counter() - started, 3),
+            'results': self.results
+        }
+    
+    def _record(self, stage: str, size: int, timings: List[float], **extra):
+        median = stats.median(timings)
+        result = {
+            'stage': stage,
+            'size': size,
+            'runs': [round(seconds, 6) for seconds in timings],
+            'min': round(min(timings), 6),
+            'median': round(median, 6),
+            'mean': round(stats.fmean(timings), 6),
+            'papers_per_second': round(size / median, 1) if median else None
+        }
+        result.update(extra)
+        self.results.append(result)
+        logger.info("%s [%d]: median %.1f ms", stage, size, median * 1000)
+    
+    def _time(self, func: Callable, setup: Optional[Callable] = None) -> List[float]:
+        """Seconds of each of repeat calls of func(setup())"""
+        timings = []
+        for _ in range(self.repeat):
+            state = setup() if setup else None
+            start = time.perf_counter()
+            func(state)
+            timings.append(time.perf_counter() - start)
+        return timings
+    
+    def _bench_fetch(self, papers: List[Dict]):
+        from modules.base_source import RateLimiter
+        from modules.crossref_source import CrossrefSource
+        from modules.arxiv_source import ArxivSource
+        
+        size = len(papers)
+        with StubSourceServer(papers) as server:
+            for source_class, url in ((CrossrefSource, server.crossref_url), (ArxivSource, server.arxiv_url)):
+                source = source_class({'base_url': url})
+                # Own limiter without delay: the stub server has no rate limit
+                source.rate_limiter = RateLimiter(source.source_name, 0)
+                found = []
+                parse_seconds = []
+                
+                def search(_):
+                    parse_before = _histogram_sum('source_parse_seconds', source=source.source_name)
+                    found.append(len(source.search('benchmark', max_results=size)))
+                    parse_seconds.append(_histogram_sum('source_parse_seconds', source=source.source_name) - parse_before)
+                
+                timings = self._time(search)
+                if min(found) < size:
+                    logger.warning("%s returned %d of %d papers", source.source_name, min(found), size)
+                self._record(f"fetch_parse.{source.source_name}", size, timings,
+                             parse_median=round(stats.median(parse_seconds), 6), papers_found=min(found))
+    
+    def _bench_dedup(self, papers: List[Dict]):
+        from modules.data_fetcher import DataFetcher
+        
+        fetcher = DataFetcher(sources={})
+        self._record('dedup', len(papers), self._time(lambda _: fetcher._remove_duplicates(papers)))
+    
+    def _bench_keywords(self, papers: List[Dict], tmp_dir: Path):
+        timings = self._time(
+            lambda api: api._keyword_extractor.extract_keywords(papers, top_n=20),
+            setup=lambda: _warm_api(tmp_dir)
+        )
+        self._record('extract_keywords', len(papers), timings)
+    
+    def _bench_charts(self, papers: List[Dict], tmp_dir: Path):
+        timings = {chart: [] for chart in CHARTS}
+        for _ in range(self.repeat):
+            api = _warm_api(tmp_dir)
+            visualizer = api._visualizer
+            # Computed by the app before rendering; timed under 'statistics' and 'extract_keywords'
+            aggregates = api._statistics_engine.aggregates(papers, tokens=True)
+            keywords = api._keyword_extractor.top_keywords(aggregates.token_counts, top_n=20)
+            
+            charts = {
+                'wordcloud': lambda: visualizer.create_wordcloud(papers),
+                'network': lambda: visualizer.create_keyword_network(keywords, papers),
+                'years': lambda: visualizer.plot_publications_per_year(papers, aggregates),
+                'citations': lambda: visualizer.plot_citations_distribution(papers),
+                'timeline': lambda: visualizer.create_timeline_chart(papers),
+                'sources': lambda: visualizer.plot_source_distribution(papers, aggregates),
+                'trends': lambda: visualizer.plot_keyword_trends(api._keyword_extractor.keyword_trends(
+                    papers,
+                    top_n=config.TREND_TOP_TERMS,
+                    method=config.TREND_METHOD,
+                    recent_years=config.TREND_RECENT_YEARS
+                ))
+            }
+            for chart in CHARTS:
+                start = time.perf_counter()
+                charts[chart]()
+                timings[chart].append(time.perf_counter() - start)
+        
+        for chart in CHARTS:
+            self._record(f"chart.{chart}", len(papers), timings[chart])
+    
+    def _bench_statistics(self, papers: List[Dict], tmp_dir: Path):
+        timings = self._time(lambda api: api.get_paper_statistics(papers), setup=lambda: _warm_api(tmp_dir))
+        self._record('statistics', len(papers), timings)
+    
+    def _bench_exports(self, papers: List[Dict], tmp_dir: Path):
+        from modules.exporter import EXPORT_FILE_NAMES
+        
+        for format in self.formats:
+            stem, extension = EXPORT_FILE_NAMES[format]
+            # An explicit file name bypasses the export cache, so every run writes
+            filename = f"{stem}_{len(papers)}.{extension}"
+            timings = self._time(
+                lambda api: api._exporter.export(format, papers, filename=filename),
+                setup=lambda: _warm_api(tmp_dir)
+            )
+            size_bytes = (tmp_dir / filename).stat().st_size
+            (tmp_dir / filename).unlink()
+            self._record(f"export.{format}", len(papers), timings, output_bytes=size_bytes)
+
+
+def _warm_api(tmp_dir: Path) -> BenchmarkAPI:
+    """Fresh app instance with its components created (imports are not timed)"""
+    api = BenchmarkAPI(tmp_dir)
+    for name in ('text_processor', 'statistics_engine', 'keyword_extractor', 'visualizer', 'exporter'):
+        api._component(name)
+    return api
+
+
+def _histogram_sum(name: str, **labels) -> float:
+    label_key = ','.join(f"{label}={value}" for label, value in sorted(labels.items()))
+    series = metrics.REGISTRY.snapshot()['histograms'].get(name, {})
+    return series.get(label_key, {}).get('sum', 0.0)
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'git_commit': commit
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Stages slower than in the baseline
+    
+    Args:
+        report: Report of this run
+        baseline: Earlier report
+        threshold: Allowed relative growth of the median (0.25: 25% slower)
+    """
+    previous = {(result['stage'], result['size']): result['median'] for result in baseline.get('results', [])}
+    regressions = []
+    for result in report['results']:
+        before = previous.get((result['stage'], result['size']))
+        if not before:
+            continue
+        after = result['median']
+        if after > before * (1 + threshold) and after - before > REGRESSION_MIN_SECONDS:
+            regressions.append({
+                'stage': result['stage'],
+                'size': result['size'],
+                'baseline_median': before,
+                'median': after,
+                'ratio': round(after / before, 2)
+            })
+    return regressions
+
+
+def _print_table(report: Dict[str, Any]):
+    print(f"{'stage':<28} {'size':>8} {'median ms':>12} {'min ms':>12} {'papers/s':>12}")
+    for result in report['results']:
+        rate = result['papers_per_second']
+        print(f"{result['stage']:<28} {result['size']:>8} {result['median'] * 1000:>12.2f} "
+              f"{result['min'] * 1000:>12.2f} {rate if rate is not None else '-':>12}")
+
+
+def _csv_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.run',
+        description="Time Sintesa's search, analysis and export stages on synthetic corpora"
+    )
+    parser.add_argument('--sizes', default=','.join(str(size) for size in CORPUS_SIZES),
+                        help="Comma-separated corpus sizes (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (default: %(default)s)")
+    parser.add_argument('--stages', help=f"Comma-separated stage groups: {', '.join(STAGE_GROUPS)} (default: all)")
+    parser.add_argument('--formats', help="Comma-separated export formats (default: all available)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus random seed (default: %(default)s)")
+    parser.add_argument('--output', type=Path,
+                        help="Report file (default: data/benchmarks/bench_<timestamp>.json)")
+    parser.add_argument('--baseline', type=Path, help="Earlier report to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Allowed median slowdown against the baseline (default: %(default)s)")
+    parser.add_argument('--verbose', action='store_true', help="Log progress and app messages")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics.configure_logging('INFO' if args.verbose else 'WARNING', config.LOG_FORMAT)
+    
+    from modules.exporter import EXPORT_FORMATS
+    
+    stages = _csv_list(args.stages) if args.stages else None
+    formats = _csv_list(args.formats) if args.formats else None
+    unknown = (set(stages or []) - set(STAGE_GROUPS)) | (set(formats or []) - set(EXPORT_FORMATS))
+    if unknown:
+        logger.error("Unknown stages or formats: %s", ', '.join(sorted(unknown)))
+        return 2
+    
+    runner = BenchmarkRunner(
+        sizes=[int(size) for size in _csv_list(args.sizes)],
+        repeat=max(1, args.repeat),
+        stages=stages,
+        formats=formats,
+        seed=args.seed
+    )
+    report = runner.run()
+    
+    status = 0
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        report['baseline'] = str(args.baseline)
+        report['regressions'] = compare(report, baseline, args.threshold)
+        status = 1 if report['regressions'] else 0
+    
+    output = args.output or config.DATA_DIR / "benchmarks" / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    
+    _print_table(report)
+    for regression in report.get('regressions', []):
+        print(f"REGRESSION {regression['stage']} [{regression['size']}]: "
+              f"{regression['baseline_median'] * 1000:.1f} ms -> {regression['median'] * 1000:.1f} ms "
+              f"(x{regression['ratio']})")
+    print(f"Report written to {output}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
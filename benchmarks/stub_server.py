@@ -0,0 +1,314 @@
+"""
+Stub CrossRef and arXiv API server for offline benchmarks
+Serves a paper corpus as CrossRef /works JSON and arXiv Atom pages on localhost
+
+Recorded responses in benchmarks/fixtures/ (crossref_works.json, arxiv_query.xml)
+are used as templates, so served items carry every field the real APIs return;
+without them items are synthesized from the corpus alone. Refresh the recordings
+with:
+    python -m benchmarks.stub_server --record
+
+Serve a corpus for the app itself (searches never leave the machine):
+    python -m benchmarks.stub_server --size 10000 --port 8800
+    SINTESA_CROSSREF_URL=http://127.0.0.1:8800/works \\
+    SINTESA_ARXIV_URL=http://127.0.0.1:8800/api/query python app.py
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+import argparse
+import copy
+import json
+import logging
+import sys
+import threading
+import xml.etree.ElementTree as ET
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+CROSSREF_FIXTURE = "crossref_works.json"
+ARXIV_FIXTURE = "arxiv_query.xml"
+
+# Paths served, matching the default source endpoints
+CROSSREF_PATH = '/works'
+ARXIV_PATH = '/api/query'
+
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+ATOM_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    f'<feed xmlns="{ATOM_NS}" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+    '<title type="html">ArXiv Query: benchmark</title>'
+    '<opensearch:totalResults>{total}</opensearch:totalResults>'
+    '<opensearch:startIndex>{start}</opensearch:startIndex>'
+    '<opensearch:itemsPerPage>{count}</opensearch:itemsPerPage>'
+)
+
+
+class StubSourceServer:
+    """
+    Local HTTP server answering CrossRef and arXiv search requests from a corpus.
+    
+    Every query gets the same corpus, paged by the request's offset/rows
+    (CrossRef) or start/max_results (arXiv). Items are encoded once when the
+    server is created, so serving a page costs little more than a byte join
+    and the measured time is dominated by the client's fetch and parse.
+    """
+    
+    def __init__(self, papers: List[Dict[str, Any]], host: str = '127.0.0.1', port: int = 0,
+                 fixtures_dir: Path = FIXTURES_DIR):
+        """
+        Args:
+            papers: Corpus served to both sources (see benchmarks.corpus)
+            host: Listen address
+            port: Listen port (0: any free port)
+            fixtures_dir: Directory with recorded responses used as templates
+        """
+        crossref_templates, arxiv_templates = _load_fixtures(Path(fixtures_dir))
+        self.crossref_items = [
+            json.dumps(_crossref_item(paper, index, crossref_templates), ensure_ascii=False).encode('utf-8')
+            for index, paper in enumerate(papers)
+        ]
+        self.arxiv_entries = [
+            _arxiv_entry(paper, index, arxiv_templates).encode('utf-8')
+            for index, paper in enumerate(papers)
+        ]
+        self.requests_served = 0
+        
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    @property
+    def crossref_url(self) -> str:
+        return self.base_url + CROSSREF_PATH
+    
+    @property
+    def arxiv_url(self) -> str:
+        return self.base_url + ARXIV_PATH
+    
+    def start(self) -> 'StubSourceServer':
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-source-server', daemon=True)
+        self._thread.start()
+        return self
+    
+    def serve_forever(self):
+        self._server.serve_forever()
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def __enter__(self) -> 'StubSourceServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def crossref_page(self, offset: int, rows: int) -> bytes:
+        items = self.crossref_items[offset:offset + rows]
+        return (
+            b'{"status":"ok","message-type":"work-list","message-version":"1.0.0","message":{'
+            b'"total-results":' + str(len(self.crossref_items)).encode() +
+            b',"items-per-page":' + str(rows).encode() +
+            b',"query":{"start-index":' + str(offset).encode() + b',"search-terms":"benchmark"}'
+            b',"items":[' + b','.join(items) + b']}}'
+        )
+    
+    def arxiv_page(self, start: int, max_results: int) -> bytes:
+        entries = self.arxiv_entries[start:start + max_results]
+        header = ATOM_HEADER.format(total=len(self.arxiv_entries), start=start, count=len(entries))
+        return header.encode('utf-8') + b''.join(entries) + b'</feed>'
+    
+    def _handler(self) -> type:
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, as the sources reuse one requests.Session
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                try:
+                    if url.path == CROSSREF_PATH:
+                        body = stub.crossref_page(_int_param(query, 'offset', 0), _int_param(query, 'rows', 20))
+                        content_type = 'application/json'
+                    elif url.path == ARXIV_PATH:
+                        body = stub.arxiv_page(_int_param(query, 'start', 0), _int_param(query, 'max_results', 10))
+                        content_type = 'application/atom+xml; charset=utf-8'
+                    else:
+                        self.send_error(404)
+                        return
+                except ValueError:
+                    self.send_error(400)
+                    return
+                
+                stub.requests_served += 1
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                logger.debug(format, *args)
+        
+        return Handler
+
+
+def _int_param(query: Dict[str, List[str]], name: str, default: int) -> int:
+    values = query.get(name)
+    return max(0, int(values[0])) if values else default
+
+
+def _load_fixtures(fixtures_dir: Path):
+    """Recorded CrossRef items and arXiv entries (empty lists if not recorded)"""
+    crossref_templates, arxiv_templates = [], []
+    
+    crossref_path = fixtures_dir / CROSSREF_FIXTURE
+    if crossref_path.exists():
+        data = json.loads(crossref_path.read_text(encoding='utf-8'))
+        crossref_templates = data.get('message', {}).get('items', [])
+    
+    arxiv_path = fixtures_dir / ARXIV_FIXTURE
+    if arxiv_path.exists():
+        root = ET.fromstring(arxiv_path.read_bytes())
+        arxiv_templates = root.findall(f'{{{ATOM_NS}}}entry')
+    
+    if not crossref_templates or not arxiv_templates:
+        logger.info("No recorded responses in %s; synthesizing items", fixtures_dir)
+    return crossref_templates, arxiv_templates
+
+
+def _date_parts(date: Optional[str]) -> List[List[int]]:
+    parts = [int(part) for part in (date or '').split('-') if part.isdigit()]
+    return [parts or [2020]]
+
+
+def _crossref_item(paper: Dict[str, Any], index: int, templates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """CrossRef work for a paper, on a recorded item's fields where available"""
+    item = copy.deepcopy(templates[index % len(templates)]) if templates else {}
+    doi = paper.get('doi') or f"10.5555/bench.{index}"
+    authors = []
+    for name in paper.get('authors', []):
+        given, _, family = name.rpartition(' ')
+        authors.append({'given': given, 'family': family, 'sequence': 'additional'} if given else {'name': name})
+    
+    # Keep only the date field the parser reads first, so it sees the corpus date
+    for field in ('published-print', 'published-online'):
+        item.pop(field, None)
+    item.update({
+        'DOI': doi,
+        'URL': f"https://doi.org/{doi}",
+        'title': [paper.get('title', '')],
+        'author': authors,
+        'abstract': f"<jats:p>{escape(paper.get('abstract', ''))}</jats:p>",
+        'container-title': [paper.get('journal') or ''],
+        'issued': {'date-parts': _date_parts(paper.get('publication_date'))},
+        'is-referenced-by-count': paper.get('citations') or 0
+    })
+    item.setdefault('type', 'journal-article')
+    return item
+
+
+def _arxiv_entry(paper: Dict[str, Any], index: int, templates: List[ET.Element]) -> str:
+    """Atom entry for a paper, on a recorded entry's elements where available"""
+    arxiv_id = f"{2000 + index // 100000:04d}.{index % 100000:05d}v1"
+    date = paper.get('publication_date') or '2020-01-01'
+    if len(date) == 4:
+        date += '-01-01'
+    
+    if not templates:
+        authors = ''.join(f"<author><name>{escape(name)}</name></author>" for name in paper.get('authors', []))
+        return (
+            f"<entry><id>http://arxiv.org/abs/{arxiv_id}</id>"
+            f"<updated>{date}T00:00:00Z</updated><published>{date}T00:00:00Z</published>"
+            f"<title>{escape(paper.get('title', ''))}</title>"
+            f"<summary>{escape(paper.get('abstract', ''))}</summary>{authors}"
+            f'<link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>'
+            f'<category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/></entry>'
+        )
+    
+    entry = copy.deepcopy(templates[index % len(templates)])
+    replacements = {
+        'id': f"http://arxiv.org/abs/{arxiv_id}",
+        'published': f"{date}T00:00:00Z",
+        'title': paper.get('title', ''),
+        'summary': paper.get('abstract', '')
+    }
+    for tag, text in replacements.items():
+        element = entry.find(f'{{{ATOM_NS}}}{tag}')
+        if element is not None:
+            element.text = text
+    for author in entry.findall(f'{{{ATOM_NS}}}author'):
+        entry.remove(author)
+    for name in paper.get('authors', []):
+        author = ET.SubElement(entry, f'{{{ATOM_NS}}}author')
+        ET.SubElement(author, f'{{{ATOM_NS}}}name').text = name
+    return ET.tostring(entry, encoding='unicode')
+
+
+def record_fixtures(fixtures_dir: Path = FIXTURES_DIR, query: str = 'machine learning', rows: int = 50):
+    """Save one page of real CrossRef and arXiv responses as templates"""
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    session = requests.Session()
+    session.headers['User-Agent'] = 'Sintesa/1.0 (Academic Research Tool; benchmark fixtures)'
+    
+    response = session.get('https://api.crossref.org/works', params={'query': query, 'rows': rows}, timeout=60)
+    response.raise_for_status()
+    (fixtures_dir / CROSSREF_FIXTURE).write_bytes(response.content)
+    
+    response = session.get('http://export.arxiv.org/api/query',
+                           params={'search_query': f'all:{query}', 'max_results': rows}, timeout=60)
+    response.raise_for_status()
+    (fixtures_dir / ARXIV_FIXTURE).write_bytes(response.content)
+    logger.info("Recorded %d CrossRef items and arXiv entries to %s", rows, fixtures_dir)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from benchmarks.corpus import synthetic_corpus
+    
+    parser = argparse.ArgumentParser(description="Stub CrossRef/arXiv API server for offline benchmarks")
+    parser.add_argument('--size', type=int, default=10000, help="Papers in the served corpus")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus random seed")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--record', action='store_true',
+                        help="Record real API responses into the fixtures directory and exit")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+    if args.record:
+        try:
+            record_fixtures()
+        except requests.exceptions.RequestException as e:
+            logger.error("Recording failed: %s", e)
+            return 1
+        return 0
+    
+    server = StubSourceServer(synthetic_corpus(args.size, seed=args.seed), args.host, args.port)
+    logger.info("Serving %d papers: CrossRef %s, arXiv %s", args.size, server.crossref_url, server.arxiv_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
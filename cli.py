@@ -0,0 +1,351 @@
+"""
+Sintesa - Command Line Batch Mode
+Runs searches from a queries file and writes exports and charts, without a GUI
+
+Usage:
+    python cli.py queries.txt --formats csv,json,pdf --charts
+
+The queries file holds one query per line (blank lines and lines starting
+with '#' are skipped), or, for .json/.jsonl files, objects with the same
+fields as the search form: query, source, max_results, from_year, search_type.
+
+pywebview is never imported, so this runs on servers and from cron.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import argparse
+import json
+import multiprocessing
+import re
+import sys
+import logging
+import time
+
+import config
+from modules import metrics
+
+logger = logging.getLogger('cli')
+
+# Charts written with --charts, one HTML file each
+CHARTS = ('wordcloud', 'network', 'years', 'citations', 'timeline', 'sources', 'trends')
+
+# Standalone page around an embeddable chart snippet
+CHART_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="https://cdn.plot.ly/plotly-{plotly_version}.min.js"></script>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def read_queries(path: Path, defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Read search parameters from a queries file
+    
+    Args:
+        path: Text file (one query per line) or JSON/JSONL file of search objects
+        defaults: Parameters used where a query does not set its own
+    """
+    text = path.read_text(encoding='utf-8')
+    if path.suffix == '.json':
+        entries = json.loads(text)
+    elif path.suffix == '.jsonl':
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        entries = [
+            line.strip() for line in text.splitlines()
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+    
+    queries = []
+    for entry in entries:
+        params = dict(defaults)
+        params.update({'query': entry} if isinstance(entry, str) else entry)
+        if not params.get('query'):
+            raise ValueError(f"Query without text in {path}: {entry!r}")
+        queries.append(params)
+    return queries
+
+
+class BatchRunner:
+    """
+    Runs a batch of searches and writes each result set's outputs.
+    
+    Searches run concurrently, bounded by max_concurrent; requests to each
+    source still go through that source's shared rate limiter. Keyword
+    extraction, charts and exports run one result set at a time as
+    searches finish, so CPU-heavy work never competes with itself.
+    """
+    
+    def __init__(self, output_dir: Path, formats: List[str], charts: bool = False,
+                 max_concurrent: int = 2, top_keywords: int = 20):
+        """
+        Args:
+            output_dir: Directory receiving one subdirectory per query
+            formats: Export formats written for every result set
+            charts: Also write each chart as a standalone HTML file
+            max_concurrent: Searches running at the same time
+            top_keywords: Keywords listed in the summary and the keyword network
+        """
+        # Heavy modules are imported here, after the arguments are validated
+        from modules.data_fetcher import DataFetcher
+        from modules.keyword_extractor import KeywordExtractor
+        from modules.statistics import StatisticsEngine
+        from modules.text_processing import TextProcessor
+        
+        self.output_dir = output_dir
+        self.formats = formats
+        self.charts = charts
+        self.max_concurrent = max_concurrent
+        self.top_keywords = top_keywords
+        
+        self.data_fetcher = DataFetcher(source_config=config.SOURCE_CONFIG)
+        self.text_processor = TextProcessor(
+            max_cached_papers=config.TEXT_CACHE_MAX_PAPERS,
+            normalize=config.KEYWORD_NORMALIZE
+        )
+        
+        idf_table = None
+        if config.KEYWORD_SCORING == 'tfidf':
+            from modules.corpus_idf import CorpusIDF
+            config.ensure_directories()
+            idf_table = CorpusIDF(
+                config.KEYWORD_IDF_FILE,
+                max_terms=config.KEYWORD_IDF_MAX_TERMS,
+                max_docs=config.KEYWORD_IDF_MAX_DOCS,
+                save_interval=config.KEYWORD_IDF_SAVE_INTERVAL
+            )
+        self.keyword_extractor = KeywordExtractor(
+            ngram_range=(1, config.KEYWORD_MAX_NGRAM),
+            include_abstracts=config.KEYWORD_INCLUDE_ABSTRACTS,
+            scoring=config.KEYWORD_SCORING,
+            idf_table=idf_table,
+            text_processor=self.text_processor,
+            parallel_threshold=config.KEYWORD_PARALLEL_THRESHOLD
+        )
+        self.statistics = StatisticsEngine(token_counter=self.keyword_extractor.count_tokens)
+        
+        self._visualizer = None
+        if charts:
+            from modules.visualizer import Visualizer
+            self._visualizer = Visualizer(
+                output_format='html',
+                webgl_threshold=config.TIMELINE_WEBGL_THRESHOLD,
+                density_threshold=config.TIMELINE_DENSITY_THRESHOLD,
+                binning_threshold=config.CITATION_BINNING_THRESHOLD,
+                citation_bins=config.CITATION_BINS,
+                text_processor=self.text_processor
+            )
+    
+    def run(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run every query and write its outputs
+        
+        Returns:
+            One summary per query, in file order
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summaries: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
+            futures = {
+                executor.submit(self._search, params): index
+                for index, params in enumerate(queries)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                params = queries[index]
+                summary = {'query': params['query'], 'success': False}
+                try:
+                    papers, search_seconds = future.result()
+                    summary.update(self._process(index, params, papers))
+                    summary['timings']['search'] = round(search_seconds, 3)
+                    summary['success'] = True
+                except Exception as e:
+                    logger.exception("Query %d failed: %s", index + 1, e, extra={'query': params['query']})
+                    summary['error'] = str(e)
+                summaries[index] = summary
+        
+        with open(self.output_dir / 'summary.json', 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2, ensure_ascii=False)
+        return summaries
+    
+    def _search(self, params: Dict[str, Any]):
+        start = time.perf_counter()
+        papers = self.data_fetcher.search(
+            query=params['query'],
+            source=params.get('source', 'all'),
+            max_results=int(params.get('max_results', config.DEFAULT_MAX_RESULTS)),
+            from_year=params.get('from_year'),
+            search_type=params.get('search_type', 'all')
+        )
+        return papers, time.perf_counter() - start
+    
+    def _process(self, index: int, params: Dict[str, Any], papers: List[Dict]) -> Dict[str, Any]:
+        """Keywords, statistics, exports and charts of one result set"""
+        from modules.exporter import Exporter
+        
+        query_dir = self.output_dir / f"{index + 1:03d}_{_slug(params['query'])}"
+        query_dir.mkdir(parents=True, exist_ok=True)
+        timings = {}
+        summary = {'directory': str(query_dir), 'count': len(papers), 'timings': timings}
+        if not papers:
+            logger.info("No papers found", extra={'query': params['query']})
+            summary.update({'keywords': [], 'exports': {}, 'charts': {}})
+            return summary
+        
+        start = time.perf_counter()
+        aggregates = self.statistics.aggregates(papers, tokens=True)
+        keywords = self.keyword_extractor.top_keywords(aggregates.token_counts, top_n=self.top_keywords)
+        summary['keywords'] = keywords
+        summary['top_authors'] = aggregates.top_authors(5)
+        timings['keywords'] = round(time.perf_counter() - start, 3)
+        
+        exporter = Exporter(str(query_dir), statistics=self.statistics)
+        exports = {}
+        for format in self.formats:
+            start = time.perf_counter()
+            exports[format] = exporter.export(format, papers)
+            timings[f'export_{format}'] = round(time.perf_counter() - start, 3)
+        summary['exports'] = exports
+        
+        charts = {}
+        if self._visualizer is not None:
+            for name in CHARTS:
+                start = time.perf_counter()
+                html = self._chart(name, papers, keywords, aggregates)
+                if html is None:
+                    continue
+                chart_path = query_dir / f"chart_{name}.html"
+                chart_path.write_text(_chart_page(name, html), encoding='utf-8')
+                charts[name] = str(chart_path)
+                timings[f'chart_{name}'] = round(time.perf_counter() - start, 3)
+        summary['charts'] = charts
+        
+        logger.info("Query finished", extra={'query': params['query'], 'papers': len(papers), 'output_dir': str(query_dir)})
+        return summary
+    
+    def _chart(self, name: str, papers: List[Dict], keywords: List[str], aggregates) -> Optional[str]:
+        visualizer = self._visualizer
+        if name == 'wordcloud':
+            return visualizer.create_wordcloud(papers)
+        elif name == 'network':
+            if len(keywords) < 2:
+                return None
+            return visualizer.create_keyword_network(keywords, papers)
+        elif name == 'years':
+            return visualizer.plot_publications_per_year(papers, aggregates)
+        elif name == 'citations':
+            return visualizer.plot_citations_distribution(papers)
+        elif name == 'timeline':
+            return visualizer.create_timeline_chart(papers)
+        elif name == 'sources':
+            return visualizer.plot_source_distribution(papers, aggregates)
+        elif name == 'trends':
+            trends = self.keyword_extractor.keyword_trends(
+                papers,
+                top_n=config.TREND_TOP_TERMS,
+                method=config.TREND_METHOD,
+                recent_years=config.TREND_RECENT_YEARS
+            )
+            return visualizer.plot_keyword_trends(trends)
+        raise ValueError(f"Unknown chart: {name}")
+
+
+def _slug(text: str, max_length: int = 40) -> str:
+    """File-system safe name for a query"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower()
+    return slug[:max_length] or 'query'
+
+
+def _chart_page(name: str, body: str) -> str:
+    # The plotly.js release bundled with the Python package, which is versioned separately
+    from plotly.offline import get_plotlyjs_version
+    return CHART_PAGE.format(title=f"Sintesa - {name}", plotly_version=get_plotlyjs_version(), body=body)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from modules.exporter import EXPORT_FORMATS
+    
+    parser = argparse.ArgumentParser(
+        description="Sintesa batch mode: search, export and chart every query in a file"
+    )
+    parser.add_argument('queries', type=Path,
+                        help="Queries file: one query per line, or .json/.jsonl search objects")
+    parser.add_argument('-o', '--output-dir', type=Path, default=None,
+                        help="Output directory (default: exports/batch_<timestamp>)")
+    parser.add_argument('-f', '--formats', default='csv',
+                        help=f"Comma-separated export formats: {', '.join(EXPORT_FORMATS)} (default: csv)")
+    parser.add_argument('--charts', action='store_true',
+                        help="Also write every chart as a standalone HTML file")
+    parser.add_argument('-s', '--source', default='all',
+                        choices=['all', 'crossref', 'arxiv', 'scholar'],
+                        help="Default source for queries that do not set one")
+    parser.add_argument('-n', '--max-results', type=int, default=config.DEFAULT_MAX_RESULTS,
+                        help="Default maximum results per query")
+    parser.add_argument('--from-year', type=int, default=None,
+                        help="Default earliest publication year")
+    parser.add_argument('--search-type', default='all',
+                        choices=['all', 'title', 'author', 'journal', 'keywords'],
+                        help="Default search type")
+    parser.add_argument('-j', '--concurrency', type=int, default=2,
+                        help="Searches running at the same time (default: 2)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point; returns the process exit code"""
+    multiprocessing.freeze_support()
+    
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    metrics.configure_logging(config.LOG_LEVEL, config.LOG_FORMAT)
+    
+    from modules.exporter import EXPORT_FORMATS
+    formats = [format.strip() for format in args.formats.split(',') if format.strip()]
+    unknown = [format for format in formats if format not in EXPORT_FORMATS]
+    if unknown:
+        parser.error(f"unsupported export formats: {', '.join(unknown)}")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    
+    defaults = {
+        'source': args.source,
+        'max_results': args.max_results,
+        'from_year': args.from_year,
+        'search_type': args.search_type
+    }
+    try:
+        queries = read_queries(args.queries, defaults)
+    except (OSError, ValueError) as e:
+        parser.error(f"could not read queries: {e}")
+    if not queries:
+        parser.error(f"no queries in {args.queries}")
+    
+    output_dir = args.output_dir
+    if output_dir is None:
+        output_dir = config.EXPORTS_DIR / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    logger.info("Running %d queries", len(queries), extra={'concurrency': args.concurrency, 'output_dir': str(output_dir)})
+    start = time.perf_counter()
+    runner = BatchRunner(output_dir, formats, charts=args.charts, max_concurrent=args.concurrency)
+    summaries = runner.run(queries)
+    
+    failed = sum(1 for summary in summaries if not summary['success'])
+    logger.info("Finished", extra={
+        'duration_ms': round((time.perf_counter() - start) * 1000, 1), 'succeeded': len(summaries) - failed, 'failed': failed
+    })
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
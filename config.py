@@ -17,17 +17,110 @@ CACHE_DIR = BASE_DIR / "cache"
 # Configuration file
 CONFIG_FILE = BASE_DIR / "config_sources.json"
 
-# Create directories if they don't exist
-for directory in [DATA_DIR, EXPORTS_DIR, CACHE_DIR]:
-    directory.mkdir(exist_ok=True)
-
 # Analysis Configuration (simplified - no AI)
 MAX_RESULTS_PER_SOURCE = 300
 DEFAULT_MAX_RESULTS = 300
 DEFAULT_LANGUAGE = "en"
 
+# Visualization Configuration
+# "json" sends compact Plotly figure JSON to the UI, "html" sends embeddable HTML snippets
+CHART_OUTPUT_FORMAT = "json"
+
+# Large result sets: timeline switches to WebGL markers, then to a server-side
+# density heatmap; citation histograms are binned server-side
+TIMELINE_WEBGL_THRESHOLD = 1000
+TIMELINE_DENSITY_THRESHOLD = 10000
+CITATION_BINNING_THRESHOLD = 1000
+CITATION_BINS = "auto"  # auto, linear, log, quantile
+
+# Keyword extraction: longest phrase length counted, and whether abstracts
+# contribute terms in addition to titles
+KEYWORD_MAX_NGRAM = 3
+KEYWORD_INCLUDE_ABSTRACTS = False
+
+# Keyword ranking: "frequency" (raw counts) or "tfidf" (weighted by a
+# document-frequency table persisted across every search)
+KEYWORD_SCORING = "tfidf"
+KEYWORD_IDF_FILE = CACHE_DIR / "keyword_idf.json.gz"
+KEYWORD_IDF_MAX_TERMS = 200000
+# Papers remembered as already counted; the least recently fetched age out
+KEYWORD_IDF_MAX_DOCS = 500000
+# Seconds between writes of the table (always written at exit)
+KEYWORD_IDF_SAVE_INTERVAL = 60
+
+# Result sets at least this large are keyword-counted in worker processes
+KEYWORD_PARALLEL_THRESHOLD = 20000
+
+# Emerging keyword trends: ranking method ("growth" or "burst"), length of
+# the recent window in years, and number of terms plotted
+TREND_METHOD = "growth"
+TREND_RECENT_YEARS = 3
+TREND_TOP_TERMS = 8
+
+# Papers whose token ids stay cached for keyword extraction, word cloud and network
+TEXT_CACHE_MAX_PAPERS = 100000
+
+# Fold plurals, -ed forms and British spellings so keyword variants merge
+KEYWORD_NORMALIZE = True
+
+# Worker processes for background export jobs (one format per worker), and
+# formats running or waiting for a worker before new jobs are refused
+EXPORT_WORKERS = 4
+EXPORT_MAX_PENDING = 16
+
+# Identical exports (same result set, format and options) reuse the file
+# written within this many hours; the exports directory is capped in size
+EXPORT_CACHE_MAX_AGE_HOURS = 24
+EXPORTS_MAX_MB = 500
+
+# Source API endpoints; override to search a mirror or the offline
+# benchmark stub server (python -m benchmarks.stub_server)
+SOURCE_CONFIG = {
+    'crossref': {'base_url': os.environ.get("SINTESA_CROSSREF_URL", "https://api.crossref.org/works")},
+    'arxiv': {'base_url': os.environ.get("SINTESA_ARXIV_URL", "http://export.arxiv.org/api/query")}
+}
+
+# Local HTTP service (server.py): listen address, worker threads for chart,
+# statistics and export calls, calls queued beyond the busy workers before
+# clients get 503, and client sessions kept (idle sessions expire)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_WORKERS = 2
+SERVER_MAX_QUEUED = 16
+SERVER_MAX_SESSIONS = 32
+SERVER_SESSION_IDLE_MINUTES = 60
+
+# Logging: minimum level and line style ("text" or "json")
+LOG_LEVEL = os.environ.get("SINTESA_LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("SINTESA_LOG_FORMAT", "text")
+
+# Metrics in Prometheus text format (for a textfile collector), rewritten at
+# most every METRICS_WRITE_INTERVAL seconds after API calls
+METRICS_FILE = DATA_DIR / "metrics.prom"
+METRICS_WRITE_INTERVAL = 10
+
+# Opt-in profiling of API calls (cProfile, plus tracemalloc when
+# PROFILE_MEMORY is on). Reports go to PROFILES_DIR, one pair of files per
+# profiled call; a low sample rate keeps the overhead small in production.
+# Set from the environment, e.g. SINTESA_PROFILE=1 SINTESA_PROFILE_SAMPLE_RATE=0.05
+PROFILE_ENABLED = os.environ.get("SINTESA_PROFILE", "0").lower() in ("1", "true", "yes")
+PROFILE_METHODS = tuple(
+    name.strip() for name in os.environ.get(
+        "SINTESA_PROFILE_METHODS",
+        "search_papers,generate_visualizations,get_paper_statistics,export_data"
+    ).split(",") if name.strip()
+)
+PROFILE_SAMPLE_RATE = float(os.environ.get("SINTESA_PROFILE_SAMPLE_RATE", "1.0"))
+PROFILE_MEMORY = os.environ.get("SINTESA_PROFILE_MEMORY", "1").lower() in ("1", "true", "yes")
+PROFILES_DIR = DATA_DIR / "profiles"
+
 # Year settings
 from datetime import datetime
 CURRENT_YEAR = datetime.now().year
 DEFAULT_FROM_YEAR = CURRENT_YEAR - 3  # 3 years ago
 
+
+def ensure_directories():
+    """Create data directories if they don't exist (kept out of import time)"""
+    for directory in [DATA_DIR, EXPORTS_DIR, CACHE_DIR]:
+        directory.mkdir(exist_ok=True)
@@ -0,0 +1,292 @@
+"""
+Aggregates Module for Sintesa
+Mergeable counters and histograms that grow with the result set
+"""
+
+from typing import List, Dict, Optional, Any, Callable, Iterable, Tuple
+from collections import Counter, defaultdict
+import heapq
+import re
+
+_YEAR_PATTERN = re.compile(r'\b(19|20)\d{2}\b')
+
+# Most cited papers kept for reports (exports list at most this many)
+TOP_CITED_KEPT = 20
+
+
+def extract_year(date_str) -> Optional[int]:
+    """Extract year from date string"""
+    if date_str is None or date_str == '':
+        return None
+    
+    date_str = str(date_str)
+    head = date_str.split('-', 1)[0].split('/', 1)[0]
+    if head.isdigit() and len(head) == 4:
+        return int(head)
+    
+    year_match = _YEAR_PATTERN.search(date_str)
+    if year_match:
+        return int(year_match.group())
+    return None
+
+
+def paper_year(paper: Dict[str, Any]) -> Optional[int]:
+    """Year of a paper, from its 'year' field or its publication date"""
+    year = paper.get('year')
+    if year:
+        try:
+            return int(str(year))
+        except (ValueError, TypeError):
+            pass
+    return extract_year(paper.get('publication_date'))
+
+
+def paper_key(paper: Dict[str, Any]) -> str:
+    """Identity of a paper: DOI when present, otherwise normalized title"""
+    doi = paper.get('doi')
+    if doi:
+        return f"doi:{str(doi).lower()}"
+    return f"title:{str(paper.get('title', '')).lower().strip()}"
+
+
+def author_name_and_affiliation(author) -> Tuple[str, str]:
+    """Split an author entry (string or dict) into name and affiliation"""
+    if isinstance(author, dict):
+        return str(author.get('name', '')).strip(), author.get('affiliation', '') or ''
+    if isinstance(author, str):
+        return author.strip(), ''
+    return '', ''
+
+
+class CitationSketch:
+    """
+    Exact, mergeable citation distribution.
+    
+    Citation counts repeat heavily (most papers have few citations), so a
+    value -> frequency map stays small while still giving exact quantiles.
+    """
+    
+    def __init__(self):
+        self.counts = Counter()
+        self.count = 0
+        self.total = 0
+        self.max = 0
+    
+    def add(self, citations: int):
+        """Add one citation count"""
+        self.counts[citations] += 1
+        self.count += 1
+        self.total += citations
+        if citations > self.max:
+            self.max = citations
+    
+    def merge(self, other: 'CitationSketch'):
+        """Fold another sketch into this one"""
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+    
+    def quantile(self, q: float) -> float:
+        """Exact quantile with linear interpolation (pandas/NumPy default)"""
+        if not self.count:
+            return 0.0
+        
+        position = q * (self.count - 1)
+        lower_rank = int(position)
+        fraction = position - lower_rank
+        
+        # Walk the sorted distinct values to the ranks either side of position
+        lower = upper = None
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if lower is None and seen > lower_rank:
+                lower = value
+            if seen > lower_rank + 1:
+                upper = value
+                break
+        if upper is None:
+            upper = lower
+        return lower + (upper - lower) * fraction
+    
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': round(self.mean, 2),
+            'median': self.median,
+            'max': self.max
+        }
+
+
+class PaperAggregates:
+    """
+    Counters and histograms over a set of papers.
+    
+    Papers are folded in with update(); two aggregates built over disjoint
+    paper sets combine with merge(). Refresh cost is proportional to the
+    number of new papers, not the size of the result set.
+    
+    Keyword token counts are only kept once a token counter is set, either
+    up front or later through count_tokens().
+    """
+    
+    def __init__(self, token_counter: Optional[Callable[[List[Dict]], Counter]] = None):
+        """
+        Args:
+            token_counter: Optional callable returning keyword token counts
+                for a batch of papers (e.g. KeywordExtractor.count_tokens)
+        """
+        self.token_counter = token_counter
+        
+        self.paper_count = 0
+        self.year_counts = Counter()
+        self.source_counts = Counter()
+        self.journal_counts = Counter()
+        self.author_counts = Counter()
+        self.author_details = {}
+        self.token_counts = Counter()
+        self.citations = CitationSketch()
+        self.source_citations = defaultdict(CitationSketch)
+        self.papers_with_doi = 0
+        self.papers_with_abstract = 0
+        self.papers_with_url = 0
+        
+        # Min-heap of (citations, -position, paper): ties go to earlier papers
+        self._top_cited = []
+    
+    def update(self, papers: Iterable[Dict[str, Any]]) -> 'PaperAggregates':
+        """Fold new papers into the aggregates"""
+        papers = list(papers)
+        for paper in papers:
+            self._add(paper)
+        
+        if self.token_counter is not None and papers:
+            self.token_counts.update(self.token_counter(papers))
+        return self
+    
+    def count_tokens(self, papers: List[Dict[str, Any]],
+                     token_counter: Callable[[List[Dict]], Counter]) -> 'PaperAggregates':
+        """Start keeping token counts, counting the already aggregated papers"""
+        self.token_counter = token_counter
+        self.token_counts = Counter(token_counter(papers))
+        return self
+    
+    def _add(self, paper: Dict[str, Any]):
+        """Fold a single paper into every counter except tokens"""
+        self.paper_count += 1
+        
+        year = paper_year(paper)
+        if year is not None:
+            self.year_counts[year] += 1
+        
+        source = paper.get('source', '')
+        if source:
+            self.source_counts[source] += 1
+        
+        journal = paper.get('journal', '')
+        if journal:
+            self.journal_counts[journal] += 1
+        
+        try:
+            citations = int(paper.get('citations') or 0)
+        except (ValueError, TypeError):
+            citations = 0
+        self.citations.add(citations)
+        self.source_citations[source or 'Unknown'].add(citations)
+        self._push_top_cited((citations, -(self.paper_count - 1), paper))
+        
+        authors = paper.get('authors', [])
+        if isinstance(authors, list):
+            title = paper.get('title', '')
+            for author in authors:
+                name, affiliation = author_name_and_affiliation(author)
+                if not name:
+                    continue
+                self.author_counts[name] += 1
+                details = self.author_details.get(name)
+                if details is None:
+                    details = self.author_details[name] = {'affiliation': affiliation, 'papers': []}
+                details['papers'].append(title)
+        
+        if paper.get('doi'):
+            self.papers_with_doi += 1
+        if paper.get('abstract'):
+            self.papers_with_abstract += 1
+        if paper.get('url'):
+            self.papers_with_url += 1
+    
+    def merge(self, other: 'PaperAggregates') -> 'PaperAggregates':
+        """Fold aggregates built over a disjoint set of papers into this one"""
+        self.paper_count += other.paper_count
+        self.year_counts.update(other.year_counts)
+        self.source_counts.update(other.source_counts)
+        self.journal_counts.update(other.journal_counts)
+        self.author_counts.update(other.author_counts)
+        self.token_counts.update(other.token_counts)
+        self.citations.merge(other.citations)
+        for source, sketch in other.source_citations.items():
+            self.source_citations[source].merge(sketch)
+        for name, details in other.author_details.items():
+            mine = self.author_details.get(name)
+            if mine is None:
+                self.author_details[name] = {'affiliation': details['affiliation'],
+                                             'papers': list(details['papers'])}
+            else:
+                mine['papers'].extend(details['papers'])
+        self.papers_with_doi += other.papers_with_doi
+        self.papers_with_abstract += other.papers_with_abstract
+        self.papers_with_url += other.papers_with_url
+        
+        # Other's positions follow this aggregate's papers
+        offset = self.paper_count - other.paper_count
+        for citations, position, paper in other._top_cited:
+            self._push_top_cited((citations, position - offset, paper))
+        return self
+    
+    def copy(self) -> 'PaperAggregates':
+        """Independent copy, so it can grow while the original stays in use"""
+        return PaperAggregates(self.token_counter).merge(self)
+    
+    def _push_top_cited(self, entry: Tuple[int, int, Dict[str, Any]]):
+        if len(self._top_cited) < TOP_CITED_KEPT:
+            heapq.heappush(self._top_cited, entry)
+        elif entry[:2] > self._top_cited[0][:2]:
+            heapq.heapreplace(self._top_cited, entry)
+    
+    def year_range(self, min_year: int = 0, max_year: int = 9999) -> Optional[Tuple[int, int]]:
+        """(min, max) of the years within the given bounds, or None"""
+        years = [y for y in self.year_counts if min_year <= y <= max_year]
+        if not years:
+            return None
+        return min(years), max(years)
+    
+    def top_cited(self, n: int = 10) -> List[Dict[str, Any]]:
+        """Most cited papers, most cited first (at most TOP_CITED_KEPT)"""
+        ranked = sorted(self._top_cited, key=lambda entry: entry[:2], reverse=True)
+        return [paper for _, _, paper in ranked[:n]]
+    
+    def top_journals(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Most frequent journals with their paper counts"""
+        return self.journal_counts.most_common(n)
+    
+    def top_authors(self, n: int = 5) -> List[Dict[str, Any]]:
+        """Most frequent authors with affiliation and paper titles"""
+        return [
+            {
+                'name': name,
+                'affiliation': self.author_details[name]['affiliation'],
+                'paper_count': count,
+                'papers': list(self.author_details[name]['papers'])
+            }
+            for name, count in self.author_counts.most_common(n)
+        ]
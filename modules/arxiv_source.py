@@ -2,11 +2,15 @@
 arXiv Data Source Implementation
 """
 
+import logging
 import requests
 import xml.etree.ElementTree as ET
 from typing import List, Dict, Optional, Any
 
 from .base_source import BaseSource, SearchResult
+from . import metrics
+
+logger = logging.getLogger(__name__)
 
 
 class ArxivSource(BaseSource):
@@ -20,6 +24,7 @@ class ArxivSource(BaseSource):
             "enabled": True,
             "max_results_per_request": 1000,
             "delay_between_requests": 3,
+            "base_url": "http://export.arxiv.org/api/query",
         }
     
     def search(self, query: str, max_results: int = 100, from_year: Optional[int] = None,
@@ -36,14 +41,14 @@ class ArxivSource(BaseSource):
         if not self.is_enabled():
             return []
         
-        print(f"[arXiv] Searching for: {query} (type: {search_type})")
+        logger.info("Searching for: %s", query, extra={'source': self.source_name, 'search_type': search_type})
         
         try:
             results = []
             start = 0
             
             while len(results) < max_results:
-                url = "http://export.arxiv.org/api/query"
+                url = self.get_base_url()
                 
                 # Build search query based on type
                 search_query = self._build_arxiv_query(query, search_type)
@@ -58,41 +63,41 @@ class ArxivSource(BaseSource):
                 
                 try:
                     response = self.make_request(url, params)
-                    root = ET.fromstring(response.content)
-                    
-                    entries = root.findall('.//{http://www.w3.org/2005/Atom}entry')
-                    
-                    for entry in entries:
-                        result = self._parse_arxiv_entry(entry)
-                        if result:
-                            # Apply year filter if specified
-                            if from_year and result.publication_date:
-                                try:
-                                    pub_year = int(result.publication_date.split('-')[0])
-                                    if pub_year < from_year:
-                                        continue
-                                except (ValueError, IndexError):
-                                    pass
-                            
-                            results.append(result)
-                            if len(results) >= max_results:
-                                break
+                    with metrics.timer('source_parse_seconds', source=self.source_name):
+                        root = ET.fromstring(response.content)
+                        
+                        entries = root.findall('.//{http://www.w3.org/2005/Atom}entry')
+                        
+                        for entry in entries:
+                            result = self._parse_arxiv_entry(entry)
+                            if result:
+                                # Apply year filter if specified
+                                if from_year and result.publication_date:
+                                    try:
+                                        pub_year = int(result.publication_date.split('-')[0])
+                                        if pub_year < from_year:
+                                            continue
+                                    except (ValueError, IndexError):
+                                        pass
+                                
+                                results.append(result)
+                                if len(results) >= max_results:
+                                    break
                     
                     if len(entries) < 1000:
                         break
-                        
-                    start += len(entries)
-                    self.delay_request()
                     
+                    start += len(entries)
+                
                 except requests.exceptions.RequestException as e:
-                    print(f"[arXiv] Error fetching results: {e}")
+                    logger.error("Error fetching results: %s", e, extra={'source': self.source_name})
                     break
-                    
-            print(f"[arXiv] Found {len(results)} results")
-            return results[:max_results]
             
+            logger.info("Found %d results", len(results), extra={'source': self.source_name})
+            return results[:max_results]
+        
         except Exception as e:
-            print(f"[arXiv] Error: {e}")
+            logger.error("Error: %s", e, extra={'source': self.source_name})
             return []
     
     def _build_arxiv_query(self, query: str, search_type: str) -> str:
@@ -173,8 +178,8 @@ class ArxivSource(BaseSource):
                 source="arXiv",
                 raw_data={'arxiv_id': arxiv_id}
             )
-            
+        
         except Exception as e:
-            print(f"[arXiv] Error parsing entry: {e}")
+            logger.error("Error parsing entry: %s", e, extra={'source': self.source_name})
             return None
 
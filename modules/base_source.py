@@ -4,10 +4,16 @@ Base Source Class for Sintesa Data Sources
 
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional, Any
+import logging
+import threading
 import time
 import requests
 from dataclasses import dataclass
 
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class SearchResult:
@@ -24,6 +30,53 @@ class SearchResult:
     raw_data: Dict[str, Any]
 
 
+class RateLimiter:
+    """
+    Minimum interval between request starts to one source.
+    
+    Shared by every instance of a source (see get_rate_limiter), so
+    concurrent searches queue up for request slots instead of each
+    keeping its own delay and together exceeding the source's limit.
+    """
+    
+    def __init__(self, name: str, min_interval: float):
+        self.name = name
+        self.min_interval = min_interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+        
+        self.waits = 0
+        self.total_wait = 0.0
+    
+    def wait(self) -> float:
+        """Block until the next request slot; returns the seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+            delay = slot - now
+            if delay > 0:
+                self.waits += 1
+                self.total_wait += delay
+        if delay > 0:
+            metrics.observe('rate_limit_wait_seconds', delay, source=self.name)
+            time.sleep(delay)
+        return delay
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(source_name: str, min_interval: float) -> RateLimiter:
+    """The process-wide rate limiter of a source, created on first use"""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(source_name)
+        if limiter is None:
+            limiter = _rate_limiters[source_name] = RateLimiter(source_name, min_interval)
+        return limiter
+
+
 class BaseSource(ABC):
     """
     Abstract base class for all data sources.
@@ -37,6 +90,7 @@ class BaseSource(ABC):
         self.session.headers.update({
             'User-Agent': 'Sintesa/1.0 (Academic Research Tool)'
         })
+        self.rate_limiter = get_rate_limiter(self.source_name, self.get_delay_between_requests())
     
     @property
     @abstractmethod
@@ -76,14 +130,14 @@ class BaseSource(ABC):
             self.source_config.get('delay_between_requests', 1.0)
         )
     
-    def delay_request(self):
-        """Apply delay between requests"""
-        delay = self.get_delay_between_requests()
-        if delay > 0:
-            time.sleep(delay)
+    def get_base_url(self) -> Optional[str]:
+        """Get the API endpoint from config (e.g. a mirror or a local stub server)"""
+        return self.config.get('base_url', self.source_config.get('base_url'))
     
     def make_request(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> requests.Response:
         """Make HTTP request with error handling and rate limiting."""
+        self.rate_limiter.wait()
+        start = time.perf_counter()
         try:
             if headers:
                 request_headers = self.session.headers.copy()
@@ -93,11 +147,16 @@ class BaseSource(ABC):
             
             response = self.session.get(url, params=params, headers=request_headers, timeout=30)
             response.raise_for_status()
+            metrics.inc('source_requests_total', source=self.source_name, status='ok')
             return response
-            
+        
         except requests.exceptions.RequestException as e:
-            print(f"Request error in {self.source_name}: {e}")
+            metrics.inc('source_requests_total', source=self.source_name, status='error')
+            logger.error("Request error: %s", e, extra={'source': self.source_name})
             raise
+        finally:
+            # One request is one page of results
+            metrics.observe('source_page_seconds', time.perf_counter() - start, source=self.source_name)
     
     def get_source_info(self) -> Dict[str, Any]:
         """Get information about this data source."""
@@ -0,0 +1,234 @@
+"""
+Corpus IDF Module for Sintesa
+Document-frequency table built up over every paper ever fetched
+"""
+
+from typing import List, Dict, Optional, Iterable
+from collections import Counter, OrderedDict
+from array import array
+from pathlib import Path
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusIDF:
+    """
+    Persisted document-frequency table for TF-IDF keyword scoring.
+    
+    Each paper is counted once, identified by a 64-bit hash of its key, so
+    refetching the same papers does not skew the table. Only the max_docs
+    most recently seen hashes are remembered: a paper not fetched since
+    older ones aged out is counted again, a small skew traded for memory
+    and save time that stay bounded as the corpus grows. The table is kept
+    as gzipped JSON under the cache directory; save() writes it at most once
+    per save_interval and only when it changed, and it is flushed at exit.
+    """
+    
+    def __init__(self, path: Optional[Path] = None, max_terms: int = 200000,
+                 max_docs: int = 500000, save_interval: float = 60.0):
+        """
+        Args:
+            path: File the table is loaded from and saved to (None: memory only)
+            max_terms: Cap on stored terms; the rarest are pruned on save
+            max_docs: Document hashes remembered; the least recently seen age out
+            save_interval: Minimum seconds between writes by save()
+        """
+        self.path = Path(path) if path else None
+        self.max_terms = max_terms
+        self.max_docs = max_docs
+        self.save_interval = save_interval
+        
+        self.n_docs = 0
+        self.df = Counter()
+        # Document hashes, least recently seen first
+        self._seen = OrderedDict()
+        self._dirty = False
+        self._last_save = 0.0
+        self._lock = threading.Lock()
+        # Serializes writes, so a slow save never races a newer one
+        self._save_lock = threading.Lock()
+        
+        self._load()
+        if self.path is not None:
+            atexit.register(self.flush)
+    
+    def add_document(self, key: str, terms: Iterable[str]) -> bool:
+        """
+        Count a document's distinct terms once.
+        
+        Returns:
+            True if the document was new to the table
+        """
+        doc_hash = self._hash(key)
+        with self._lock:
+            if doc_hash in self._seen:
+                self._seen.move_to_end(doc_hash)
+                return False
+            self._remember(doc_hash)
+            self.n_docs += 1
+            self.df.update(set(terms))
+            self._dirty = True
+        return True
+    
+    def claim_documents(self, keys: List[str]) -> List[bool]:
+        """
+        Mark documents as counted before their terms are known.
+        
+        Used by parallel counting: workers compute document frequencies
+        for the claimed documents, which are then added with add_frequencies(),
+        or the claims are undone with release_documents() if counting fails.
+        
+        Returns:
+            For each key, True if the document was new to the table
+        """
+        hashes = [self._hash(key) for key in keys]
+        claimed = []
+        with self._lock:
+            for doc_hash in hashes:
+                is_new = doc_hash not in self._seen
+                if is_new:
+                    self._remember(doc_hash)
+                    self.n_docs += 1
+                else:
+                    self._seen.move_to_end(doc_hash)
+                claimed.append(is_new)
+            self._dirty = True
+        return claimed
+    
+    def release_documents(self, keys: List[str], claimed: List[bool]):
+        """Undo claim_documents() for documents whose frequencies were never added"""
+        hashes = [self._hash(key) for key, is_new in zip(keys, claimed) if is_new]
+        with self._lock:
+            for doc_hash in hashes:
+                if doc_hash in self._seen:
+                    del self._seen[doc_hash]
+                    self.n_docs -= 1
+    
+    def add_frequencies(self, df: Counter):
+        """Add document frequencies of documents claimed with claim_documents()"""
+        with self._lock:
+            self.df.update(df)
+            self._dirty = True
+    
+    def idf(self, terms: List[str]) -> np.ndarray:
+        """Smoothed inverse document frequency for each term"""
+        with self._lock:
+            n_docs = self.n_docs
+            df = np.fromiter((self.df.get(t, 0) for t in terms), dtype=np.float64, count=len(terms))
+        return np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+    
+    def score(self, term_counts: Counter) -> Dict[str, float]:
+        """TF-IDF score for every term of a result set's term counts"""
+        if not term_counts:
+            return {}
+        terms = list(term_counts)
+        tf = np.fromiter(term_counts.values(), dtype=np.float64, count=len(terms))
+        scores = tf * self.idf(terms)
+        return dict(zip(terms, scores.tolist()))
+    
+    def save(self, force: bool = False):
+        """
+        Write the table to disk if it changed since the last save
+        
+        Args:
+            force: Write even if the last save is more recent than save_interval
+        """
+        if self.path is None or not self._dirty:
+            return
+        if not force and time.monotonic() - self._last_save < self.save_interval:
+            return
+        
+        with self._save_lock:
+            self._write()
+    
+    def flush(self):
+        """Write pending changes now (called at exit)"""
+        self.save(force=True)
+    
+    def _remember(self, doc_hash: int):
+        """Record a new document hash, aging out the least recently seen (call with _lock held)"""
+        self._seen[doc_hash] = None
+        if len(self._seen) > self.max_docs:
+            self._seen.popitem(last=False)
+    
+    def _write(self):
+        # Only the copies are taken under the lock; pruning and encoding
+        # run without it so add_document() and idf() are not stalled
+        with self._lock:
+            if not self._dirty:
+                return
+            n_docs = self.n_docs
+            df = dict(self.df)
+            seen = array('Q', self._seen)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        
+        if len(df) > self.max_terms:
+            # Terms seen in the fewest documents carry the least signal
+            kept = dict(Counter(df).most_common(self.max_terms))
+            pruned = [term for term in df if term not in kept]
+            df = kept
+            with self._lock:
+                for term in pruned:
+                    self.df.pop(term, None)
+        data = {
+            'version': 1,
+            'n_docs': n_docs,
+            'df': df,
+            # Least recently seen first, so aging carries over restarts
+            'seen': base64.b64encode(seen.tobytes()).decode('ascii')
+        }
+        
+        tmp_path = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.path.parent, prefix=self.path.name,
+                                             suffix='.tmp', delete=False) as tmp:
+                tmp_path = tmp.name
+                with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # Changes stay pending for the next save
+            with self._lock:
+                self._dirty = True
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+            logger.warning("Could not save document frequencies: %s", e)
+    
+    def _load(self):
+        """Load the table from disk, starting empty if missing or unreadable"""
+        if self.path is None or not self.path.exists():
+            return
+        
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            seen = array('Q')
+            seen.frombytes(base64.b64decode(data.get('seen', '')))
+            self.n_docs = int(data.get('n_docs', 0))
+            self.df = Counter(data.get('df', {}))
+            # Older files hold more hashes than max_docs or are sorted by value
+            self._seen = OrderedDict.fromkeys(seen[-self.max_docs:])
+            logger.info("Loaded document frequencies", extra={'papers': self.n_docs})
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Could not load document frequencies, starting fresh: %s", e)
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
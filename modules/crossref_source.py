@@ -4,9 +4,13 @@ CrossRef Data Source Implementation
 
 import requests
 from typing import List, Dict, Optional, Any
+import logging
 import re
 
 from .base_source import BaseSource, SearchResult
+from . import metrics
+
+logger = logging.getLogger(__name__)
 
 
 class CrossrefSource(BaseSource):
@@ -20,6 +24,7 @@ class CrossrefSource(BaseSource):
             "enabled": True,
             "max_results_per_request": 500,
             "delay_between_requests": 1.5,
+            "base_url": "https://api.crossref.org/works",
         }
     
     def search(self, query: str, max_results: int = 100, from_year: Optional[int] = None,
@@ -36,7 +41,7 @@ class CrossrefSource(BaseSource):
         if not self.is_enabled():
             return []
         
-        print(f"[CrossRef] Searching for: {query} (type: {search_type})")
+        logger.info("Searching for: %s", query, extra={'source': self.source_name, 'search_type': search_type})
         
         try:
             results = []
@@ -44,7 +49,7 @@ class CrossrefSource(BaseSource):
             rows = min(max_results, self.get_max_results_per_request())
             
             while len(results) < max_results and start < 10000:
-                url = "https://api.crossref.org/works"
+                url = self.get_base_url()
                 
                 # Build query based on search type
                 params = self._build_query_params(query, search_type, rows, start, max_results - len(results))
@@ -58,29 +63,29 @@ class CrossrefSource(BaseSource):
                 
                 try:
                     response = self.make_request(url, params)
-                    data = response.json()
-                    
-                    if 'message' in data and 'items' in data['message']:
-                        for item in data['message']['items']:
-                            result = self._parse_crossref_item(item)
-                            if result:
-                                results.append(result)
+                    with metrics.timer('source_parse_seconds', source=self.source_name):
+                        data = response.json()
+                        
+                        if 'message' in data and 'items' in data['message']:
+                            for item in data['message']['items']:
+                                result = self._parse_crossref_item(item)
+                                if result:
+                                    results.append(result)
                     
                     if len(data.get('message', {}).get('items', [])) < rows:
                         break
-                        
-                    start += rows
-                    self.delay_request()
                     
+                    start += rows
+                
                 except requests.exceptions.RequestException as e:
-                    print(f"[CrossRef] Error fetching results: {e}")
+                    logger.error("Error fetching results: %s", e, extra={'source': self.source_name})
                     break
-                    
-            print(f"[CrossRef] Found {len(results)} results")
-            return results[:max_results]
             
+            logger.info("Found %d results", len(results), extra={'source': self.source_name})
+            return results[:max_results]
+        
         except Exception as e:
-            print(f"[CrossRef] Error: {e}")
+            logger.error("Error: %s", e, extra={'source': self.source_name})
             return []
     
     def _build_query_params(self, query: str, search_type: str, rows: int, offset: int, 
@@ -174,8 +179,8 @@ class CrossrefSource(BaseSource):
                 source="CrossRef",
                 raw_data=item
             )
-            
+        
         except Exception as e:
-            print(f"[CrossRef] Error parsing item: {e}")
+            logger.error("Error parsing item: %s", e, extra={'source': self.source_name})
             return None
 
@@ -6,21 +6,38 @@ Handles fetching papers from various academic sources
 from typing import List, Dict, Optional, Any
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
+import logging
+import time
 
+from .base_source import BaseSource
 from .crossref_source import CrossrefSource
 from .arxiv_source import ArxivSource
 from .scholar_source import ScholarSource
+from . import metrics
+
+logger = logging.getLogger(__name__)
 
 
 class DataFetcher:
     """Simple data fetcher for academic papers"""
     
-    def __init__(self):
-        self.sources = {
-            'crossref': CrossrefSource(),
-            'arxiv': ArxivSource(),
-            'scholar': ScholarSource()
-        }
+    def __init__(self, sources: Optional[Dict[str, BaseSource]] = None,
+                 source_config: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            sources: Sources by name (default: CrossRef, arXiv and Google
+                Scholar); tests and benchmarks pass stubbed sources here
+            source_config: Configuration of the default sources by name,
+                e.g. {'crossref': {'base_url': 'http://127.0.0.1:8800/works'}}
+        """
+        if sources is None:
+            source_config = source_config or {}
+            sources = {
+                'crossref': CrossrefSource(source_config.get('crossref')),
+                'arxiv': ArxivSource(source_config.get('arxiv')),
+                'scholar': ScholarSource(source_config.get('scholar'))
+            }
+        self.sources = sources
     
     def search(self, query: str, source: str = 'all', max_results: int = 100, 
                from_year: Optional[int] = None, search_type: str = 'all') -> List[Dict[str, Any]]:
@@ -33,14 +50,16 @@ class DataFetcher:
             max_results: Maximum number of results
             from_year: Filter papers from this year onwards
             search_type: Type of search - 'all', 'title', 'author', 'journal', 'keywords'
-            
+        
         Returns:
             List of paper dictionaries
         """
-        print(f"\n{'='*60}")
-        print(f"Searching for: {query}")
-        print(f"Source: {source} | Type: {search_type} | Max results: {max_results} | From year: {from_year or 'Any'}")
-        print(f"{'='*60}\n")
+        logger.info(
+            "Searching for: %s", query,
+            extra={'source': source, 'search_type': search_type,
+                   'max_results': max_results, 'from_year': from_year}
+        )
+        start = time.perf_counter()
         
         results = []
         
@@ -50,7 +69,7 @@ class DataFetcher:
             num_sources = len(self.sources)
             max_per_source = max(1, max_results // num_sources)
             
-            print(f"Dividing {max_results} results among {num_sources} sources ({max_per_source} per source)")
+            logger.info("Dividing results among sources", extra={'max_results': max_results, 'sources': num_sources, 'per_source': max_per_source})
             
             with ThreadPoolExecutor(max_workers=2) as executor:
                 future_to_source = {
@@ -63,29 +82,34 @@ class DataFetcher:
                     try:
                         source_results = future.result()
                         results.extend(source_results)
-                        print(f"[OK] {src_name}: {len(source_results)} papers")
+                        logger.info("Source returned %d papers", len(source_results), extra={'source': src_name})
                     except Exception as e:
-                        print(f"[ERROR] {src_name}: Error - {e}")
+                        logger.error("Source failed: %s", e, extra={'source': src_name})
         
         else:
             # Search specific source
             if source in self.sources:
                 results = self._search_source(source, query, max_results, from_year, search_type)
-                print(f"[OK] {source}: {len(results)} papers")
+                logger.info("Source returned %d papers", len(results), extra={'source': source})
             else:
-                print(f"[ERROR] Unknown source: {source}")
+                logger.error("Unknown source: %s", source)
         
         # Remove duplicates
-        unique_results = self._remove_duplicates(results)
+        with metrics.timer('dedup_seconds'):
+            unique_results = self._remove_duplicates(results)
         
         # Limit results to max_results if exceeded
         if len(unique_results) > max_results:
             unique_results = unique_results[:max_results]
-            print(f"Limited results to {max_results} papers")
+            logger.info("Limited results to %d papers", max_results)
         
-        print(f"\n{'='*60}")
-        print(f"Total: {len(results)} papers (after deduplication: {len(unique_results)})")
-        print(f"{'='*60}\n")
+        elapsed = time.perf_counter() - start
+        metrics.observe('search_seconds', elapsed, source=source)
+        logger.info(
+            "Search finished",
+            extra={'papers': len(results), 'unique_papers': len(unique_results),
+                   'duration_ms': round(elapsed * 1000, 1)}
+        )
         
         return unique_results
     
@@ -94,7 +118,8 @@ class DataFetcher:
         """Search a single source."""
         try:
             source = self.sources[source_name]
-            search_results = source.search(query, max_results, from_year, search_type)
+            with metrics.timer('source_search_seconds', source=source_name):
+                search_results = source.search(query, max_results, from_year, search_type)
             
             # Convert SearchResult objects to dictionaries
             papers = []
@@ -112,10 +137,12 @@ class DataFetcher:
                 }
                 papers.append(paper_dict)
             
+            metrics.inc('source_papers_total', len(papers), source=source_name)
             return papers
-            
+        
         except Exception as e:
-            print(f"Error searching {source_name}: {e}")
+            metrics.inc('source_errors_total', source=source_name)
+            logger.error("Error searching source: %s", e, extra={'source': source_name})
             return []
     
     def _remove_duplicates(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -0,0 +1,295 @@
+"""
+Export Jobs Module for Sintesa
+Background export jobs: one worker process per format, polled for progress
+"""
+
+from typing import List, Dict, Optional, Any
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+import copy
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+import zipfile
+
+from .exporter import Exporter, EXPORT_FORMATS
+from .statistics import StatisticsEngine
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Formats whose writers read the result set's aggregates (summary sheet, report, metadata)
+AGGREGATE_FORMATS = frozenset({'excel', 'json', 'pdf'})
+
+
+class ExportQueueFull(RuntimeError):
+    """Too many formats are running or waiting for a worker; retry later"""
+
+
+class ExportJob:
+    """State of one export job; formats finish independently"""
+    
+    def __init__(self, job_id: str, formats: List[str], bundle: bool):
+        self.id = job_id
+        self.formats = formats
+        self.bundle = bundle
+        self.status = 'running'
+        self.results = {
+            format: {'status': 'pending', 'filepath': None, 'error': None}
+            for format in formats
+        }
+        self.bundle_path = None
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+    
+    @property
+    def completed(self) -> int:
+        return sum(1 for result in self.results.values() if result['status'] in ('done', 'failed'))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'formats': list(self.formats),
+            'completed': self.completed,
+            'total': len(self.formats),
+            'results': {format: dict(result) for format, result in self.results.items()},
+            'bundle_path': self.bundle_path,
+            'error': self.error,
+            'elapsed': round(end - self.started_at, 2)
+        }
+
+
+class ExportJobManager:
+    """
+    Runs exports in the background so bridge calls return immediately.
+    
+    Every format of a job runs in its own worker process, so a job takes
+    about as long as its slowest format. Progress is read with get().
+    The exports directory size cap is enforced here once a job is bundled,
+    never by the workers, so no file of a running job is deleted early.
+    The papers and their aggregates are serialized once per job and the
+    aggregates come from the shared statistics engine, so workers neither
+    re-pickle the result set per format nor recompute the aggregates.
+    """
+    
+    def __init__(self, output_dir: str, max_workers: Optional[int] = None, max_jobs: int = 50,
+                 exporter_options: Optional[Dict[str, Any]] = None,
+                 statistics: Optional[StatisticsEngine] = None, max_pending: Optional[int] = None):
+        """
+        Args:
+            output_dir: Directory exports and bundles are written to
+            max_workers: Export worker processes (default: CPU count, at most 4)
+            max_jobs: Finished jobs remembered for polling
+            exporter_options: Exporter settings used in the workers
+                (cache_max_age, max_dir_bytes)
+            statistics: Statistics engine shared with the rest of the app,
+                whose cached aggregates are handed to the workers
+            max_pending: Formats running or queued across all jobs before
+                start() refuses new jobs (default: 4 per worker)
+        """
+        self.output_dir = Path(output_dir)
+        self.exporter_options = exporter_options or {}
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending or self.max_workers * 4
+        self.statistics = statistics or StatisticsEngine()
+        
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+    
+    def start(self, papers: List[Dict], formats: List[str], options: Optional[Dict[str, Dict]] = None,
+              bundle: bool = False) -> str:
+        """
+        Start exporting papers to every format
+        
+        Args:
+            papers: Papers to export
+            formats: Export formats, e.g. ['csv', 'excel', 'pdf']
+            options: Exporter options per format, e.g. {'csv': {'compress': True}}
+            bundle: Also package all exported files into one zip
+        
+        Returns:
+            Job id for get()
+        
+        Raises:
+            ExportQueueFull: max_pending formats are already running or queued
+        """
+        formats = list(dict.fromkeys(formats))
+        unknown = [format for format in formats if format not in EXPORT_FORMATS]
+        if not formats or unknown:
+            raise ValueError(f"Unsupported export formats: {unknown or formats}")
+        options = options or {}
+        
+        job = ExportJob(uuid.uuid4().hex[:12], formats, bundle)
+        with self._lock:
+            pending = self.pending()
+            # A job larger than max_pending still runs when nothing else is pending
+            if pending and pending + len(formats) > self.max_pending:
+                metrics.inc('export_jobs_rejected_total')
+                raise ExportQueueFull(f"{pending} export formats already pending, retry shortly")
+            self._jobs[job.id] = job
+            self._prune()
+            executor = self._get_executor()
+        
+        futures = {}
+        try:
+            aggregates = None
+            if AGGREGATE_FORMATS.intersection(formats):
+                # Copy without the token counter, which holds app state and does not pickle
+                aggregates = copy.copy(self.statistics.aggregates(papers))
+                aggregates.token_counter = None
+            payload = pickle.dumps((papers, aggregates), protocol=pickle.HIGHEST_PROTOCOL)
+            
+            worker_options = dict(self.exporter_options, max_dir_bytes=None)
+            for format in formats:
+                future = executor.submit(_run_export, str(self.output_dir), worker_options,
+                                         format, payload, options.get(format, {}))
+                futures[future] = format
+        except Exception as e:
+            for future in futures:
+                future.cancel()
+            if isinstance(e, BrokenProcessPool):
+                self._discard_executor(executor)
+            self._fail(job, str(e))
+            raise
+        
+        with self._lock:
+            for format in formats:
+                job.results[format]['status'] = 'running'
+        
+        threading.Thread(target=self._watch, args=(job, executor, futures), daemon=True).start()
+        logger.info("Started export job", extra={'job_id': job.id, 'formats': ','.join(formats)})
+        return job.id
+    
+    def pending(self) -> int:
+        """Formats running or waiting for a worker, across all jobs (call with _lock held)"""
+        return sum(
+            1 for job in self._jobs.values() if job.status == 'running'
+            for result in job.results.values() if result['status'] in ('pending', 'running')
+        )
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+    
+    def shutdown(self):
+        """Stop the worker processes (running exports are finished first)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+    
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """Drop a pool whose worker died so the next job starts a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+    
+    def _fail(self, job: ExportJob, error: str):
+        """Close a job that could not be handed to the workers"""
+        with self._lock:
+            for result in job.results.values():
+                result.update({'status': 'failed', 'error': error})
+            job.error = error
+            job.status = 'failed'
+            job.finished_at = time.time()
+        logger.error("Could not start export job: %s", error, extra={'job_id': job.id})
+    
+    def _watch(self, job: ExportJob, executor: ProcessPoolExecutor, futures: Dict):
+        """Record each format as it finishes, then bundle and close the job"""
+        for future in as_completed(futures):
+            format = futures[future]
+            # Includes time spent waiting for a free worker
+            metrics.observe('export_job_seconds', time.time() - job.started_at, format=format)
+            try:
+                filepath = future.result()
+                update = {'status': 'done', 'filepath': filepath}
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self._discard_executor(executor)
+                logger.error("Export failed: %s", e, extra={'job_id': job.id, 'format': format})
+                update = {'status': 'failed', 'error': str(e)}
+            with self._lock:
+                job.results[format].update(update)
+        
+        files = [result['filepath'] for result in job.results.values() if result['filepath']]
+        bundle_path = None
+        error = None
+        if job.bundle and files:
+            try:
+                bundle_path = self._bundle(files)
+            except OSError as e:
+                error = f"Could not create bundle: {e}"
+        
+        with self._lock:
+            job.bundle_path = bundle_path
+            job.error = error
+            job.status = 'done' if files and error is None else 'failed'
+            job.finished_at = time.time()
+        self._enforce_retention(job)
+        logger.info("Export job %s", job.status, extra={
+            'job_id': job.id, 'duration_ms': round((job.finished_at - job.started_at) * 1000, 1)
+        })
+    
+    def _enforce_retention(self, finished: ExportJob):
+        """Apply the exports size cap, sparing the finished job's files and those of running jobs"""
+        max_dir_bytes = self.exporter_options.get('max_dir_bytes')
+        if not max_dir_bytes:
+            return
+        with self._lock:
+            keep = [
+                Path(result['filepath']) for job in self._jobs.values()
+                if job.status == 'running' or job is finished
+                for result in job.results.values() if result['filepath']
+            ]
+            if finished.bundle_path:
+                keep.append(Path(finished.bundle_path))
+        try:
+            Exporter(str(self.output_dir), max_dir_bytes=max_dir_bytes).enforce_retention(keep)
+        except OSError as e:
+            logger.warning("Could not apply export retention: %s", e)
+    
+    def _bundle(self, files: List[str]) -> str:
+        """Zip exported files together"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        bundle_path = self.output_dir / f"export_{timestamp}_{uuid.uuid4().hex[:6]}.zip"
+        with zipfile.ZipFile(bundle_path, 'w', zipfile.ZIP_DEFLATED) as bundle:
+            for filepath in files:
+                bundle.write(filepath, arcname=Path(filepath).name)
+        return str(bundle_path)
+    
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_jobs"""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].status != 'running':
+                del self._jobs[job_id]
+
+
+def _run_export(output_dir: str, exporter_options: Dict[str, Any], format: str,
+                payload: bytes, options: Dict) -> str:
+    """Worker process entry point: export the pickled (papers, aggregates) to one format"""
+    papers, aggregates = pickle.loads(payload)
+    statistics = StatisticsEngine()
+    if aggregates is not None:
+        statistics.seed(papers, aggregates)
+    return Exporter(output_dir, statistics=statistics, **exporter_options).export(format, papers, **options)
@@ -5,239 +5,694 @@ Export data to various formats
 
 import pandas as pd
 from pathlib import Path
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict
+from itertools import islice
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+import csv
+import gzip
+import hashlib
+import heapq
 import json
+import logging
 import os
 import platform
+import re
+import shutil
 import subprocess
+import tempfile
+import time
+import unicodedata
+import uuid
+
+from .aggregates import author_name_and_affiliation, paper_year
+from .statistics import StatisticsEngine
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    JSON_ENCODER = 'orjson'
+except ImportError:
+    JSON_ENCODER = 'json'
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("pyarrow not available - Parquet/Feather export will be disabled")
+
+# CSV columns in display order; any other paper fields follow these
+CSV_COLUMNS = ['title', 'authors', 'publication_date', 'year',
+               'journal', 'citations', 'source', 'doi', 'url', 'abstract']
+
+# Formats accepted by Exporter.export()
+EXPORT_FORMATS = ('csv', 'excel', 'json', 'jsonl', 'parquet', 'feather', 'pdf', 'bibtex', 'ris')
+
+# File name stem and extension of each format
+EXPORT_FILE_NAMES = {
+    'csv': ('papers', 'csv'),
+    'excel': ('papers', 'xlsx'),
+    'json': ('papers', 'json'),
+    'jsonl': ('papers', 'jsonl'),
+    'parquet': ('papers', 'parquet'),
+    'feather': ('papers', 'feather'),
+    'pdf': ('report', 'pdf'),
+    'bibtex': ('references', 'bib'),
+    'ris': ('references', 'ris')
+}
+
+# Files in the exports directory managed by the retention policy
+EXPORT_FILE_PREFIXES = ('papers_', 'report_', 'export_', 'references_')
+
+# Suffix of exports still being written
+PARTIAL_SUFFIX = '.partial'
+
+# BibTeX special characters, and line breaks (never valid inside a field)
+BIBTEX_ESCAPES = str.maketrans({
+    '\\': r'\textbackslash{}',
+    '{': r'\{',
+    '}': r'\}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+    '\n': ' ',
+    '\r': ' ',
+    '\t': ' '
+})
+
+# BibTeX fields biblatex and hyperref read verbatim; only whitespace is
+# normalized, and unbalanced braces are dropped so the entry still parses
+BIBTEX_VERBATIM_FIELDS = frozenset({'doi', 'url'})
+BIBTEX_VERBATIM_ESCAPES = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+
+# RIS values are single lines
+RIS_ESCAPES = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+
+# Characters dropped from citation keys after ASCII folding
+_CITATION_KEY_JUNK = re.compile(r'[^a-z0-9]+')
+
+CSV_SORT_MODES = ('memory', 'external', 'none')
+
+EXCEL_HEADER_FONT = Font(bold=True)
+
+COLUMNAR_FORMATS = ('parquet', 'feather')
+
+# Low-cardinality text columns stored dictionary-encoded
+COLUMNAR_DICTIONARY_COLUMNS = ('journal', 'source')
+
+
+# Characters the built-in PDF fonts cannot render, and their replacements
+PDF_TEXT_REPLACEMENTS = str.maketrans({
+    '\u2018': "'",
+    '\u2019': "'",
+    '\u201c': '"',
+    '\u201d': '"',
+    '–': '-',
+    '—': '-',
+    '…': '...',
+    '°': ' degrees',
+    '±': '+/-',
+    '×': 'x',
+    '÷': '/',
+    '≤': '<=',
+    '≥': '>=',
+    '≠': '!=',
+    '≈': '~',
+    '∞': 'infinity',
+    'α': 'alpha',
+    'β': 'beta',
+    'γ': 'gamma',
+    'δ': 'delta',
+    'ε': 'epsilon',
+    'θ': 'theta',
+    'λ': 'lambda',
+    'μ': 'mu',
+    'π': 'pi',
+    'σ': 'sigma',
+    'τ': 'tau',
+    'φ': 'phi',
+    'χ': 'chi',
+    'ψ': 'psi',
+    'ω': 'omega'
+})
+
+# Cursor movement after a cell, by the legacy ln argument
+PDF_LINE_BREAKS = {
+    0: (XPos.RIGHT, YPos.TOP),
+    1: (XPos.LMARGIN, YPos.NEXT),
+    2: (XPos.LEFT, YPos.NEXT)
+}
+
+# Paper list entries laid out per batch in PDF reports
+PDF_LISTING_BATCH = 200
+
+def _citation_count(paper: Dict) -> int:
+    try:
+        return int(paper.get('citations') or 0)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _most_cited_first(paper: Dict) -> int:
+    return -_citation_count(paper)
+
+
+def _encode_json(value) -> bytes:
+    """Compact UTF-8 JSON, with orjson when available"""
+    if JSON_ENCODER == 'orjson':
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def _author_names(paper: Dict) -> List[str]:
+    authors = paper.get('authors')
+    if not isinstance(authors, list):
+        return []
+    names = (author_name_and_affiliation(author)[0] for author in authors)
+    return [name for name in names if name]
+
+
+def _bibtex_value(field: str, value: str) -> str:
+    """Escape a text field; DOIs and URLs stay verbatim with balanced braces"""
+    if field not in BIBTEX_VERBATIM_FIELDS:
+        return value.translate(BIBTEX_ESCAPES)
+    value = value.translate(BIBTEX_VERBATIM_ESCAPES)
+    depth = 0
+    for char in value:
+        depth += {'{': 1, '}': -1}.get(char, 0)
+        if depth < 0:
+            break
+    if depth:
+        value = value.replace('{', '').replace('}', '')
+    return value
+
+
+class CitationKeys:
+    """
+    Collision-free citation keys: lastname + year + first title word.
+    
+    Generated keys are kept in a hash index; a key already taken gets the
+    next free letter suffix (smith2020deep, smith2020deepa, smith2020deepb, ...).
+    """
+    
+    def __init__(self):
+        self._used = set()
+        self._suffixes = {}
+    
+    def next(self, authors: List[str], year: Optional[int], title: Optional[str]) -> str:
+        """Unique key for an entry"""
+        base = self._base(authors, year, title)
+        key = base
+        count = self._suffixes.get(base, 0)
+        while key in self._used:
+            count += 1
+            key = base + self._letters(count)
+        self._suffixes[base] = count
+        self._used.add(key)
+        return key
+    
+    @staticmethod
+    def _base(authors: List[str], year: Optional[int], title: Optional[str]) -> str:
+        last_name = ''
+        if authors:
+            name = authors[0]
+            last_name = name.split(',', 1)[0] if ',' in name else name.rsplit(' ', 1)[-1]
+        first_word = ''
+        for word in (title or '').split():
+            word = _ascii_key(word)
+            if len(word) > 3:
+                first_word = word
+                break
+        return (_ascii_key(last_name) or 'anon') + (str(year) if year else '') + first_word
+    
+    @staticmethod
+    def _letters(count: int) -> str:
+        """1 -> a, 26 -> z, 27 -> aa, ..."""
+        letters = ''
+        while count:
+            count, remainder = divmod(count - 1, 26)
+            letters = chr(ord('a') + remainder) + letters
+        return letters
+
+
+def _ascii_key(text: str) -> str:
+    """Lowercase ASCII letters and digits of text, accents folded"""
+    folded = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return _CITATION_KEY_JUNK.sub('', folded.lower())
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 class Exporter:
     """Export research data to different formats"""
     
-    def __init__(self, output_dir: str = "exports"):
+    def __init__(self, output_dir: str = "exports", statistics: StatisticsEngine = None,
+                 cache_max_age: Optional[float] = None, max_dir_bytes: Optional[int] = None):
+        """
+        Args:
+            output_dir: Directory exports are written to
+            statistics: Statistics engine shared with the rest of the app, so
+                reports reuse aggregates already computed for the result set
+            cache_max_age: Seconds an export stays reusable by export() for an
+                identical request (None: no limit)
+            max_dir_bytes: Size cap for exports in output_dir; the oldest are
+                deleted once exceeded (None: no cap)
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.statistics = statistics or StatisticsEngine()
+        self.cache_max_age = cache_max_age
+        self.max_dir_bytes = max_dir_bytes
+        
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def export(self, format: str, papers: List[Dict], **options) -> str:
+        """
+        Export papers to one of EXPORT_FORMATS
+        
+        Exports are content-addressed: the file name carries a hash of the
+        result set, format and options, so an identical request returns the
+        existing file instead of writing it again.
+        
+        Args:
+            format: Export format
+            papers: Papers to export
+            **options: Options of the format's export method
+        
+        Returns:
+            Path of the written (or reused) file
+        """
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        
+        key = self._cache_key(format, papers, options)
+        if key is not None:
+            cached = self._cached_export(key)
+            if cached is not None:
+                self.cache_hits += 1
+                logger.info("Reusing export", extra={'format': format, 'path': str(cached)})
+                return str(cached)
+            self.cache_misses += 1
+            options = dict(options, filename=self._new_filename(format, options.get('compress', False), key))
+        
+        with metrics.timer('export_seconds', format=format):
+            filepath = self._dispatch(format, papers, options)
+        self.enforce_retention(keep=[Path(filepath)])
+        return filepath
+    
+    def _dispatch(self, format: str, papers: List[Dict], options: Dict) -> str:
+        if format == 'csv':
+            return self.export_to_csv(papers, **options)
+        elif format == 'excel':
+            return self.export_to_excel(papers, **options)
+        elif format == 'json':
+            return self.export_to_json(papers, **options)
+        elif format == 'jsonl':
+            return self.export_to_jsonl(papers, **options)
+        elif format in ('parquet', 'feather'):
+            return self.export_to_columnar(papers, format, **options)
+        elif format == 'pdf':
+            return self.export_to_pdf(papers, **options)
+        elif format == 'bibtex':
+            return self.export_to_bibtex(papers, **options)
+        elif format == 'ris':
+            return self.export_to_ris(papers, **options)
+        raise ValueError(f"Unsupported format: {format}")
+    
+    def _new_filename(self, format: str, compress: bool = False, key: Optional[str] = None) -> str:
+        """Timestamped file name, made unique by the cache key or a random suffix"""
+        stem, extension = EXPORT_FILE_NAMES[format]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        suffix = key or uuid.uuid4().hex[:8]
+        return f"{stem}_{timestamp}_{suffix}.{extension}" + ('.gz' if compress else '')
     
-    def export_to_csv(self, papers: List[Dict], filename: str = None) -> str:
-        """Export papers to CSV file with improved structure"""
+    def _cache_key(self, format: str, papers, options: Dict) -> Optional[str]:
+        """Hash of result set, format and options; None if the export is not cacheable"""
+        # Iterators can only be read once, and explicit file names are the caller's choice
+        if not isinstance(papers, list) or 'filename' in options:
+            return None
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(StatisticsEngine.fingerprint(papers).encode('ascii'))
+        digest.update(format.encode('ascii'))
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _cached_export(self, key: str) -> Optional[Path]:
+        """Finished export for a cache key, unless missing or too old"""
+        for path in self.output_dir.glob(f"*_{key}.*"):
+            if path.name.endswith(PARTIAL_SUFFIX):
+                continue
+            try:
+                age = time.time() - path.stat().st_mtime
+            except OSError:
+                continue
+            if self.cache_max_age is None or age <= self.cache_max_age:
+                return path
+        return None
+    
+    @contextmanager
+    def _atomic(self, filepath: Path):
+        """
+        Yield a scratch path that replaces filepath once writing succeeds
+        
+        Readers (and the export cache) never see a half-written file.
+        """
+        tmp_path = filepath.with_name(f"{filepath.name}.{uuid.uuid4().hex[:8]}{PARTIAL_SUFFIX}")
+        try:
+            yield tmp_path
+            os.replace(tmp_path, filepath)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    def enforce_retention(self, keep: Iterable[Path] = ()):
+        """
+        Delete the oldest exports until output_dir is under max_dir_bytes
+        
+        Args:
+            keep: Files never deleted (e.g. every file of an export job not yet bundled)
+        """
+        if not self.max_dir_bytes:
+            return
+        keep = set(keep)
+        
+        files = []
+        for path in self.output_dir.iterdir():
+            if not path.name.startswith(EXPORT_FILE_PREFIXES) or path.name.endswith(PARTIAL_SUFFIX):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file():
+                files.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_dir_bytes:
+                break
+            if path in keep:
+                continue
+            try:
+                path.unlink()
+                total -= size
+                logger.info("Removed old export", extra={'path': str(path)})
+            except OSError as e:
+                logger.warning("Could not remove old export: %s", e, extra={'path': str(path)})
+    
+    def export_to_csv(self, papers: Iterable[Dict], filename: str = None, compress: bool = False,
+                      sort: str = 'memory', chunk_size: int = 5000) -> str:
+        """
+        Export papers to CSV, streaming rows to disk in chunks
+        
+        Args:
+            papers: Papers to export; any iterable (e.g. a generator over a
+                local store), consumed once
+            filename: Output file name (default: timestamped)
+            compress: Write gzip-compressed CSV
+            sort: 'memory' sorts by citations in memory, 'external' sorts by
+                citations through sorted runs on disk (flat memory), 'none'
+                keeps input order (flat memory)
+            chunk_size: Rows buffered per write and per sorted run
+        """
+        if sort not in CSV_SORT_MODES:
+            raise ValueError(f"Unknown sort mode: {sort}")
+        
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"papers_{timestamp}.csv"
+            filename = self._new_filename('csv', compress)
         
         filepath = self.output_dir / filename
         
-        # Create DataFrame
-        df = pd.DataFrame(papers)
+        rows = (self._csv_row(paper) for paper in papers)
+        if sort == 'memory':
+            rows = sorted(rows, key=_most_cited_first)
         
-        # Reorder columns for better readability
-        preferred_columns = ['title', 'authors', 'publication_date', 'year', 
-                           'journal', 'citations', 'source', 'doi', 'url', 'abstract']
+        with tempfile.TemporaryDirectory(dir=self.output_dir) as tmp_dir:
+            if sort == 'external':
+                rows = self._external_sort(rows, Path(tmp_dir), chunk_size)
+            
+            # Totals are only known once every row is written, so the body
+            # goes to a scratch file and the header is written in front of it
+            body_path = Path(tmp_dir) / 'body.csv'
+            columns, total_papers, total_citations = self._write_csv_body(rows, body_path, chunk_size)
+            
+            opener = gzip.open if compress else open
+            with self._atomic(filepath) as tmp_path, opener(tmp_path, 'wt', encoding='utf-8-sig', newline='') as f:
+                f.write(f"# Sintesa - Research Papers Export\n")
+                f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"# Total Papers: {total_papers}\n")
+                f.write(f"# Total Citations: {total_citations}\n")
+                f.write(f"# \n")
+                
+                csv.writer(f, lineterminator='\n').writerow(columns)
+                with open(body_path, 'r', encoding='utf-8', newline='') as body:
+                    shutil.copyfileobj(body, f, 1 << 20)
+        
+        logger.info("Exported", extra={'format': 'csv', 'path': str(filepath)})
+        return str(filepath)
+    
+    def _csv_row(self, paper: Dict) -> Dict:
+        """Flatten a paper into CSV cell values"""
+        row = dict(paper)
         
         # Extract year if not present
-        if 'year' not in df.columns and 'publication_date' in df.columns:
-            df['year'] = df['publication_date'].apply(self._extract_year)
+        if 'year' not in row:
+            row['year'] = self._extract_year(row.get('publication_date'))
         
         # Clean authors field - convert list to string
-        if 'authors' in df.columns:
-            df['authors'] = df['authors'].apply(
-                lambda x: '; '.join(x) if isinstance(x, list) else str(x)
-            )
-        
-        # Ensure all preferred columns exist
-        available_columns = [col for col in preferred_columns if col in df.columns]
-        other_columns = [col for col in df.columns if col not in preferred_columns]
-        
-        # Reorder
-        df = df[available_columns + other_columns]
-        
-        # Sort by citations (descending)
-        if 'citations' in df.columns:
-            df = df.sort_values('citations', ascending=False)
-        
-        # Add metadata header as comments
-        with open(filepath, 'w', encoding='utf-8-sig') as f:
-            f.write(f"# Sintesa - Research Papers Export\n")
-            f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"# Total Papers: {len(papers)}\n")
-            f.write(f"# Total Citations: {sum(p.get('citations', 0) for p in papers)}\n")
-            f.write(f"# \n")
-            
-            # Write the actual CSV data
-            df.to_csv(f, index=False)
+        authors = row.get('authors')
+        if isinstance(authors, list):
+            row['authors'] = '; '.join(author_name_and_affiliation(a)[0] for a in authors)
+        return row
+    
+    def _write_csv_body(self, rows: Iterable[Dict], path: Path, chunk_size: int):
+        """
+        Write CSV rows without a header
         
-        print(f"[OK] Exported to CSV: {filepath}")
-        return str(filepath)
+        Columns not in CSV_COLUMNS are appended as they first appear, so
+        earlier rows may be shorter than the final header.
+        
+        Returns:
+            (columns, row count, citation total)
+        """
+        columns = list(CSV_COLUMNS)
+        index = {column: i for i, column in enumerate(columns)}
+        total_papers = 0
+        total_citations = 0
+        
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            for chunk in _chunks(rows, chunk_size):
+                lines = []
+                for row in chunk:
+                    for column in row:
+                        if column not in index:
+                            index[column] = len(columns)
+                            columns.append(column)
+                    values = [None] * len(columns)
+                    for column, value in row.items():
+                        values[index[column]] = value
+                    lines.append(values)
+                    total_citations += _citation_count(row)
+                writer.writerows(lines)
+                total_papers += len(chunk)
+        
+        return columns, total_papers, total_citations
+    
+    def _external_sort(self, rows: Iterable[Dict], tmp_dir: Path, chunk_size: int) -> Iterator[Dict]:
+        """Sort rows by citations using sorted runs on disk merged with heapq.merge"""
+        runs = []
+        for chunk in _chunks(rows, chunk_size):
+            chunk.sort(key=_most_cited_first)
+            run_path = tmp_dir / f"run_{len(runs)}.jsonl"
+            with open(run_path, 'w', encoding='utf-8') as f:
+                for row in chunk:
+                    f.write(json.dumps(row, ensure_ascii=False, default=str))
+                    f.write('\n')
+            runs.append(run_path)
+        
+        files = [open(run_path, 'r', encoding='utf-8') for run_path in runs]
+        try:
+            # merge() prefers earlier runs on ties, so the sort stays stable
+            yield from heapq.merge(*(map(json.loads, f) for f in files), key=_most_cited_first)
+        finally:
+            for f in files:
+                f.close()
     
     def export_to_excel(self, papers: List[Dict], filename: str = None) -> str:
-        """Export papers to Excel file with multiple sheets and analysis"""
+        """
+        Export papers to Excel file with multiple sheets and analysis
+        
+        The workbook is written in openpyxl's write-only mode: rows stream
+        into each sheet instead of building the whole workbook in memory.
+        
+        Args:
+            papers: Papers to export
+            filename: Output file name (default: timestamped)
+        """
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"papers_{timestamp}.xlsx"
+            filename = self._new_filename('excel')
         
         filepath = self.output_dir / filename
         
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # 1. Summary Sheet
-            total_papers = len(papers)
-            total_citations = sum(p.get('citations', 0) for p in papers)
-            avg_citations = total_citations / total_papers if total_papers > 0 else 0
-            
-            # Extract years
-            years = [self._extract_year(p.get('publication_date')) for p in papers]
-            years = [y for y in years if y is not None]
-            year_range = f"{min(years)} - {max(years)}" if years else "N/A"
-            
-            summary_data = {
-                'Metric': [
-                    'Total Papers',
-                    'Total Citations',
-                    'Average Citations per Paper',
-                    'Median Citations',
-                    'Max Citations',
-                    'Year Range',
-                    'Unique Sources',
-                    'Papers with DOI',
-                    'Papers with Abstract',
-                    'Generated Date'
-                ],
-                'Value': [
-                    total_papers,
-                    total_citations,
-                    f'{avg_citations:.2f}',
-                    pd.DataFrame(papers)['citations'].median(),
-                    max((p.get('citations', 0) for p in papers), default=0),
-                    year_range,
-                    len(set(p.get('source', '') for p in papers)),
-                    sum(1 for p in papers if p.get('doi')),
-                    sum(1 for p in papers if p.get('abstract')),
-                    datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                ]
-            }
-            df_summary = pd.DataFrame(summary_data)
-            df_summary.to_excel(writer, sheet_name='Summary', index=False)
-            
-            # 2. All Papers Sheet
-            df_papers = pd.DataFrame(papers)
-            # Reorder columns for better readability
-            preferred_columns = ['title', 'authors', 'publication_date', 'journal', 
-                               'citations', 'source', 'doi', 'url', 'abstract']
-            available_columns = [col for col in preferred_columns if col in df_papers.columns]
-            other_columns = [col for col in df_papers.columns if col not in preferred_columns]
-            df_papers = df_papers[available_columns + other_columns]
-            df_papers.to_excel(writer, sheet_name='All Papers', index=False)
-            
-            # 3. Top Cited Papers
-            top_papers = sorted(papers, key=lambda x: x.get('citations', 0), reverse=True)[:20]
-            df_top = pd.DataFrame(top_papers)
-            if not df_top.empty:
-                df_top = df_top[available_columns]
-            df_top.to_excel(writer, sheet_name='Top 20 Cited', index=False)
-            
-            # 4. Papers by Year
-            if years:
-                from collections import Counter
-                year_counts = Counter(years)
-                df_years = pd.DataFrame([
-                    {'Year': year, 'Count': count, 'Percentage': f'{(count/len(years)*100):.1f}%'}
-                    for year, count in sorted(year_counts.items(), reverse=True)
-                ])
-                df_years.to_excel(writer, sheet_name='By Year', index=False)
-            
-            # 5. Papers by Source
-            df_source = pd.DataFrame(papers)
-            if 'source' in df_source.columns:
-                source_stats = df_source.groupby('source').agg({
-                    'title': 'count',
-                    'citations': ['sum', 'mean', 'median', 'max']
-                }).round(2)
-                source_stats.columns = ['Paper Count', 'Total Citations', 
-                                       'Avg Citations', 'Median Citations', 'Max Citations']
-                source_stats = source_stats.reset_index()
-                source_stats.to_excel(writer, sheet_name='By Source', index=False)
-            
-            # 6. Authors Analysis (Top 20 most frequent authors)
-            all_authors = []
-            for paper in papers:
-                authors = paper.get('authors', [])
-                if isinstance(authors, list):
-                    all_authors.extend(authors)
-            
-            if all_authors:
-                from collections import Counter
-                author_counts = Counter(all_authors).most_common(20)
-                df_authors = pd.DataFrame(author_counts, columns=['Author', 'Paper Count'])
-                df_authors.to_excel(writer, sheet_name='Top Authors', index=False)
-            
-            # 7. Journal Analysis (Top 20 journals)
-            journals = [p.get('journal', 'N/A') for p in papers if p.get('journal')]
-            if journals:
-                from collections import Counter
-                journal_counts = Counter(journals).most_common(20)
-                df_journals = pd.DataFrame(journal_counts, columns=['Journal', 'Paper Count'])
-                df_journals.to_excel(writer, sheet_name='Top Journals', index=False)
-            
-            # Format the worksheets
-            workbook = writer.book
-            
-            # Format Summary sheet
-            summary_sheet = workbook['Summary']
-            summary_sheet.column_dimensions['A'].width = 30
-            summary_sheet.column_dimensions['B'].width = 30
-            
-            # Format All Papers sheet
-            papers_sheet = workbook['All Papers']
-            papers_sheet.column_dimensions['A'].width = 50  # Title
-            papers_sheet.column_dimensions['B'].width = 40  # Authors
-            papers_sheet.column_dimensions['C'].width = 15  # Date
-            papers_sheet.column_dimensions['D'].width = 30  # Journal
-        
-        print(f"[OK] Exported to Excel: {filepath}")
+        aggregates = self.statistics.aggregates(papers)
+        workbook = Workbook(write_only=True)
+        
+        # 1. Summary Sheet
+        total_papers = aggregates.paper_count
+        citations = aggregates.citations
+        year_range = aggregates.year_range()
+        summary = self._excel_sheet(workbook, 'Summary', ['Metric', 'Value'], [30, 30])
+        for row in [
+            ('Total Papers', total_papers),
+            ('Total Citations', citations.total),
+            ('Average Citations per Paper', f'{citations.mean:.2f}'),
+            ('Median Citations', citations.median),
+            ('Max Citations', citations.max),
+            ('Year Range', f"{year_range[0]} - {year_range[1]}" if year_range else "N/A"),
+            ('Unique Sources', len(aggregates.source_counts)),
+            ('Papers with DOI', aggregates.papers_with_doi),
+            ('Papers with Abstract', aggregates.papers_with_abstract),
+            ('Generated Date', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        ]:
+            summary.append(row)
+        
+        # 2. All Papers Sheet
+        # Reorder columns for better readability
+        preferred_columns = ['title', 'authors', 'publication_date', 'journal',
+                             'citations', 'source', 'doi', 'url', 'abstract']
+        present = {}
+        for paper in papers:
+            present.update(dict.fromkeys(paper))
+        available_columns = [col for col in preferred_columns if col in present]
+        other_columns = [col for col in present if col not in preferred_columns]
+        columns = available_columns + other_columns
+        
+        # Title, Authors, Date, Journal
+        sheet = self._excel_sheet(workbook, 'All Papers', columns, [50, 40, 15, 30])
+        for paper in papers:
+            sheet.append(self._excel_row(paper, columns))
+        
+        # 3. Top Cited Papers
+        top_papers = aggregates.top_cited(20)
+        sheet = self._excel_sheet(workbook, 'Top 20 Cited', available_columns if top_papers else [])
+        for paper in top_papers:
+            sheet.append(self._excel_row(paper, available_columns))
+        
+        # 4. Papers by Year
+        dated_papers = sum(aggregates.year_counts.values())
+        if dated_papers:
+            sheet = self._excel_sheet(workbook, 'By Year', ['Year', 'Count', 'Percentage'])
+            for year, count in sorted(aggregates.year_counts.items(), reverse=True):
+                sheet.append([year, count, f'{(count/dated_papers*100):.1f}%'])
+        
+        # 5. Papers by Source
+        if aggregates.source_counts:
+            sheet = self._excel_sheet(workbook, 'By Source', [
+                'source', 'Paper Count', 'Total Citations',
+                'Avg Citations', 'Median Citations', 'Max Citations'
+            ])
+            for source in sorted(aggregates.source_counts):
+                sketch = aggregates.source_citations[source]
+                sheet.append([source, sketch.count, sketch.total, round(sketch.mean, 2),
+                              round(sketch.median, 2), sketch.max])
+        
+        # 6. Authors Analysis (Top 20 most frequent authors)
+        if aggregates.author_counts:
+            sheet = self._excel_sheet(workbook, 'Top Authors', ['Author', 'Paper Count'])
+            for row in aggregates.author_counts.most_common(20):
+                sheet.append(row)
+        
+        # 7. Journal Analysis (Top 20 journals)
+        if aggregates.journal_counts:
+            sheet = self._excel_sheet(workbook, 'Top Journals', ['Journal', 'Paper Count'])
+            for row in aggregates.top_journals(20):
+                sheet.append(row)
+        
+        with self._atomic(filepath) as tmp_path:
+            workbook.save(tmp_path)
+        
+        logger.info("Exported", extra={'format': 'excel', 'path': str(filepath)})
         return str(filepath)
     
-    def export_to_json(self, papers: List[Dict], filename: str = None) -> str:
-        """Export papers to JSON file with comprehensive metadata"""
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"papers_{timestamp}.json"
+    def _excel_sheet(self, workbook: Workbook, title: str, headers: List[str],
+                     widths: List[int] = ()):
+        """Add a write-only sheet; widths must be set before the first row"""
+        sheet = workbook.create_sheet(title)
+        for i, width in enumerate(widths, 1):
+            sheet.column_dimensions[get_column_letter(i)].width = width
         
-        filepath = self.output_dir / filename
+        if headers:
+            header_cells = []
+            for header in headers:
+                cell = WriteOnlyCell(sheet, value=header)
+                cell.font = EXCEL_HEADER_FONT
+                header_cells.append(cell)
+            sheet.append(header_cells)
+        return sheet
+    
+    def _excel_row(self, paper: Dict, columns: List[str]) -> List:
+        """Cell values of a paper; lists and dicts are written as text"""
+        row = []
+        for column in columns:
+            value = paper.get(column)
+            if column == 'authors' and isinstance(value, list):
+                value = '; '.join(author_name_and_affiliation(a)[0] for a in value)
+            elif isinstance(value, (list, dict, tuple, set)):
+                value = str(value)
+            row.append(value)
+        return row
+    
+    def export_to_json(self, papers: List[Dict], filename: str = None, chunk_size: int = 5000) -> str:
+        """
+        Export papers to JSON file with comprehensive metadata
         
-        # Calculate statistics
-        total_papers = len(papers)
-        total_citations = sum(p.get('citations', 0) for p in papers)
-        avg_citations = total_citations / total_papers if total_papers > 0 else 0
+        Metadata and statistics are written first, then papers are encoded
+        in chunks straight into the "papers" array, one paper per line.
+        """
+        if filename is None:
+            filename = self._new_filename('json')
         
-        # Extract years
-        years = [self._extract_year(p.get('publication_date')) for p in papers]
-        years = [y for y in years if y is not None]
+        filepath = self.output_dir / filename
         
-        # Source distribution
-        from collections import Counter
-        sources = Counter(p.get('source', 'Unknown') for p in papers)
+        aggregates = self.statistics.aggregates(papers)
+        citations = aggregates.citations
+        year_range = aggregates.year_range()
+        sources = aggregates.source_counts
         
         # Top cited papers
-        top_papers = sorted(papers, key=lambda x: x.get('citations', 0), reverse=True)[:10]
         top_cited_titles = [
             {
                 'title': p.get('title', 'N/A'),
                 'citations': p.get('citations', 0),
                 'year': self._extract_year(p.get('publication_date'))
             }
-            for p in top_papers
+            for p in aggregates.top_cited(10)
         ]
         
-        # Authors statistics
-        all_authors = []
-        for paper in papers:
-            authors = paper.get('authors', [])
-            if isinstance(authors, list):
-                all_authors.extend(authors)
-        
-        top_authors = Counter(all_authors).most_common(10) if all_authors else []
-        
         export_data = {
             'metadata': {
                 'application': 'Sintesa',
@@ -248,42 +703,157 @@ class Exporter:
                 'data_sources': list(sources.keys())
             },
             'statistics': {
-                'total_papers': total_papers,
-                'total_citations': total_citations,
-                'average_citations': round(avg_citations, 2),
-                'median_citations': int(pd.DataFrame(papers)['citations'].median()) if papers else 0,
-                'max_citations': max((p.get('citations', 0) for p in papers), default=0),
+                'total_papers': aggregates.paper_count,
+                'total_citations': citations.total,
+                'average_citations': round(citations.mean, 2),
+                'median_citations': int(citations.median),
+                'max_citations': citations.max,
                 'year_range': {
-                    'min': min(years) if years else None,
-                    'max': max(years) if years else None,
-                    'span': f"{min(years)}-{max(years)}" if years else None
+                    'min': year_range[0] if year_range else None,
+                    'max': year_range[1] if year_range else None,
+                    'span': f"{year_range[0]}-{year_range[1]}" if year_range else None
                 },
                 'papers_by_source': dict(sources),
                 'unique_sources': len(sources),
-                'papers_with_doi': sum(1 for p in papers if p.get('doi')),
-                'papers_with_abstract': sum(1 for p in papers if p.get('abstract')),
-                'papers_with_url': sum(1 for p in papers if p.get('url'))
+                'papers_with_doi': aggregates.papers_with_doi,
+                'papers_with_abstract': aggregates.papers_with_abstract,
+                'papers_with_url': aggregates.papers_with_url
             },
             'top_cited_papers': top_cited_titles,
             'top_authors': [
                 {'author': author, 'paper_count': count}
-                for author, count in top_authors
+                for author, count in aggregates.author_counts.most_common(10)
             ],
-            'year_distribution': dict(Counter(years)) if years else {},
-            'papers': papers
+            'year_distribution': dict(aggregates.year_counts)
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        with self._atomic(filepath) as tmp_path, open(tmp_path, 'wb') as f:
+            f.write(b'{\n')
+            for key, value in export_data.items():
+                section = json.dumps(value, indent=2, ensure_ascii=False, default=str)
+                f.write(f'  {json.dumps(key)}: {section}'.replace('\n', '\n  ').encode('utf-8'))
+                f.write(b',\n')
+            
+            f.write(b'  "papers": [')
+            separator = b'\n    '
+            for chunk in _chunks(papers, chunk_size):
+                f.write(separator)
+                f.write(b',\n    '.join(_encode_json(paper) for paper in chunk))
+                separator = b',\n    '
+            f.write(b'\n  ]\n}\n')
         
-        print(f"[OK] Exported to JSON: {filepath}")
+        logger.info("Exported", extra={'format': 'json', 'path': str(filepath)})
         return str(filepath)
     
-    def export_to_pdf(self, papers: List[Dict], filename: str = None) -> str:
-        """Export papers to PDF report with comprehensive statistics"""
+    def export_to_jsonl(self, papers: Iterable[Dict], filename: str = None, compress: bool = False,
+                        chunk_size: int = 5000) -> str:
+        """
+        Export papers to JSON Lines: one JSON object per paper per line
+        
+        Args:
+            papers: Papers to export; any iterable, consumed once
+            filename: Output file name (default: timestamped)
+            compress: Write gzip-compressed JSON Lines
+            chunk_size: Papers encoded per write
+        """
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"report_{timestamp}.pdf"
+            filename = self._new_filename('jsonl', compress)
+        
+        filepath = self.output_dir / filename
+        
+        opener = gzip.open if compress else open
+        with self._atomic(filepath) as tmp_path, opener(tmp_path, 'wb') as f:
+            for chunk in _chunks(papers, chunk_size):
+                f.write(b''.join(_encode_json(paper) + b'\n' for paper in chunk))
+        
+        logger.info("Exported", extra={'format': 'jsonl', 'path': str(filepath)})
+        return str(filepath)
+    
+    def export_to_columnar(self, papers: List[Dict], file_format: str = 'parquet',
+                           filename: str = None) -> str:
+        """
+        Export papers to Parquet or Feather with typed columns
+        
+        Authors are a list column, source and journal are dictionary-encoded,
+        year and citations are integers. Columns are built straight from the
+        papers into Arrow arrays; other paper fields follow as inferred columns.
+        
+        Args:
+            papers: Papers to export
+            file_format: 'parquet' or 'feather'
+            filename: Output file name (default: timestamped)
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for Parquet/Feather export")
+        if file_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format: {file_format}")
+        
+        if filename is None:
+            filename = self._new_filename(file_format)
+        
+        filepath = self.output_dir / filename
+        
+        table = self._arrow_table(papers)
+        with self._atomic(filepath) as tmp_path:
+            if file_format == 'parquet':
+                pq.write_table(table, tmp_path, compression='zstd')
+            else:
+                feather.write_feather(table, tmp_path, compression='zstd')
+        
+        logger.info("Exported", extra={'format': file_format, 'path': str(filepath)})
+        return str(filepath)
+    
+    def _arrow_table(self, papers: List[Dict]) -> 'pa.Table':
+        """Arrow table of papers, one typed array per column"""
+        columns = {}
+        for column in CSV_COLUMNS:
+            if column == 'authors':
+                columns[column] = pa.array([
+                    [author_name_and_affiliation(a)[0] for a in p['authors']]
+                    if isinstance(p.get('authors'), list) else None
+                    for p in papers
+                ], pa.list_(pa.string()))
+            elif column == 'year':
+                columns[column] = pa.array([paper_year(p) for p in papers], pa.int16())
+            elif column == 'citations':
+                columns[column] = pa.array([_citation_count(p) for p in papers], pa.int32())
+            else:
+                values = pa.array([self._text_or_none(p.get(column)) for p in papers], pa.string())
+                if column in COLUMNAR_DICTIONARY_COLUMNS:
+                    values = values.dictionary_encode()
+                columns[column] = values
+        
+        others = {}
+        for paper in papers:
+            others.update(dict.fromkeys(paper))
+        for column in others:
+            if column in columns:
+                continue
+            values = [p.get(column) for p in papers]
+            try:
+                columns[column] = pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Mixed types: keep the column as text
+                columns[column] = pa.array([self._text_or_none(v) for v in values], pa.string())
+        
+        return pa.table(columns)
+    
+    @staticmethod
+    def _text_or_none(value):
+        return value if value is None or isinstance(value, str) else str(value)
+    
+    def export_to_pdf(self, papers: List[Dict], filename: str = None, max_listed: Optional[int] = 100) -> str:
+        """
+        Export papers to PDF report with comprehensive statistics
+        
+        Args:
+            papers: Papers to export
+            filename: Output file name (default: timestamped)
+            max_listed: Papers included in the complete papers list
+                (None lists every paper)
+        """
+        if filename is None:
+            filename = self._new_filename('pdf')
         
         filepath = self.output_dir / filename
         
@@ -309,21 +879,19 @@ class Exporter:
         pdf.safe_cell(0, 10, 'Executive Summary', 0, 1, 'L', True)
         pdf.safe_set_font('Arial', '', 11)
         
-        total_papers = len(papers)
-        total_citations = sum(p.get('citations', 0) for p in papers)
-        avg_citations = total_citations / total_papers if total_papers > 0 else 0
-        
-        # Calculate additional statistics
-        df = pd.DataFrame(papers)
-        sources = df['source'].value_counts().to_dict()
+        aggregates = self.statistics.aggregates(papers)
+        total_papers = aggregates.paper_count
+        total_citations = aggregates.citations.total
+        avg_citations = aggregates.citations.mean
+        sources = dict(aggregates.source_counts.most_common())
         
         # Year statistics
-        years = [self._extract_year(p.get('publication_date')) for p in papers]
-        years = [y for y in years if y is not None]
-        year_range = f"{min(years)} - {max(years)}" if years else "N/A"
+        year_counts = aggregates.year_counts
+        years = aggregates.year_range()
+        year_range = f"{years[0]} - {years[1]}" if years else "N/A"
         
         # Top cited papers
-        top_papers = sorted(papers, key=lambda x: x.get('citations', 0), reverse=True)[:5]
+        top_papers = aggregates.top_cited(10)
         
         pdf.safe_cell(0, 7, f'Total Papers: {total_papers}', 0, 1)
         pdf.safe_cell(0, 7, f'Total Citations: {total_citations:,}', 0, 1)
@@ -376,14 +944,13 @@ class Exporter:
         pdf.safe_cell(0, 10, '2. Publications by Year', 0, 1)
         pdf.ln(3)
         
-        if years:
-            from collections import Counter
-            year_counts = Counter(years)
+        if year_counts:
+            dated_papers = sum(year_counts.values())
             pdf.safe_set_font('Arial', '', 11)
             
             for year in sorted(year_counts.keys(), reverse=True):
                 count = year_counts[year]
-                percentage = (count / len(years)) * 100
+                percentage = (count / dated_papers) * 100
                 pdf.safe_cell(0, 6, f'{year}: {count} papers ({percentage:.1f}%)', 0, 1)
         else:
             pdf.safe_set_font('Arial', '', 11)
@@ -397,26 +964,31 @@ class Exporter:
         pdf.safe_cell(0, 10, '3. Complete Papers List', 0, 1)
         pdf.ln(5)
         
-        for i, paper in enumerate(papers[:100], 1):  # Limit to 100 papers
-            pdf.safe_set_font('Arial', 'B', 10)
-            title = paper.get('title', 'N/A')[:120]
-            pdf.safe_multi_cell(0, 5, f'{i}. {title}')
-            
-            pdf.safe_set_font('Arial', '', 9)
-            authors = ', '.join(paper.get('authors', [])[:4])
-            if len(paper.get('authors', [])) > 4:
-                authors += ' et al.'
-            pdf.safe_cell(0, 4, f'   Authors: {authors[:100]}', 0, 1)
-            
-            year = paper.get('publication_date', 'N/A')
-            citations = paper.get('citations', 0)
-            source = paper.get('source', 'N/A')
-            pdf.safe_cell(0, 4, f'   Year: {year}  |  Citations: {citations}  |  Source: {source}', 0, 1)
+        listed = papers if max_listed is None else papers[:max_listed]
+        if len(listed) < len(papers):
+            pdf.safe_set_font('Arial', 'I', 9)
+            pdf.safe_cell(0, 5, f'Showing the first {len(listed)} of {len(papers)} papers', 0, 1)
             pdf.ln(2)
-            
-            # Add new page every 12 papers
-            if i % 12 == 0 and i < len(papers):
-                pdf.add_page()
+        
+        # Entries are laid out a batch at a time; each stays on one page
+        for start in range(0, len(listed), PDF_LISTING_BATCH):
+            blocks = []
+            for i, paper in enumerate(listed[start:start + PDF_LISTING_BATCH], start + 1):
+                title = paper.get('title', 'N/A')[:120]
+                names = [author_name_and_affiliation(a)[0] for a in paper.get('authors', [])]
+                authors = ', '.join(names[:4])
+                if len(names) > 4:
+                    authors += ' et al.'
+                year = paper.get('publication_date', 'N/A')
+                citations = paper.get('citations', 0)
+                source = paper.get('source', 'N/A')
+                blocks.append([
+                    ('B', 10, 5, f'{i}. {title}', True),
+                    ('', 9, 4, f'   Authors: {authors[:100]}', False),
+                    ('', 9, 4, f'   Year: {year}  |  Citations: {citations}  |  Source: {source}', False),
+                    ('', 9, 2, None, False)
+                ])
+            pdf.write_blocks(blocks)
         
         # Footer page
         pdf.add_page()
@@ -434,11 +1006,105 @@ class Exporter:
         pdf.safe_set_font('Arial', 'I', 9)
         pdf.safe_multi_cell(0, 5, 'Disclaimer: This software is provided "as is" without warranty of any kind. The data accuracy depends on external sources.')
         
-        pdf.output(str(filepath))
+        with self._atomic(filepath) as tmp_path:
+            pdf.output(str(tmp_path))
         
-        print(f"[OK] Exported to PDF: {filepath}")
+        logger.info("Exported", extra={'format': 'pdf', 'path': str(filepath)})
         return str(filepath)
     
+    def export_to_bibtex(self, papers: Iterable[Dict], filename: str = None,
+                         include_abstracts: bool = True, chunk_size: int = 5000) -> str:
+        """
+        Export papers to BibTeX, streaming entries in chunks
+        
+        Args:
+            papers: Papers to export; any iterable, consumed once
+            filename: Output file name (default: timestamped)
+            include_abstracts: Add an abstract field to each entry
+            chunk_size: Entries formatted per write
+        """
+        if filename is None:
+            filename = self._new_filename('bibtex')
+        
+        filepath = self.output_dir / filename
+        keys = CitationKeys()
+        
+        with self._atomic(filepath) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in _chunks(papers, chunk_size):
+                f.write(''.join(self._bibtex_entry(paper, keys, include_abstracts) for paper in chunk))
+        
+        logger.info("Exported", extra={'format': 'bibtex', 'path': str(filepath)})
+        return str(filepath)
+    
+    def export_to_ris(self, papers: Iterable[Dict], filename: str = None,
+                      include_abstracts: bool = True, chunk_size: int = 5000) -> str:
+        """
+        Export papers to RIS, streaming records in chunks
+        
+        Args:
+            papers: Papers to export; any iterable, consumed once
+            filename: Output file name (default: timestamped)
+            include_abstracts: Add an AB line to each record
+            chunk_size: Records formatted per write
+        """
+        if filename is None:
+            filename = self._new_filename('ris')
+        
+        filepath = self.output_dir / filename
+        keys = CitationKeys()
+        
+        with self._atomic(filepath) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in _chunks(papers, chunk_size):
+                f.write(''.join(self._ris_record(paper, keys, include_abstracts) for paper in chunk))
+        
+        logger.info("Exported", extra={'format': 'ris', 'path': str(filepath)})
+        return str(filepath)
+    
+    def _bibtex_entry(self, paper: Dict, keys: 'CitationKeys', include_abstracts: bool) -> str:
+        """One BibTeX entry: @article with a journal, @misc otherwise"""
+        authors = _author_names(paper)
+        year = paper_year(paper)
+        journal = paper.get('journal')
+        
+        fields = [('title', paper.get('title')), ('author', ' and '.join(authors))]
+        if year is not None:
+            fields.append(('year', str(year)))
+        if journal:
+            fields.append(('journal', journal))
+        fields.append(('doi', paper.get('doi')))
+        fields.append(('url', paper.get('url')))
+        if include_abstracts:
+            fields.append(('abstract', paper.get('abstract')))
+        
+        lines = [f"@{'article' if journal else 'misc'}{{{keys.next(authors, year, paper.get('title'))},"]
+        for name, value in fields:
+            if value:
+                lines.append(f"  {name} = {{{_bibtex_value(name, str(value))}}},")
+        lines.append('}\n\n')
+        return '\n'.join(lines)
+    
+    def _ris_record(self, paper: Dict, keys: 'CitationKeys', include_abstracts: bool) -> str:
+        """One RIS record: JOUR with a journal, GEN otherwise"""
+        authors = _author_names(paper)
+        year = paper_year(paper)
+        journal = paper.get('journal')
+        
+        tags = [('TY', 'JOUR' if journal else 'GEN'), ('ID', keys.next(authors, year, paper.get('title')))]
+        tags.append(('TI', paper.get('title')))
+        tags.extend(('AU', author) for author in authors)
+        if year is not None:
+            tags.append(('PY', str(year)))
+        tags.append(('DA', (paper.get('publication_date') or '').replace('-', '/')))
+        tags.append(('JO', journal))
+        tags.append(('DO', paper.get('doi')))
+        tags.append(('UR', paper.get('url')))
+        if include_abstracts:
+            tags.append(('AB', paper.get('abstract')))
+        
+        lines = [f"{tag}  - {str(value).translate(RIS_ESCAPES)}" for tag, value in tags if value]
+        lines.append('ER  - \n\n')
+        return '\n'.join(lines)
+    
     def open_file_manager(self, filepath: str) -> bool:
         """Open file manager to the exported file location"""
         try:
@@ -462,14 +1128,14 @@ class Exporter:
                     # Fallback: open parent directory
                     subprocess.run(['xdg-open', str(filepath.parent)], check=True)
             else:
-                print(f"[FileManager] Unsupported OS: {system}")
+                logger.warning("Unsupported OS: %s", system)
                 return False
             
-            print(f"[FileManager] Opened file manager for: {filepath}")
+            logger.info("Opened file manager", extra={'path': str(filepath)})
             return True
-            
+        
         except Exception as e:
-            print(f"[FileManager] Error opening file manager: {e}")
+            logger.error("Error opening file manager: %s", e)
             return False
     
     def open_file(self, filepath: str) -> bool:
@@ -485,14 +1151,14 @@ class Exporter:
             elif system == 'linux':
                 subprocess.run(['xdg-open', str(filepath)], check=True)
             else:
-                print(f"[FileOpen] Unsupported OS: {system}")
+                logger.warning("Unsupported OS: %s", system)
                 return False
             
-            print(f"[FileOpen] Opened file: {filepath}")
+            logger.info("Opened file", extra={'path': str(filepath)})
             return True
-            
+        
         except Exception as e:
-            print(f"[FileOpen] Error opening file: {e}")
+            logger.error("Error opening file: %s", e)
             return False
     
     def _extract_year(self, date_str) -> int:
@@ -524,51 +1190,16 @@ class Exporter:
 
 
 class PDF(FPDF):
-    """Custom PDF class with header and footer and Unicode support"""
-    
-    def __init__(self):
-        super().__init__()
-        self.unicode_font = 'Arial'  # Use Arial as default since it's built-in
-        self.fallback_font = 'Arial'
-        
-        # Try to add DejaVu font for Unicode support
-        try:
-            # Check if DejaVu fonts are available in common locations
-            import os
-            font_paths = [
-                '/System/Library/Fonts/DejaVuSans.ttf',  # macOS
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux
-                'C:\\Windows\\Fonts\\DejaVuSans.ttf',  # Windows
-                './fonts/DejaVuSans.ttf',  # Local fonts directory
-            ]
-            
-            dejavu_found = False
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    font_dir = os.path.dirname(font_path)
-                    self.add_font('DejaVu', '', os.path.join(font_dir, 'DejaVuSans.ttf'), uni=True)
-                    self.add_font('DejaVu', 'B', os.path.join(font_dir, 'DejaVuSans-Bold.ttf'), uni=True)
-                    self.add_font('DejaVu', 'I', os.path.join(font_dir, 'DejaVuSans-Oblique.ttf'), uni=True)
-                    self.add_font('DejaVu', 'BI', os.path.join(font_dir, 'DejaVuSans-BoldOblique.ttf'), uni=True)
-                    self.unicode_font = 'DejaVu'
-                    dejavu_found = True
-                    print("[PDF] DejaVu fonts loaded successfully")
-                    break
-            
-            if not dejavu_found:
-                print("[PDF] DejaVu fonts not found, using Arial with character replacement")
-                
-        except Exception as e:
-            print(f"[PDF] DejaVu fonts not available, using Arial with character replacement: {e}")
-            self.unicode_font = 'Arial'
+    """Custom PDF class with header and footer and Unicode character replacement"""
     
     def safe_set_font(self, family, style='', size=12):
         """Set font with fallback for Unicode characters"""
         try:
-            # Always use Arial since it's built-in and reliable
-            self.set_font('Arial', style, size)
+            # Reports always use the built-in Arial (an alias of Helvetica);
+            # text outside Latin-1 is replaced rather than embedding a font
+            self.set_font('helvetica', style, size)
         except Exception as e:
-            print(f"[PDF] Font error, using fallback: {e}")
+            logger.warning("Font error, using fallback: %s", e)
             # Last resort: use default font
             self.set_font('', style, size)
     
@@ -576,23 +1207,69 @@ class PDF(FPDF):
         """Multi-cell with Unicode character handling"""
         try:
             # Clean text to remove problematic characters
-            clean_txt = self._clean_text(txt)
-            self.multi_cell(w, h, clean_txt, border, align, fill)
+            clean_txt = self._encodable(self._clean_text(txt))
+            self.multi_cell(w, h, clean_txt, border, align, fill,
+                            new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         except Exception as e:
-            print(f"[PDF] Text rendering error: {e}")
+            logger.warning("Text rendering error: %s", e)
             # Fallback: replace problematic characters
             fallback_txt = self._replace_problematic_chars(txt)
-            self.multi_cell(w, h, fallback_txt, border, align, fill)
+            self.multi_cell(w, h, fallback_txt, border, align, fill,
+                            new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     
     def safe_cell(self, w, h, txt, border=0, ln=0, align='', fill=False):
         """Cell with Unicode character handling"""
+        new_x, new_y = PDF_LINE_BREAKS[ln]
         try:
-            clean_txt = self._clean_text(txt)
-            self.cell(w, h, clean_txt, border, ln, align, fill)
+            clean_txt = self._encodable(self._clean_text(txt))
+            self.cell(w, h, clean_txt, border, align=align, fill=fill, new_x=new_x, new_y=new_y)
         except Exception as e:
-            print(f"[PDF] Text rendering error: {e}")
+            logger.warning("Text rendering error: %s", e)
             fallback_txt = self._replace_problematic_chars(txt)
-            self.cell(w, h, fallback_txt, border, ln, align, fill)
+            self.cell(w, h, fallback_txt, border, align=align, fill=fill, new_x=new_x, new_y=new_y)
+    
+    def write_blocks(self, blocks: List[List[Tuple[str, float, float, str, bool]]]):
+        """
+        Lay out blocks of full-width lines: (style, size, height, text, wrap)
+        
+        Each block starts on a new page if it would not fit on the current
+        one. Text is cleaned in one pass for all blocks, and wrapped lines
+        that fit on one line are drawn as plain cells, skipping line breaking.
+        A text of None adds vertical space of the given height.
+        """
+        texts = [line[3] or '' for block in blocks for line in block]
+        cleaned = self._clean_text('\x00'.join(texts)).split('\x00')
+        if len(cleaned) != len(texts):
+            cleaned = [self._clean_text(text) for text in texts]
+        cleaned = iter(cleaned)
+        
+        for block in blocks:
+            rows = []
+            height = 0
+            for style, size, h, text, wrap in block:
+                clean_txt = next(cleaned)
+                if text is None:
+                    rows.append((style, size, h, None, False))
+                    height += h
+                    continue
+                self.safe_set_font('Arial', style, size)
+                clean_txt = self._encodable(clean_txt)
+                wrap = wrap and self.get_string_width(clean_txt) > self.epw
+                rows.append((style, size, h, clean_txt, wrap))
+                height += h * (2 if wrap else 1)
+            
+            if height < self.eph and self.will_page_break(height):
+                self.add_page()
+            
+            for style, size, h, clean_txt, wrap in rows:
+                if clean_txt is None:
+                    self.ln(h)
+                    continue
+                self.safe_set_font('Arial', style, size)
+                if wrap:
+                    self.multi_cell(0, h, clean_txt, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                else:
+                    self.cell(0, h, clean_txt, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     
     def _clean_text(self, text):
         """Clean text for PDF rendering"""
@@ -600,55 +1277,25 @@ class PDF(FPDF):
             return text
         
         # Replace common problematic characters
-        replacements = {
-            ''': "'",
-            ''': "'",
-            '"': '"',
-            '"': '"',
-            '–': '-',
-            '—': '-',
-            '…': '...',
-            '°': ' degrees',
-            '±': '+/-',
-            '×': 'x',
-            '÷': '/',
-            '≤': '<=',
-            '≥': '>=',
-            '≠': '!=',
-            '≈': '~',
-            '∞': 'infinity',
-            'α': 'alpha',
-            'β': 'beta',
-            'γ': 'gamma',
-            'δ': 'delta',
-            'ε': 'epsilon',
-            'θ': 'theta',
-            'λ': 'lambda',
-            'μ': 'mu',
-            'π': 'pi',
-            'σ': 'sigma',
-            'τ': 'tau',
-            'φ': 'phi',
-            'χ': 'chi',
-            'ψ': 'psi',
-            'ω': 'omega'
-        }
-        
-        result = str(text)
-        for unicode_char, replacement in replacements.items():
-            result = result.replace(unicode_char, replacement)
-        
-        return result
+        return str(text).translate(PDF_TEXT_REPLACEMENTS)
+    
+    def _encodable(self, text):
+        """Text the current font can encode: core fonts only cover Latin-1"""
+        if not text or text.isascii():
+            return text
+        try:
+            text.encode('latin-1')
+            return text
+        except UnicodeEncodeError:
+            return self._replace_problematic_chars(text)
     
     def _replace_problematic_chars(self, text):
         """Replace all non-ASCII characters with safe alternatives"""
         if not text:
             return text
         
-        result = str(text)
         # Replace any remaining non-ASCII characters with '?'
-        result = ''.join(char if ord(char) < 128 else '?' for char in result)
-        return result
+        return str(text).encode('ascii', 'replace').decode('ascii')
     
     def header(self):
         """Add header to each page"""
@@ -1,74 +1,378 @@
 """
 Simple Keyword Extractor - Without NLP/AI
-Uses word frequency from titles
+Uses word and phrase frequency from titles (and optionally abstracts)
 """
 
-from typing import List, Dict
+from typing import List, Dict, Iterator, Tuple, Union, Optional
 from collections import Counter
-import re
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+import heapq
+import logging
+import os
+
+import numpy as np
+
+from .aggregates import paper_key, paper_year
+from .text_processing import TextProcessor, BOUNDARY
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# A counted term: a word id, or a tuple of word ids for a phrase
+TermKey = Union[int, Tuple[int, ...]]
 
 
 class KeywordExtractor:
-    """Simple keyword extraction using word frequency"""
+    """Simple keyword extraction using word and phrase frequency"""
     
-    def __init__(self):
-        # Common stop words to exclude
-        self.stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-            'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-            'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
-            'these', 'those', 'it', 'its', 'they', 'them', 'their', 'we', 'our',
-            'you', 'your', 'he', 'she', 'him', 'her', 'using', 'based', 'study',
-            'research', 'analysis', 'paper', 'review', 'new', 'novel', 'approach'
-        }
+    def __init__(self, ngram_range: Tuple[int, int] = (1, 3), include_abstracts: bool = False,
+                 min_phrase_count: int = 2, scoring: str = 'frequency', idf_table=None,
+                 text_processor: TextProcessor = None, parallel_threshold: int = 20000,
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            ngram_range: Smallest and largest n-gram length to count
+            include_abstracts: Count terms from abstracts as well as titles
+            min_phrase_count: Minimum count for a multi-word phrase to be
+                selected as a keyword
+            scoring: 'frequency' ranks by raw counts, 'tfidf' weights counts
+                by inverse document frequency from idf_table
+            idf_table: CorpusIDF updated with every counted paper (required
+                for 'tfidf' scoring)
+            text_processor: Shared TextProcessor whose cached paper tokens
+                are reused (a private one is created if omitted)
+            parallel_threshold: Papers above which counting is split across
+                worker processes (map-reduce); 0 disables the parallel path
+            max_workers: Worker processes for the parallel path (default:
+                CPU count)
+        """
+        if scoring not in ('frequency', 'tfidf'):
+            raise ValueError(f"Unsupported keyword scoring: {scoring}")
+        if scoring == 'tfidf' and idf_table is None:
+            raise ValueError("TF-IDF scoring requires an IDF table")
+        
+        self.min_n, self.max_n = ngram_range
+        self.include_abstracts = include_abstracts
+        self.min_phrase_count = min_phrase_count
+        self.scoring = scoring
+        self.idf_table = idf_table
+        self.text_processor = text_processor or TextProcessor()
+        self.parallel_threshold = parallel_threshold
+        self.max_workers = max_workers
     
     def extract_keywords(self, papers: List[Dict], top_n: int = 20) -> List[str]:
         """
-        Extract top keywords from paper titles using word frequency.
+        Extract top keywords from paper titles using word and phrase frequency.
         
         Args:
             papers: List of paper dictionaries with 'title' field
             top_n: Number of top keywords to return
-            
+        
         Returns:
-            List of keywords
+            List of keywords (single words and multi-word phrases)
+        """
+        return self.top_keywords(self.count_tokens(papers), top_n)
+    
+    @metrics.timed('keyword_count_seconds')
+    def count_tokens(self, papers: List[Dict]) -> Counter:
+        """
+        Count keyword terms (words and phrases) in paper titles and abstracts.
+        
+        Counters from disjoint batches of papers can be added together,
+        which lets aggregates grow incrementally as papers arrive. Large
+        batches are counted in parallel with identical results.
         """
-        # Collect all words from titles
-        all_words = []
+        if self.parallel_threshold and len(papers) >= self.parallel_threshold:
+            try:
+                return self._count_tokens_parallel(papers)
+            except (OSError, RuntimeError) as e:
+                # BrokenProcessPool is a RuntimeError; fall back to one core
+                logger.warning("Parallel counting failed, counting serially: %s", e)
+        
+        key_counts = Counter()
+        names = {}
+        idf_table = self.idf_table
         
         for paper in papers:
-            title = paper.get('title', '')
-            if title:
-                # Clean and tokenize
-                words = self._tokenize(title)
-                all_words.extend(words)
+            keys = self._paper_terms(paper)
+            key_counts.update(keys)
+            
+            # Document frequencies accumulate across every search
+            if idf_table is not None and keys:
+                idf_table.add_document(paper_key(paper), [self._term_name(k, names) for k in set(keys)])
+        
+        if idf_table is not None:
+            idf_table.save()
+        
+        # Word ids become readable terms once per distinct term
+        return Counter({self._term_name(k, names): c for k, c in key_counts.items()})
+    
+    def _count_tokens_parallel(self, papers: List[Dict]) -> Counter:
+        """Map-reduce counting: worker processes count chunks, counters merge in order"""
+        idf_table = self.idf_table
+        
+        # Only papers new to the IDF table contribute document frequencies
+        if idf_table is not None:
+            keys = [paper_key(p) for p in papers]
+            count_df = idf_table.claim_documents(keys)
+        else:
+            count_df = [False] * len(papers)
         
-        # Count word frequency
-        word_freq = Counter(all_words)
+        try:
+            word_freq, df_counts, workers, chunk_count = self._map_chunks(papers, count_df)
+        except BaseException:
+            # The serial fallback counts these papers again, so give back the claims
+            if idf_table is not None:
+                idf_table.release_documents(keys, count_df)
+            raise
         
-        # Get top N keywords
-        top_keywords = [word for word, count in word_freq.most_common(top_n)]
+        if idf_table is not None:
+            idf_table.add_frequencies(df_counts)
+            idf_table.save()
         
-        return top_keywords
+        logger.info("Counted keywords in parallel", extra={'papers': len(papers), 'chunks': chunk_count, 'workers': workers})
+        return word_freq
     
-    def _tokenize(self, text: str) -> List[str]:
-        """Tokenize and clean text"""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove special characters, keep only letters and spaces
-        text = re.sub(r'[^a-z\s]', ' ', text)
-        
-        # Split into words
-        words = text.split()
-        
-        # Filter: remove stop words and short words
-        words = [
-            word for word in words
-            if word not in self.stop_words
-            and len(word) > 3  # Minimum 4 characters
+    def _map_chunks(self, papers: List[Dict], count_df: List[bool]) -> Tuple[Counter, Counter, int, int]:
+        """Count chunks in worker processes: (term counts, document frequencies, workers, chunks)"""
+        texts = [
+            (paper.get('title', '') or '', (paper.get('abstract', '') or '') if self.include_abstracts else '', df)
+            for paper, df in zip(papers, count_df)
         ]
         
-        return words
+        workers = self.max_workers or os.cpu_count() or 1
+        chunk_size = max(1, -(-len(texts) // (workers * 4)))
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        
+        word_freq = Counter()
+        df_counts = Counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields in submission order, so merged counters keep the
+            # serial path's first-occurrence order (and its tie-breaking)
+            results = executor.map(
+                _count_chunk, chunks,
+                [(self.min_n, self.max_n)] * len(chunks),
+                [self.include_abstracts] * len(chunks),
+                [self.text_processor.normalize] * len(chunks)
+            )
+            for chunk_freq, chunk_df in results:
+                word_freq.update(chunk_freq)
+                df_counts.update(chunk_df)
+        return word_freq, df_counts, workers, len(chunks)
+    
+    def top_keywords(self, word_freq: Counter, top_n: int = 20) -> List[str]:
+        """Select the top N keywords from term counts"""
+        if self.scoring == 'tfidf':
+            scores = self.idf_table.score(word_freq)
+        else:
+            scores = word_freq
+        
+        # One-off phrases are noise, not topics
+        min_phrase_count = self.min_phrase_count
+        candidates = (
+            (term, scores[term]) for term, count in word_freq.items()
+            if count >= min_phrase_count or ' ' not in term
+        )
+        
+        # Heap selection; ties keep first-occurrence order like most_common()
+        return [term for term, score in heapq.nlargest(top_n, candidates, key=itemgetter(1))]
+    
+    @metrics.timed('keyword_trends_seconds')
+    def keyword_trends(self, papers: List[Dict], top_n: int = 8, min_count: int = 5,
+                       method: str = 'growth', recent_years: int = 3) -> Dict:
+        """
+        Rank emerging terms from a year x term frequency matrix.
+        
+        Each paper contributes once per distinct term. Per-year counts are
+        normalized by the number of papers in that year, so growth in a field's
+        overall output does not register as every term emerging.
+        
+        Args:
+            papers: List of paper dictionaries
+            top_n: Number of emerging terms to return
+            min_count: Minimum number of papers mentioning a term
+            method: 'growth' ranks by the yearly trend of a term's share of
+                papers, 'burst' by how far its share in the recent window
+                stands above earlier years (two-proportion z-score)
+            recent_years: Length of the recent window in years ('burst')
+        
+        Returns:
+            Dict with years, terms, per-term counts and shares by year, and scores
+        """
+        if method not in ('growth', 'burst'):
+            raise ValueError(f"Unsupported trend method: {method}")
+        
+        empty = {'years': [], 'terms': [], 'counts': [], 'shares': [], 'scores': [], 'method': method}
+        
+        # Sparse (year, term) coordinates, one entry per paper and distinct term
+        columns = {}
+        coord_years = []
+        coord_terms = []
+        paper_years = []
+        for paper in papers:
+            year = paper_year(paper)
+            if year is None:
+                continue
+            paper_years.append(year)
+            for key in set(self._paper_terms(paper)):
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = len(columns)
+                coord_years.append(year)
+                coord_terms.append(column)
+        
+        if not coord_terms:
+            return empty
+        
+        first_year = min(paper_years)
+        years = np.arange(first_year, max(paper_years) + 1)
+        if len(years) <= recent_years:
+            # No earlier period to compare against
+            return empty
+        
+        rows = np.asarray(coord_years, dtype=np.int64) - first_year
+        cols = np.asarray(coord_terms, dtype=np.int64)
+        
+        # Drop rare terms before densifying; phrases also need min_phrase_count
+        names = {}
+        keys = list(columns)
+        totals = np.bincount(cols, minlength=len(keys))
+        keep = totals >= max(min_count, 1)
+        for column in np.flatnonzero(keep):
+            if isinstance(keys[column], tuple) and totals[column] < self.min_phrase_count:
+                keep[column] = False
+        candidates = np.flatnonzero(keep)
+        if not len(candidates):
+            return empty
+        
+        remap = np.full(len(keys), -1, dtype=np.int64)
+        remap[candidates] = np.arange(len(candidates))
+        mask = remap[cols] >= 0
+        flat = rows[mask] * len(candidates) + remap[cols[mask]]
+        matrix = np.bincount(flat, minlength=len(years) * len(candidates)).reshape(len(years), len(candidates))
+        
+        papers_per_year = np.bincount(np.asarray(paper_years) - first_year, minlength=len(years))
+        shares = matrix / np.maximum(papers_per_year, 1)[:, None]
+        
+        if method == 'growth':
+            # Least-squares slope of the yearly share: percentage points per year
+            t = years - years.mean()
+            scores = (t @ shares) / (t @ t) * 100
+        else:
+            # Two-proportion z-score of the recent window against earlier years
+            recent_counts = matrix[-recent_years:].sum(axis=0)
+            earlier_counts = matrix[:-recent_years].sum(axis=0)
+            n_recent = max(int(papers_per_year[-recent_years:].sum()), 1)
+            n_earlier = max(int(papers_per_year[:-recent_years].sum()), 1)
+            pooled = (recent_counts + earlier_counts) / (n_recent + n_earlier)
+            spread = np.sqrt(pooled * (1 - pooled) * (1 / n_recent + 1 / n_earlier))
+            scores = (recent_counts / n_recent - earlier_counts / n_earlier) / np.maximum(spread, 1e-9)
+        
+        # Best first, longer phrases first on ties; a phrase and its
+        # sub-phrases are one trend, so only the best of them is kept
+        lengths = np.array([len(keys[c]) if isinstance(keys[c], tuple) else 1 for c in candidates])
+        selected = []
+        selected_words = []
+        for i in np.lexsort((-lengths, -scores)):
+            if len(selected) >= top_n or scores[i] <= 0:
+                break
+            key = keys[candidates[i]]
+            words = set(key) if isinstance(key, tuple) else {key}
+            if any(words <= other or other <= words for other in selected_words):
+                continue
+            selected.append(i)
+            selected_words.append(words)
+        
+        order = np.asarray(selected, dtype=np.int64)
+        return {
+            'years': years.tolist(),
+            'terms': [self._term_name(keys[candidates[i]], names) for i in order],
+            'counts': matrix[:, order].T.tolist(),
+            'shares': shares[:, order].T.round(4).tolist(),
+            'scores': scores[order].round(3).tolist(),
+            'method': method
+        }
+    
+    def _paper_terms(self, paper: Dict) -> List[TermKey]:
+        """All term keys of a paper's title (and abstract, if enabled)"""
+        tokens = self.text_processor.paper_tokens(paper)
+        terms = list(self._term_keys(tokens.title))
+        if self.include_abstracts:
+            terms.extend(self._term_keys(tokens.abstract))
+        return terms
+    
+    def _term_keys(self, token_ids) -> Iterator[TermKey]:
+        """
+        Emit unigrams and n-gram phrases from token ids in a single pass.
+        
+        Stop words and very short words are BOUNDARY ids that end a phrase,
+        so phrases never span them ("analysis of graph networks" yields
+        "graph networks", not "analysis graph").
+        """
+        words = self.text_processor.words
+        min_n, max_n = self.min_n, self.max_n
+        window = []
+        
+        for token_id in token_ids:
+            if token_id == BOUNDARY:
+                window.clear()
+                continue
+            
+            window.append(token_id)
+            if len(window) > max_n:
+                del window[0]
+            
+            # Unigrams keep the original minimum of 4 characters
+            if min_n == 1 and len(words[token_id]) > 3:
+                yield token_id
+            for n in range(max(min_n, 2), min(max_n, len(window)) + 1):
+                yield tuple(window[-n:])
+    
+    def _term_name(self, key: TermKey, names: Dict[TermKey, str]) -> str:
+        """Readable term for a term key, memoized in names"""
+        name = names.get(key)
+        if name is None:
+            words = self.text_processor.words
+            if isinstance(key, tuple):
+                name = ' '.join(words[i] for i in key)
+            else:
+                name = words[key]
+            names[key] = name
+        return name
 
+
+def _count_chunk(chunk: List[Tuple[str, str, bool]], ngram_range: Tuple[int, int],
+                 include_abstracts: bool, normalize: bool = False) -> Tuple[Counter, Counter]:
+    """
+    Map step run in a worker process: count terms of one chunk of papers.
+    
+    Args:
+        chunk: (title, abstract, count_df) per paper
+        ngram_range: Smallest and largest n-gram length to count
+        include_abstracts: Count abstract terms as well as title terms
+        normalize: Fold word variants as the parent's TextProcessor does
+    
+    Returns:
+        Term counts, and document frequencies of the papers flagged count_df
+    """
+    extractor = KeywordExtractor(ngram_range=ngram_range, include_abstracts=include_abstracts,
+                                 text_processor=TextProcessor(normalize=normalize),
+                                 parallel_threshold=0)
+    processor = extractor.text_processor
+    key_counts = Counter()
+    df_counts = Counter()
+    
+    for title, abstract, count_df in chunk:
+        keys = list(extractor._term_keys(processor.token_ids(title)))
+        if include_abstracts:
+            keys.extend(extractor._term_keys(processor.token_ids(abstract)))
+        key_counts.update(keys)
+        if count_df:
+            df_counts.update(set(keys))
+    
+    names = {}
+    return (
+        Counter({extractor._term_name(k, names): c for k, c in key_counts.items()}),
+        Counter({extractor._term_name(k, names): c for k, c in df_counts.items()})
+    )
@@ -0,0 +1,331 @@
+"""
+Metrics Module for Sintesa
+Process-wide counters and latency histograms, plus the logging setup shared by all entry points
+"""
+
+from typing import Dict, Any, Tuple, Optional
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+
+# Latency bucket upper bounds in seconds (+Inf is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prefix of every metric name in the Prometheus text format
+METRIC_PREFIX = 'sintesa_'
+
+# Sorted (label, value) pairs identifying one series of a metric
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Latency histogram over LATENCY_BUCKETS"""
+    
+    __slots__ = ('bucket_counts', 'count', 'sum', 'max')
+    
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the maximum for the last bucket)"""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.bucket_counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'max': round(self.max, 6)
+        }
+
+
+class MetricsRegistry:
+    """
+    Counters and latency histograms keyed by name and labels.
+    
+    One registry per process (REGISTRY) collects from every module. Caches
+    that already count their own hits are registered with track_cache() and
+    read only when a snapshot is taken, keeping their hot paths untouched.
+    Metrics of export worker processes stay in those processes.
+    """
+    
+    def __init__(self):
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._caches: Dict[str, weakref.ref] = {}
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self.started_at = time.time()
+    
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add value to a counter"""
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def observe(self, name: str, seconds: float, **labels):
+        """Record a duration in a histogram"""
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+    
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Time a block into a histogram (recorded even if the block raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+    
+    def timed(self, name: str, **labels):
+        """Decorator timing every call of a function into a histogram"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def track_cache(self, name: str, cache: Any):
+        """Report an object's cache_hits and cache_misses attributes as a cache"""
+        with self._lock:
+            self._caches[name] = weakref.ref(cache)
+    
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Hits, misses and hit rate of every tracked cache still alive"""
+        with self._lock:
+            caches = [(name, ref()) for name, ref in self._caches.items()]
+        stats = {}
+        for name, cache in caches:
+            if cache is None:
+                continue
+            hits, misses = cache.cache_hits, cache.cache_misses
+            total = hits + misses
+            stats[name] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / total, 4) if total else 0.0
+            }
+        return stats
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        All metrics as plain data
+        
+        Series are keyed by their labels as "label=value,..." ('' without labels),
+        e.g. {'histograms': {'chart_seconds': {'chart=years': {'count': 3, ...}}}}
+        """
+        counters: Dict[str, Dict[str, float]] = {}
+        histograms: Dict[str, Dict[str, Dict[str, float]]] = {}
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                counters.setdefault(name, {})[_label_key(labels)] = value
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                histograms.setdefault(name, {})[_label_key(labels)] = histogram.to_dict()
+        return {
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'counters': counters,
+            'histograms': histograms,
+            'caches': self.cache_stats()
+        }
+    
+    def to_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                ((key, list(h.bucket_counts), h.sum, h.count) for key, h in self._histograms.items()),
+                key=lambda item: item[0]
+            )
+        
+        typed = set()
+        for (name, labels), value in counters:
+            metric = METRIC_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_prometheus_labels(labels)} {value}")
+        
+        for (name, labels), bucket_counts, total, count in histograms:
+            metric = METRIC_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + ('+Inf',), bucket_counts):
+                cumulative += bucket_count
+                bucket_labels = labels + (('le', str(bound)),)
+                lines.append(f"{metric}_bucket{_prometheus_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{metric}_sum{_prometheus_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_prometheus_labels(labels)} {count}")
+        
+        caches = self.cache_stats()
+        for suffix, field in (('cache_hits_total', 'hits'), ('cache_misses_total', 'misses')):
+            if caches:
+                lines.append(f"# TYPE {METRIC_PREFIX}{suffix} counter")
+            for name, stats in caches.items():
+                lines.append(f"{METRIC_PREFIX}{suffix}{_prometheus_labels((('cache', name),))} {stats[field]}")
+        
+        lines.append(f"# TYPE {METRIC_PREFIX}uptime_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}uptime_seconds {time.time() - self.started_at:.1f}")
+        return '\n'.join(lines) + '\n'
+    
+    def write_prometheus(self, path: Path, min_interval: float = 0.0) -> bool:
+        """
+        Write the Prometheus text file (for node_exporter's textfile collector)
+        
+        Args:
+            path: Output file, replaced atomically
+            min_interval: Skip the write if the last one is more recent than this
+        
+        Returns:
+            True if the file was written
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._last_write and now - self._last_write < min_interval:
+                return False
+            self._last_write = now
+        
+        path = Path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(self.to_prometheus(), encoding='utf-8')
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logging.getLogger(__name__).warning("Could not write metrics file: %s", e, extra={'path': str(path)})
+            return False
+    
+    def reset(self):
+        """Drop all counters and histograms (tracked caches are kept)"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _label_key(labels: Labels) -> str:
+    return ','.join(f"{name}={value}" for name, value in labels)
+
+
+def _prometheus_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        (name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+# Process-wide registry used by every module
+REGISTRY = MetricsRegistry()
+
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+
+
+# ----------------------------------------------------------------------
+# Logging
+# ----------------------------------------------------------------------
+
+# LogRecord attributes; anything else on a record came in through extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Log lines with the fields passed through extra= appended.
+    
+    'text' gives "time level logger: message key=value ...", 'json' gives
+    one JSON object per line for log collectors.
+    """
+    
+    def __init__(self, style: str = 'text'):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s')
+        self.json = style == 'json'
+    
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            key: value for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_')
+        }
+        if not self.json:
+            line = super().format(record)
+            if fields:
+                line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+            return line
+        
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        entry.update(fields)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: str = 'INFO', style: str = 'text', logfile: Optional[Path] = None):
+    """
+    Send log records of every module to stderr (and optionally a file)
+    
+    Args:
+        level: Minimum level, e.g. 'INFO' or 'DEBUG'
+        style: 'text' or 'json' lines
+        logfile: Also append log lines to this file
+    """
+    formatter = StructuredFormatter(style)
+    handlers = [logging.StreamHandler()]
+    if logfile is not None:
+        Path(logfile).parent.mkdir(parents=True, exist_ok=True)
+        handlers.append(logging.FileHandler(logfile, encoding='utf-8'))
+    
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(level)
@@ -0,0 +1,202 @@
+"""
+Profiling Module for Sintesa
+Opt-in cProfile and tracemalloc reports for sampled API calls
+"""
+
+from typing import Iterable, List, Optional, Callable
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+import cProfile
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Functions listed in the CPU section of a report, by cumulative time
+REPORT_CPU_ENTRIES = 40
+
+# Limits of a report, stated in its header
+REPORT_NOTE = (
+    "Note: work in worker processes (parallel keyword counting, export jobs) is not\n"
+    "profiled and appears as time waiting on the pool. Threads started and memory\n"
+    "allocated by concurrent calls (e.g. other server sessions) are included.\n"
+)
+
+
+class CallProfiler:
+    """
+    Profiles a sample of calls to selected methods.
+    
+    A sampled call runs under cProfile and, with memory profiling on, under
+    tracemalloc. Each profiled call leaves two files in output_dir, named by
+    call and timestamp: a .prof file for pstats or snakeviz, and a .txt
+    report with the top functions and top allocation sites. Calls that are
+    not sampled, or that start while another call is being profiled, run
+    unprofiled at the cost of one random draw.
+    
+    Threads started during the call (e.g. DataFetcher's per-search source
+    threads) get their own profiler, merged into the report. Two blind
+    spots remain and are stated in every report: work in worker processes
+    (parallel keyword counting, export jobs) shows up only as waiting, and
+    both thread profiling and tracemalloc are process-wide, so threads and
+    allocations of concurrent calls (other server sessions) are included.
+    """
+    
+    def __init__(self, output_dir: Path, sample_rate: float = 1.0, memory: bool = True,
+                 top_allocations: int = 25, max_reports: int = 200):
+        """
+        Args:
+            output_dir: Directory receiving the reports
+            sample_rate: Fraction of calls profiled (0.0 - 1.0)
+            memory: Also trace allocations (slower than CPU profiling alone)
+            top_allocations: Allocation sites listed in a report
+            max_reports: Profiled calls kept; the oldest reports are deleted
+        """
+        self.output_dir = Path(output_dir)
+        self.sample_rate = sample_rate
+        self.memory = memory
+        self.top_allocations = top_allocations
+        self.max_reports = max_reports
+        
+        # cProfile and tracemalloc are process-wide: one profiled call at a time
+        self._lock = threading.Lock()
+    
+    def instrument(self, cls: type, method_names: Iterable[str]):
+        """Replace the named methods of cls with profiled wrappers"""
+        method_names = list(method_names)
+        for name in method_names:
+            method = getattr(cls, name, None)
+            if not callable(method):
+                logger.warning("Cannot profile unknown method %s.%s", cls.__name__, name)
+                continue
+            setattr(cls, name, self.wrap(method, name))
+        logger.info("Profiling %s calls", cls.__name__, extra={
+            'methods': ','.join(method_names), 'sample_rate': self.sample_rate, 'memory': self.memory
+        })
+    
+    def wrap(self, func: Callable, name: Optional[str] = None) -> Callable:
+        """Profiled version of func"""
+        name = name or func.__name__
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return func(*args, **kwargs)
+            if not self._lock.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                return self._profile(name, func, args, kwargs)
+            finally:
+                self._lock.release()
+        return wrapper
+    
+    def _profile(self, name: str, func: Callable, args, kwargs):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) owns the profiling hook
+            return func(*args, **kwargs)
+        
+        # New threads profile themselves from their first event on; the
+        # profiler replaces this hook in the thread that calls it
+        thread_profilers = []
+        
+        def profile_new_thread(*_):
+            thread_profiler = cProfile.Profile()
+            thread_profilers.append(thread_profiler)
+            thread_profiler.enable()
+        
+        previous_hook = threading.getprofile()
+        threading.setprofile(profile_new_thread)
+        
+        started_tracing = False
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+        
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            threading.setprofile(previous_hook)
+            elapsed = time.perf_counter() - start
+            snapshot = peak = None
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                snapshot = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+            self._save(name, profiler, thread_profilers, elapsed, snapshot, peak)
+    
+    def _save(self, name: str, profiler: cProfile.Profile, thread_profilers: List[cProfile.Profile],
+              elapsed: float, snapshot: Optional[tracemalloc.Snapshot], peak: Optional[int]):
+        """Write the .prof and .txt files of one profiled call"""
+        stem = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            out = io.StringIO()
+            stats = pstats.Stats(profiler, stream=out)
+            if thread_profilers:
+                stats.add(*thread_profilers)
+            stats.dump_stats(str(self.output_dir / f"{stem}.prof"))
+            report = self._report(name, stats, out, len(thread_profilers), elapsed, snapshot, peak)
+            (self.output_dir / f"{stem}.txt").write_text(report, encoding='utf-8')
+            self._prune()
+        except OSError as e:
+            logger.warning("Could not save profile: %s", e, extra={'method': name})
+            return
+        
+        metrics.inc('profiles_total', method=name)
+        logger.info("Profiled call", extra={
+            'method': name, 'duration_ms': round(elapsed * 1000, 1), 'report': str(self.output_dir / f"{stem}.txt")
+        })
+    
+    def _report(self, name: str, stats: pstats.Stats, out: io.StringIO, threads: int, elapsed: float,
+                snapshot: Optional[tracemalloc.Snapshot], peak: Optional[int]) -> str:
+        out.write(f"Call: {name}\n")
+        out.write(f"Time: {datetime.now().isoformat(timespec='seconds')}\n")
+        out.write(f"Duration: {elapsed:.3f} s\n")
+        out.write(f"Threads profiled: calling thread + {threads} started during the call\n")
+        if peak is not None:
+            out.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MB\n")
+        out.write(REPORT_NOTE)
+        
+        out.write(f"\n== CPU: top {REPORT_CPU_ENTRIES} functions by cumulative time ==\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_CPU_ENTRIES)
+        
+        if snapshot is not None:
+            # Allocations by the profiler, tracemalloc and first-use imports are noise
+            snapshot = snapshot.filter_traces((
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, __file__)
+            ))
+            out.write(f"\n== Memory: top {self.top_allocations} allocation sites still held ==\n")
+            for stat in snapshot.statistics('lineno')[:self.top_allocations]:
+                out.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {stat.traceback}\n")
+        return out.getvalue()
+    
+    def _prune(self):
+        """Delete the oldest reports beyond max_reports"""
+        reports = sorted(self.output_dir.glob('*.txt'), key=lambda path: path.stat().st_mtime)
+        for report in reports[:max(0, len(reports) - self.max_reports)]:
+            for path in (report, report.with_suffix('.prof')):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
@@ -4,14 +4,17 @@ Uses scholarly library for reliable access
 """
 
 from typing import List, Dict, Optional, Any
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
 try:
     from scholarly import scholarly, ProxyGenerator
     SCHOLARLY_AVAILABLE = True
 except ImportError:
     SCHOLARLY_AVAILABLE = False
-    print("[Scholar] WARNING: 'scholarly' library not installed. Install with: pip install scholarly")
+    logger.warning("'scholarly' library not installed. Install with: pip install scholarly")
 
 from .base_source import BaseSource, SearchResult
 
@@ -36,7 +39,7 @@ class ScholarSource(BaseSource):
             # scholarly.use_proxy(pg)
             pass
         except Exception as e:
-            print(f"[Scholar] Warning: Could not setup proxy: {e}")
+            logger.warning("Could not setup proxy: %s", e)
     
     @property
     def source_config(self) -> Dict[str, Any]:
@@ -60,16 +63,15 @@ class ScholarSource(BaseSource):
             search_type: Type of search - 'all', 'title', 'author', 'journal', 'keywords'
         """
         if not SCHOLARLY_AVAILABLE:
-            print("[Scholar] ERROR: 'scholarly' library not installed")
-            print("[Scholar] Install with: pip install scholarly")
+            logger.error("'scholarly' library not installed. Install with: pip install scholarly")
             return []
         
         if not self.is_enabled():
-            print("[Scholar] Source is disabled")
+            logger.info("Source is disabled")
             return []
         
-        print(f"[Scholar] Searching for: {query} (type: {search_type})")
-        print(f"[Scholar] Note: Google Scholar may take longer due to rate limiting")
+        logger.info("Searching for: %s", query, extra={'source': self.source_name, 'search_type': search_type})
+        logger.info("Google Scholar may take longer due to rate limiting")
         
         try:
             results = []
@@ -107,22 +109,22 @@ class ScholarSource(BaseSource):
                         
                         # Progress indicator
                         if count % 10 == 0:
-                            print(f"[Scholar] Progress: {count}/{max_results} papers")
+                            logger.info("Progress: %d/%d papers", count, max_results, extra={'source': self.source_name})
                     
                     # Small delay to avoid rate limiting
                     if count < max_results:
                         time.sleep(0.5)
-                        
+                
                 except Exception as e:
-                    print(f"[Scholar] Error parsing result: {e}")
+                    logger.error("Error parsing result: %s", e, extra={'source': self.source_name})
                     continue
             
-            print(f"[Scholar] Found {len(results)} results")
+            logger.info("Found %d results", len(results), extra={'source': self.source_name})
             return results
-            
+        
         except Exception as e:
-            print(f"[Scholar] Error: {e}")
-            print(f"[Scholar] This may be due to rate limiting. Try again later or use fewer results.")
+            logger.error("Error: %s", e, extra={'source': self.source_name})
+            logger.warning("This may be due to rate limiting. Try again later or use fewer results.")
             return []
     
     def _build_scholar_query(self, query: str, search_type: str) -> str:
@@ -187,8 +189,8 @@ class ScholarSource(BaseSource):
                 source="Google Scholar",
                 raw_data=result
             )
-            
+        
         except Exception as e:
-            print(f"[Scholar] Error parsing result: {e}")
+            logger.error("Error parsing result: %s", e, extra={'source': self.source_name})
             return None
 
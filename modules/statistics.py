@@ -0,0 +1,139 @@
+"""
+Statistics Module for Sintesa
+One cached set of aggregates per result set, shared by the API and the exporter
+"""
+
+from typing import List, Dict, Optional, Any, Callable
+from collections import Counter, OrderedDict
+import hashlib
+import threading
+
+from .aggregates import PaperAggregates, paper_key
+
+
+class StatisticsEngine:
+    """
+    Computes every aggregate of a result set in one pass and caches it.
+    
+    Results are cached by a fingerprint of the papers' identities and
+    citation counts, so the statistics panel, the charts and every export
+    format of the same result set share a single pass, while a re-search
+    returning updated citations is recomputed. A result set that grows by
+    appending (more pages) is updated incrementally on a copy of the
+    smaller set's aggregates: aggregates already returned are never
+    modified, so callers (e.g. other server sessions) can keep using them;
+    token counts requested later are likewise added to a copy.
+    """
+    
+    def __init__(self, token_counter: Optional[Callable[[List[Dict]], Counter]] = None,
+                 max_cached: int = 4):
+        """
+        Args:
+            token_counter: Callable returning keyword token counts for a batch
+                of papers; only used when aggregates are requested with tokens
+            max_cached: Result sets whose aggregates are kept
+        """
+        self.token_counter = token_counter
+        self.max_cached = max_cached
+        
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # The most recently computed result set, for append-only growth
+        self._last_fingerprint = None
+        self._last_head_key = None
+        self._last_tail_key = None
+        
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def aggregates(self, papers: List[Dict[str, Any]], tokens: bool = False) -> PaperAggregates:
+        """
+        Aggregates covering exactly the given papers
+        
+        Args:
+            papers: Result set
+            tokens: Also keep keyword token counts (computed on first request)
+        """
+        with self._lock:
+            fingerprint = self.fingerprint(papers)
+            aggregates = self._cache.get(fingerprint)
+            if aggregates is not None:
+                self._cache.move_to_end(fingerprint)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+                aggregates = self._extend_last(papers)
+                if aggregates is None:
+                    aggregates = PaperAggregates().update(papers)
+                self._store(fingerprint, aggregates, papers)
+        
+        if not tokens or self.token_counter is None or aggregates.token_counter is not None:
+            return aggregates
+        
+        # Token counting is slow (possibly a process-pool map), so it runs
+        # outside the lock, on a copy that then replaces the cached entry
+        counted = aggregates.copy().count_tokens(papers, self.token_counter)
+        with self._lock:
+            current = self._cache.get(fingerprint)
+            if current is not None and current.token_counter is not None:
+                # Another caller counted the same result set first
+                return current
+            if current is not None:
+                self._cache[fingerprint] = counted
+        return counted
+    
+    def seed(self, papers: List[Dict[str, Any]], aggregates: PaperAggregates):
+        """Cache aggregates computed elsewhere (e.g. by the parent of an export worker)"""
+        with self._lock:
+            self._store(self.fingerprint(papers), aggregates, papers)
+    
+    @staticmethod
+    def fingerprint(papers: List[Dict[str, Any]]) -> str:
+        """Identity of a result set: hash of its papers' keys and citation counts, in order"""
+        digest = hashlib.blake2b(digest_size=16)
+        for paper in papers:
+            digest.update(_paper_identity(paper).encode('utf-8'))
+            digest.update(b'\n')
+        return digest.hexdigest()
+    
+    def clear(self):
+        """Drop all cached aggregates"""
+        with self._lock:
+            self._cache.clear()
+            self._last_fingerprint = None
+    
+    def _extend_last(self, papers: List[Dict[str, Any]]) -> Optional[PaperAggregates]:
+        """Fold new papers into the last result set's aggregates if papers extends it"""
+        aggregates = self._cache.get(self._last_fingerprint)
+        if aggregates is None:
+            return None
+        
+        # Checking the boundary papers keeps the test O(1); result sets
+        # only ever grow by appending pages, they are never spliced
+        known = aggregates.paper_count
+        if not (
+            0 < known < len(papers)
+            and _paper_identity(papers[0]) == self._last_head_key
+            and _paper_identity(papers[known - 1]) == self._last_tail_key
+        ):
+            return None
+        
+        # Earlier callers may still be reading the smaller set's aggregates,
+        # which stay cached unchanged
+        return aggregates.copy().update(papers[known:])
+    
+    def _store(self, fingerprint: str, aggregates: PaperAggregates, papers: List[Dict[str, Any]]):
+        self._cache[fingerprint] = aggregates
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        
+        self._last_fingerprint = fingerprint
+        if papers:
+            self._last_head_key = _paper_identity(papers[0])
+            self._last_tail_key = _paper_identity(papers[-1])
+
+
+def _paper_identity(paper: Dict[str, Any]) -> str:
+    """Paper key plus citation count: the same paper with new citations aggregates differently"""
+    return f"{paper_key(paper)}\t{paper.get('citations') or 0}"
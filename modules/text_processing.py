@@ -0,0 +1,270 @@
+"""
+Text Processing Module for Sintesa
+Shared tokenizer and per-paper token cache used by keyword extraction and charts
+"""
+
+from typing import List, Dict, Any, NamedTuple
+from collections import OrderedDict
+from array import array
+from functools import lru_cache
+import re
+import threading
+
+from .aggregates import paper_key
+
+# Runs of ASCII letters in lowercased text
+TOKEN_PATTERN = re.compile(r'[a-z]+')
+
+# Words shorter than this never become tokens
+MIN_TOKEN_LENGTH = 3
+
+# Token id marking a stop word or short word: phrases never span it
+BOUNDARY = 0
+
+# Common stop words for academic titles and abstracts
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
+    'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'it', 'its', 'they', 'them', 'their', 'we', 'our',
+    'you', 'your', 'i', 'he', 'she', 'him', 'her', 'what', 'which', 'who',
+    'when', 'where', 'why', 'how', 'all', 'each', 'every', 'both', 'few',
+    'more', 'most', 'other', 'some', 'such', 'only', 'own', 'same', 'so',
+    'than', 'too', 'very', 'also', 'however', 'therefore', 'thus',
+    'furthermore', 'moreover', 'nevertheless', 'using', 'used', 'based',
+    'study', 'research', 'analysis', 'paper', 'review', 'results', 'method',
+    'new', 'novel', 'approach'
+})
+
+# Surface forms kept in the normalization memo
+NORMALIZE_CACHE_SIZE = 65536
+
+# Plural endings that are not plurals ("analysis", "process", "physics", ...)
+_SINGULAR_ENDINGS = ('ss', 'us', 'is', 'as', 'ics', 'ous')
+_PLURAL_EXCEPTIONS = frozenset({'series', 'species', 'news', 'lens', 'always', 'perhaps', 'towards'})
+
+# Greek -is and Latin -ix/-ex plurals ("analyses" is not the plural of
+# "analyse", "matrices" not that of "matrice")
+_IRREGULAR_PLURALS = {
+    'analyses': 'analysis', 'hypotheses': 'hypothesis', 'syntheses': 'synthesis',
+    'diagnoses': 'diagnosis', 'prognoses': 'prognosis', 'theses': 'thesis', 'crises': 'crisis',
+    'axes': 'axis', 'parentheses': 'parenthesis',
+    'matrices': 'matrix', 'appendices': 'appendix', 'indices': 'index', 'vertices': 'vertex',
+    'vortices': 'vortex', 'cortices': 'cortex', 'simplices': 'simplex', 'apices': 'apex'
+}
+
+# Singulars ending in -ie, whose plurals must not become -y ("movies" is not "movy")
+_IE_SINGULARS = frozenset({'movie', 'cookie', 'zombie', 'calorie', 'selfie', 'rookie', 'hippie',
+                           'smoothie', 'prairie', 'sortie', 'necktie', 'goalie', 'freebie',
+                           'newbie', 'genie', 'auntie', 'brownie', 'pixie', 'birdie', 'techie',
+                           'foodie', 'bookie', 'yuppie', 'veggie', 'talkie', 'boogie', 'lassie'})
+
+# Words ending in -ed that are not past participles
+_ED_EXCEPTIONS = frozenset({'hundred', 'kindred', 'sacred', 'naked', 'wicked', 'rugged',
+                            'ragged', 'crooked', 'jagged', 'beloved'})
+
+# Genuine -ise words; anything ending in one of these keeps its spelling
+_ISE_WORDS = ('advise', 'arise', 'chastise', 'comprise', 'compromise', 'concise', 'demise',
+              'despise', 'devise', 'disguise', 'enterprise', 'excise', 'exercise', 'expertise',
+              'franchise', 'improvise', 'incise', 'merchandise', 'noise', 'otherwise', 'paradise',
+              'poise', 'praise', 'precise', 'premise', 'promise', 'raise', 'revise', 'rise',
+              'supervise', 'surprise', 'televise', 'treatise', 'cruise', 'wise', 'advertise')
+
+# British stems whose 'our' becomes 'or' (colour, behavioural, neighbourhood, ...)
+_OUR_STEMS = ('armour', 'behaviour', 'clamour', 'colour', 'endeavour', 'favour', 'flavour',
+              'harbour', 'honour', 'humour', 'labour', 'neighbour', 'odour', 'rumour', 'savour',
+              'tumour', 'valour', 'vapour', 'vigour')
+
+# British stems with a doubled 'l' before -ed/-ing/-er (modelled, labelling, ...)
+_DOUBLED_L_STEMS = ('model', 'label', 'travel', 'signal', 'channel', 'tunnel', 'cancel',
+                    'level', 'fuel', 'total', 'counsel', 'funnel', 'marshal', 'jewel', 'pedal')
+
+# Whole-word British spellings
+_BRITISH_WORDS = {
+    'centre': 'center', 'metre': 'meter', 'fibre': 'fiber', 'litre': 'liter',
+    'theatre': 'theater', 'calibre': 'caliber', 'spectre': 'specter',
+    'catalogue': 'catalog', 'analogue': 'analog', 'programme': 'program',
+    'defence': 'defense', 'offence': 'offense', 'licence': 'license',
+    'ageing': 'aging', 'grey': 'gray', 'aluminium': 'aluminum', 'tyre': 'tire',
+    'analyse': 'analyze', 'analysed': 'analyzed', 'analysing': 'analyzing',
+    'paralyse': 'paralyze', 'catalyse': 'catalyze', 'catalysed': 'catalyzed',
+}
+
+_ISE_SUFFIXES = (('isations', 'izations'), ('isation', 'ization'), ('ising', 'izing'),
+                 ('ised', 'ized'), ('iser', 'izer'), ('ises', 'izes'), ('ise', 'ize'))
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_term(word: str) -> str:
+    """
+    Fold a lowercase word to its normal form.
+    
+    Light stemming only: plurals become singular, a small set of -ed
+    participles lose the suffix, and British spellings become American.
+    The normal form is always a readable word, so it doubles as the
+    keyword shown to the user. Memoized: each surface form is processed once.
+    """
+    word = _singular(word)
+    word = _american(word)
+    if word.endswith('ed'):
+        word = _strip_ed(word)
+    return word
+
+
+def _singular(word: str) -> str:
+    if word in _IRREGULAR_PLURALS:
+        return _IRREGULAR_PLURALS[word]
+    if len(word) <= 3 or not word.endswith('s') or word in _PLURAL_EXCEPTIONS:
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-1] if word[:-1] in _IE_SINGULARS else word[:-3] + 'y'
+    if word.endswith(('sses', 'xes', 'ches', 'shes', 'zzes')):
+        return word[:-2]
+    if word.endswith(_SINGULAR_ENDINGS):
+        return word
+    return word[:-1]
+
+
+def _american(word: str) -> str:
+    if word in _BRITISH_WORDS:
+        return _BRITISH_WORDS[word]
+    
+    for british, american in _ISE_SUFFIXES:
+        if word.endswith(british) and len(word) - len(british) >= 3:
+            base = word[:-len(british)] + 'ise'
+            if not base.endswith(_ISE_WORDS):
+                return word[:-len(british)] + american
+            break
+    
+    if word.startswith(_OUR_STEMS):
+        index = word.index('our')
+        return word[:index] + 'or' + word[index + 3:]
+    
+    for stem in _DOUBLED_L_STEMS:
+        if word.startswith(stem + 'l') and word[len(stem) + 1:] in ('ed', 'ing', 'er', 'ers'):
+            return stem + word[len(stem) + 1:]
+    return word
+
+
+def _strip_ed(word: str) -> str:
+    """Drop -ed only where no silent 'e' can be lost ("networked", "embedded")"""
+    base = word[:-2]
+    if len(word) <= 5 or word in _ED_EXCEPTIONS or word.endswith('eed'):
+        return word
+    
+    last, before = base[-1], base[-2]
+    vowels = 'aeiouy'
+    if last == before and last not in 'lsfz':
+        # Doubled final consonant: embedded -> embed, transferred -> transfer
+        return base[:-1]
+    if last not in vowels and before not in vowels and last not in 'cgsvz':
+        # Consonant cluster: networked -> network, connected -> connect
+        return base
+    return word
+
+
+class PaperTokens(NamedTuple):
+    """Token ids of a paper's title and abstract"""
+    title: array
+    abstract: array
+
+
+class TextProcessor:
+    """
+    Tokenizes each paper once and caches its token ids by paper identity.
+    
+    Keyword extraction, the word cloud and the keyword network all read
+    the cached ids instead of re-tokenizing the same titles and abstracts.
+    """
+    
+    def __init__(self, stop_words=STOP_WORDS, max_cached_papers: int = 100000,
+                 normalize: bool = False):
+        """
+        Args:
+            stop_words: Words that are dropped and end phrases
+            max_cached_papers: Papers kept in the token cache (least recently
+                used papers are evicted first)
+            normalize: Fold plurals, -ed forms and British spellings so that
+                "network", "networks" and "networked" share one token id
+        """
+        self.stop_words = stop_words
+        self.max_cached_papers = max_cached_papers
+        self.normalize = normalize
+        
+        # Word (normal form when normalizing) <-> id; id 0 is the phrase boundary
+        self.vocab: Dict[str, int] = {}
+        self.words: List[str] = ['']
+        
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def paper_tokens(self, paper: Dict[str, Any]) -> PaperTokens:
+        """Token ids of a paper's title and abstract, tokenized at most once"""
+        key = paper_key(paper)
+        with self._lock:
+            tokens = self._cache.get(key)
+            if tokens is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return tokens
+            
+            self.cache_misses += 1
+            tokens = PaperTokens(
+                self.token_ids(paper.get('title', '') or ''),
+                self.token_ids(paper.get('abstract', '') or '')
+            )
+            self._cache[key] = tokens
+            if len(self._cache) > self.max_cached_papers:
+                self._cache.popitem(last=False)
+            return tokens
+    
+    def token_ids(self, text: str) -> array:
+        """Tokenize text into word ids, with BOUNDARY for stop and short words"""
+        ids = array('I')
+        if not text:
+            return ids
+        
+        vocab = self.vocab
+        stop_words = self.stop_words
+        normalize = self.normalize
+        with self._lock:
+            for word in TOKEN_PATTERN.findall(text.lower()):
+                if normalize and word not in stop_words:
+                    # Stop words are matched on the normal form too: "studies" is dropped as "study"
+                    word = normalize_term(word)
+                if len(word) < MIN_TOKEN_LENGTH or word in stop_words:
+                    # Consecutive boundaries carry no extra information
+                    if ids and ids[-1] != BOUNDARY:
+                        ids.append(BOUNDARY)
+                    continue
+                
+                token_id = vocab.get(word)
+                if token_id is None:
+                    token_id = vocab[word] = len(self.words)
+                    self.words.append(word)
+                ids.append(token_id)
+        return ids
+    
+    def word(self, token_id: int) -> str:
+        """Surface word for a token id"""
+        return self.words[token_id]
+    
+    def phrase_ids(self, phrase: str) -> List[int]:
+        """Token ids of a keyword or phrase (empty if any word is unknown)"""
+        ids = []
+        for word in TOKEN_PATTERN.findall(phrase.lower()):
+            if self.normalize:
+                word = normalize_term(word)
+            token_id = self.vocab.get(word)
+            if token_id is None:
+                return []
+            ids.append(token_id)
+        return ids
+    
+    def clear(self):
+        """Drop all cached tokens (the vocabulary is kept)"""
+        with self._lock:
+            self._cache.clear()
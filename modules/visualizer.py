@@ -5,17 +5,27 @@ Creates simple visualizations without AI/ML
 
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from typing import List, Dict, Optional, Union
 import pandas as pd
+import logging
 import re
 import numpy as np
 import json
+from collections import Counter
+from itertools import combinations
+
+from .text_processing import TextProcessor, BOUNDARY
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
 try:
     import networkx as nx
     NETWORKX_AVAILABLE = True
 except ImportError:
     NETWORKX_AVAILABLE = False
-    print("[Viz] NetworkX not available - keyword network will be disabled")
+    logger.warning("NetworkX not available - keyword network will be disabled")
 
 try:
     from wordcloud import WordCloud
@@ -24,13 +34,55 @@ try:
     WORDCLOUD_AVAILABLE = True
 except ImportError:
     WORDCLOUD_AVAILABLE = False
-    print("[Viz] WordCloud not available - wordcloud visualization will be disabled")
+    logger.warning("WordCloud not available - wordcloud visualization will be disabled")
+
+try:
+    import orjson  # noqa: F401
+    JSON_ENGINE = 'orjson'
+except ImportError:
+    JSON_ENGINE = 'json'
+
+# Supported chart output formats
+OUTPUT_FORMATS = ('html', 'json')
+
+# Abstract tokens per paper fed to the word cloud (about 200 characters)
+ABSTRACT_WORDCLOUD_TOKENS = 25
+
+# Supported citation histogram binning strategies
+CITATION_BIN_MODES = ('auto', 'linear', 'log', 'quantile')
 
 
 class Visualizer:
     """Create simple visualizations for research data"""
     
-    def __init__(self):
+    def __init__(self, output_format: str = 'html', webgl_threshold: int = 1000,
+                 density_threshold: int = 10000, binning_threshold: int = 1000,
+                 citation_bins: str = 'auto', text_processor: TextProcessor = None):
+        """
+        Args:
+            output_format: 'html' returns embeddable HTML snippets,
+                'json' returns compact Plotly figure JSON for Plotly.newPlot
+            webgl_threshold: Papers above which the timeline uses WebGL markers
+            density_threshold: Papers above which the timeline is binned
+                server-side into a year x citations density heatmap
+            binning_threshold: Papers above which citation histograms are
+                binned with NumPy instead of shipping raw values
+            citation_bins: 'auto', 'linear', 'log' or 'quantile' bins for
+                server-side citation histograms
+            text_processor: Shared TextProcessor whose cached paper tokens
+                feed the word cloud and keyword network
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        if citation_bins not in CITATION_BIN_MODES:
+            raise ValueError(f"Unsupported citation binning: {citation_bins}")
+        self.output_format = output_format
+        self.webgl_threshold = webgl_threshold
+        self.density_threshold = density_threshold
+        self.binning_threshold = binning_threshold
+        self.citation_bins = citation_bins
+        self.text_processor = text_processor or TextProcessor()
+        
         self.default_layout = {
             'template': 'plotly_white',
             'font': {'family': 'Arial, sans-serif', 'size': 12},
@@ -43,23 +95,33 @@ class Visualizer:
             'success': '#2ecc71',
         }
     
-    def plot_publications_per_year(self, papers: List[Dict]) -> str:
-        """Create bar chart showing publications per year"""
+    @metrics.timed('chart_seconds', chart='years')
+    def plot_publications_per_year(self, papers: List[Dict], aggregates=None) -> str:
+        """
+        Create bar chart showing publications per year.
+        
+        Args:
+            papers: List of papers
+            aggregates: Optional PaperAggregates already covering papers;
+                its year histogram is used instead of rescanning the papers
+        """
         try:
-            df = pd.DataFrame(papers)
-            
-            # Extract year from publication_date
-            df['year'] = df['publication_date'].apply(self._extract_year)
-            df = df.dropna(subset=['year'])
-            
-            if df.empty:
+            if aggregates is not None:
+                year_counts = sorted(aggregates.year_counts.items())
+            else:
+                df = pd.DataFrame(papers)
+                
+                # Extract year from publication_date
+                df['year'] = df['publication_date'].apply(self._extract_year)
+                df = df.dropna(subset=['year'])
+                year_counts = sorted(df['year'].value_counts().items())
+            
+            if not year_counts:
                 return self._create_empty_chart("No valid year data")
             
-            year_counts = df['year'].value_counts().sort_index()
-            
             # Convert to lists to avoid binary encoding
-            years = list(year_counts.index)
-            counts = [int(c) for c in year_counts.values]
+            years = [int(y) for y, c in year_counts]
+            counts = [int(c) for y, c in year_counts]
             
             fig = go.Figure(data=[
                 go.Bar(
@@ -79,12 +141,13 @@ class Visualizer:
                 height=500
             )
             
-            return fig.to_html(full_html=False, include_plotlyjs=False)
-            
+            return self._render(fig)
+        
         except Exception as e:
-            print(f"Error creating year chart: {e}")
+            logger.error("Error creating year chart: %s", e)
             return self._create_empty_chart(f"Error: {e}")
     
+    @metrics.timed('chart_seconds', chart='citations')
     def plot_citations_distribution(self, papers: List[Dict]) -> str:
         """Create histogram showing citation distribution"""
         try:
@@ -102,17 +165,20 @@ class Visualizer:
                     f"Total Papers: {len(df)}<br>This is normal for papers from sources<br>that don't provide citation counts"
                 )
             
-            # Convert to list to avoid binary encoding
-            citations = [int(c) for c in df['citations']]
-            
-            fig = go.Figure(data=[
-                go.Histogram(
+            if len(df) > self.binning_threshold:
+                # Large result sets: bin server-side, ship only bin counts
+                trace = self._binned_citation_trace(df['citations'].to_numpy())
+            else:
+                # Convert to list to avoid binary encoding
+                citations = [int(c) for c in df['citations']]
+                trace = go.Histogram(
                     x=citations,
                     nbinsx=20,
                     marker=dict(color=self.colors['success']),
                     hovertemplate='Citations: %{x}<br>Count: %{y}<extra></extra>'
                 )
-            ])
+            
+            fig = go.Figure(data=[trace])
             
             fig.update_layout(
                 **self.default_layout,
@@ -123,12 +189,13 @@ class Visualizer:
                 height=500
             )
             
-            return fig.to_html(full_html=False, include_plotlyjs=False)
-            
+            return self._render(fig)
+        
         except Exception as e:
-            print(f"Error creating citation chart: {e}")
+            logger.error("Error creating citation chart: %s", e)
             return self._create_empty_chart(f"Error: {e}")
     
+    @metrics.timed('chart_seconds', chart='timeline')
     def create_timeline_chart(self, papers: List[Dict]) -> str:
         """Create timeline scatter plot"""
         try:
@@ -140,13 +207,23 @@ class Visualizer:
             if df.empty:
                 return self._create_empty_chart("No valid timeline data")
             
+            if len(df) > self.density_threshold:
+                # Very large result sets: aggregate into a density heatmap
+                return self._create_timeline_density(
+                    df['year'].to_numpy(dtype=np.int64),
+                    df['citations'].to_numpy(dtype=np.int64)
+                )
+            
             # Convert to lists to avoid binary encoding
             years = [int(y) for y in df['year']]
             citations = [int(c) for c in df['citations']]
             titles = list(df['title'])
             
+            # WebGL markers stay responsive well past SVG's few thousand points
+            scatter = go.Scattergl if len(df) > self.webgl_threshold else go.Scatter
+            
             fig = go.Figure(data=[
-                go.Scatter(
+                scatter(
                     x=years,
                     y=citations,
                     mode='markers',
@@ -165,27 +242,123 @@ class Visualizer:
                 height=500
             )
             
-            return fig.to_html(full_html=False, include_plotlyjs=False)
-            
+            return self._render(fig)
+        
         except Exception as e:
-            print(f"Error creating timeline: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error creating timeline: %s", e)
             return self._create_empty_chart(f"Error: {e}")
     
-    def plot_source_distribution(self, papers: List[Dict]) -> str:
-        """Create pie chart showing papers by source"""
+    def _create_timeline_density(self, years: np.ndarray, citations: np.ndarray) -> str:
+        """Create year x citations density heatmap from binned counts"""
+        year_edges = np.arange(years.min(), years.max() + 2)
+        citation_edges = self._citation_bin_edges(citations, 'log')
+        counts, _, _ = np.histogram2d(years, citations, bins=[year_edges, citation_edges])
+        
+        # Empty cells render transparent instead of as the lowest colour
+        z = [[int(c) if c else None for c in row] for row in counts.T.tolist()]
+        
+        fig = go.Figure(data=[
+            go.Heatmap(
+                x=[int(y) for y in year_edges[:-1]],
+                y=self._bin_labels(citation_edges),
+                z=z,
+                colorscale='Blues',
+                colorbar=dict(title='Papers'),
+                hovertemplate='Year: %{x}<br>Citations: %{y}<br>Papers: %{z}<extra></extra>'
+            )
+        ])
+        
+        fig.update_layout(
+            **self.default_layout,
+            title=f'Publication Timeline ({len(years):,} papers)',
+            xaxis_title='Year',
+            yaxis=dict(title='Citations', type='category'),
+            width=800,
+            height=500
+        )
+        
+        return self._render(fig)
+    
+    def _binned_citation_trace(self, citations: np.ndarray) -> go.Bar:
+        """Bin citation counts with NumPy and return a bar trace of the bins"""
+        mode = self.citation_bins
+        if mode == 'auto':
+            # Heavy-tailed distributions collapse into one linear bin
+            median = float(np.median(citations))
+            mode = 'log' if citations.max() > 50 * (median + 1) else 'linear'
+        
+        edges = self._citation_bin_edges(citations, mode)
+        counts, _ = np.histogram(citations, bins=edges)
+        counts = [int(c) for c in counts]
+        
+        if mode == 'linear':
+            return go.Bar(
+                x=[float(x) for x in (edges[:-1] + edges[1:]) / 2],
+                y=counts,
+                width=[float(w) for w in np.diff(edges)],
+                marker=dict(color=self.colors['success']),
+                hovertemplate='Citations: %{x}<br>Count: %{y}<extra></extra>'
+            )
+        
+        # Unequal bins are shown as ordered categories
+        return go.Bar(
+            x=self._bin_labels(edges),
+            y=counts,
+            marker=dict(color=self.colors['success']),
+            hovertemplate='Citations: %{x}<br>Count: %{y}<extra></extra>'
+        )
+    
+    def _citation_bin_edges(self, citations: np.ndarray, mode: str, bins: int = 20) -> np.ndarray:
+        """Compute integer citation bin edges for the given binning mode"""
+        max_citations = int(citations.max())
+        if mode == 'log':
+            edges = np.expm1(np.linspace(0, np.log1p(max_citations + 1), bins + 1))
+        elif mode == 'quantile':
+            edges = np.quantile(citations, np.linspace(0, 1, bins + 1))
+        else:
+            edges = np.linspace(0, max_citations + 1, bins + 1)
+        
+        edges = np.unique(np.floor(edges))
+        # Last edge must lie above the maximum so every value is counted
+        if edges[-1] <= max_citations:
+            edges = np.append(edges, max_citations + 1)
+        return edges
+    
+    def _bin_labels(self, edges: np.ndarray) -> List[str]:
+        """Label integer bins [lo, hi) as inclusive 'lo-hi' ranges"""
+        labels = []
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            lo, hi = int(lo), int(hi) - 1
+            labels.append(str(lo) if lo >= hi else f"{lo}-{hi}")
+        return labels
+    
+    @metrics.timed('chart_seconds', chart='sources')
+    def plot_source_distribution(self, papers: List[Dict], aggregates=None) -> str:
+        """
+        Create pie chart showing papers by source.
+        
+        Args:
+            papers: List of papers
+            aggregates: Optional PaperAggregates already covering papers;
+                its source counts are used instead of rescanning the papers
+        """
         try:
-            df = pd.DataFrame(papers)
-            
-            if 'source' not in df.columns or df.empty:
+            if aggregates is not None:
+                source_counts = aggregates.source_counts.most_common()
+            else:
+                df = pd.DataFrame(papers)
+                
+                if 'source' not in df.columns or df.empty:
+                    return self._create_empty_chart("No source data available")
+                
+                source_counts = list(df['source'].value_counts().items())
+            
+            if not source_counts:
                 return self._create_empty_chart("No source data available")
             
-            source_counts = df['source'].value_counts()
-            
             # Convert to lists to avoid binary encoding
-            labels = list(source_counts.index)
-            values = [int(v) for v in source_counts.values]
+            labels = [label for label, v in source_counts]
+            values = [int(v) for label, v in source_counts]
             
             fig = go.Figure(data=[
                 go.Pie(
@@ -202,12 +375,65 @@ class Visualizer:
                 height=500
             )
             
-            return fig.to_html(full_html=False, include_plotlyjs=False)
+            return self._render(fig)
+        
+        except Exception as e:
+            logger.error("Error creating source chart: %s", e)
+            return self._create_empty_chart(f"Error: {e}")
+    
+    @metrics.timed('chart_seconds', chart='trends')
+    def plot_keyword_trends(self, trends: Dict) -> str:
+        """
+        Create line chart of emerging keyword trajectories.
+        
+        Args:
+            trends: Result of KeywordExtractor.keyword_trends()
+        """
+        try:
+            if not trends or not trends.get('terms'):
+                return self._create_info_chart(
+                    "No emerging keywords found",
+                    "Trends need several years of papers<br>with recurring keywords"
+                )
+            
+            score_label = 'Growth (pts/year)' if trends['method'] == 'growth' else 'Burst score'
+            fig = go.Figure()
+            for term, shares, counts, score in zip(trends['terms'], trends['shares'],
+                                                   trends['counts'], trends['scores']):
+                fig.add_trace(go.Scatter(
+                    x=trends['years'],
+                    y=[round(share * 100, 2) for share in shares],
+                    customdata=counts,
+                    mode='lines+markers',
+                    name=term,
+                    hovertemplate=(f'<b>{term}</b><br>Year: %{{x}}<br>Papers: %{{y}}% (%{{customdata}})'
+                                   f'<br>{score_label}: {score}<extra></extra>')
+                ))
             
+            fig.update_layout(
+                **self.default_layout,
+                title='Emerging Keywords',
+                xaxis=dict(title='Year', dtick=1),
+                yaxis=dict(title='Share of Papers (%)'),
+                hovermode='closest',
+                width=900,
+                height=500
+            )
+            
+            return self._render(fig)
+        
         except Exception as e:
-            print(f"Error creating source chart: {e}")
+            logger.error("Error creating keyword trends chart: %s", e)
             return self._create_empty_chart(f"Error: {e}")
     
+    def _render(self, fig: go.Figure) -> str:
+        """Serialize figure according to the configured output format"""
+        if self.output_format == 'json':
+            # Figure JSON goes straight to Plotly.newPlot on the frontend,
+            # skipping the HTML wrapper and the script re-execution
+            return pio.to_json(fig, validate=False, engine=JSON_ENGINE)
+        return fig.to_html(full_html=False, include_plotlyjs=False)
+    
     def _extract_year(self, date_str) -> Optional[int]:
         """Extract year from date string"""
         if not date_str or pd.isna(date_str):
@@ -252,7 +478,7 @@ class Visualizer:
             width=800,
             height=500
         )
-        return fig.to_html(full_html=False, include_plotlyjs=False)
+        return self._render(fig)
     
     def _create_info_chart(self, title: str, message: str) -> str:
         """Create informational chart"""
@@ -275,8 +501,9 @@ class Visualizer:
             width=800,
             height=500
         )
-        return fig.to_html(full_html=False, include_plotlyjs=False)
+        return self._render(fig)
     
+    @metrics.timed('chart_seconds', chart='network')
     def create_keyword_network(self, keywords: List[str], papers: List[Dict] = None) -> str:
         """
         Create keyword network visualization (simplified version without AI).
@@ -284,9 +511,9 @@ class Visualizer:
         Args:
             keywords: List of keywords to visualize
             papers: List of papers (optional, for co-occurrence)
-            
+        
         Returns:
-            HTML string for the chart
+            HTML string or figure JSON for the chart
         """
         if not NETWORKX_AVAILABLE:
             return self._create_empty_chart("NetworkX library not installed")
@@ -305,20 +532,21 @@ class Visualizer:
             for keyword in keywords:
                 G.add_node(keyword)
             
-            # Add edges based on word co-occurrence in titles
+            # Add edges based on keyword co-occurrence in titles
             if papers:
-                for i, kw1 in enumerate(keywords):
-                    for j, kw2 in enumerate(keywords[i+1:], i+1):
-                        # Check co-occurrence in titles
-                        cooccur_count = 0
-                        for paper in papers:
-                            title = paper.get('title', '').lower()
-                            if kw1.lower() in title and kw2.lower() in title:
-                                cooccur_count += 1
-                        
-                        if cooccur_count > 0:
-                            weight = cooccur_count / len(papers)
-                            G.add_edge(kw1, kw2, weight=weight)
+                processor = self.text_processor
+                title_sets = [set(processor.paper_tokens(paper).title) for paper in papers]
+                keyword_ids = [set(processor.phrase_ids(kw)) for kw in keywords]
+                
+                # One pass over the papers counts every keyword pair
+                pair_counts = Counter()
+                for title_ids in title_sets:
+                    present = [i for i, ids in enumerate(keyword_ids) if ids and ids <= title_ids]
+                    pair_counts.update(combinations(present, 2))
+                
+                for i, j in sorted(pair_counts):
+                    weight = pair_counts[(i, j)] / len(papers)
+                    G.add_edge(keywords[i], keywords[j], weight=weight)
             else:
                 # Fallback: connect based on word similarity
                 for i, kw1 in enumerate(keywords):
@@ -397,21 +625,20 @@ class Visualizer:
                 height=600
             )
             
-            return fig.to_html(full_html=False, include_plotlyjs=False)
-            
+            return self._render(fig)
+        
         except Exception as e:
-            print(f"Error creating keyword network: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error creating keyword network: %s", e)
             return self._create_empty_chart(f"Error: {e}")
     
+    @metrics.timed('chart_seconds', chart='wordcloud')
     def create_wordcloud(self, papers: List[Dict]) -> str:
         """
         Create word cloud visualization from paper titles and abstracts.
         
         Args:
             papers: List of papers to extract text from
-            
+        
         Returns:
             HTML string with embedded image
         """
@@ -422,47 +649,31 @@ class Visualizer:
             if not papers:
                 return self._create_empty_chart("No papers available for word cloud")
             
-            # Collect text from titles and abstracts
-            text_data = []
+            # Word frequencies from cached title and abstract tokens
+            processor = self.text_processor
+            frequencies = Counter()
             for paper in papers:
-                if paper.get('title'):
-                    text_data.append(paper['title'])
-                if paper.get('abstract'):
-                    # Limit abstract to first 200 chars to avoid dominance
-                    abstract = paper['abstract'][:200]
-                    text_data.append(abstract)
-            
-            if not text_data:
-                return self._create_empty_chart("No text data available for word cloud")
+                tokens = processor.paper_tokens(paper)
+                frequencies.update(tokens.title)
+                # Limit abstract to its first words to avoid dominance
+                frequencies.update(tokens.abstract[:ABSTRACT_WORDCLOUD_TOKENS])
+            frequencies.pop(BOUNDARY, None)
             
-            # Combine all text
-            combined_text = ' '.join(text_data)
-            
-            # Common stopwords for academic papers
-            stopwords = set([
-                'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-                'of', 'with', 'from', 'by', 'as', 'is', 'was', 'are', 'were', 'been',
-                'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-                'should', 'could', 'may', 'might', 'can', 'this', 'that', 'these',
-                'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what', 'which',
-                'who', 'when', 'where', 'why', 'how', 'all', 'each', 'every', 'both',
-                'few', 'more', 'most', 'other', 'some', 'such', 'only', 'own', 'same',
-                'so', 'than', 'too', 'very', 'also', 'however', 'therefore', 'thus',
-                'furthermore', 'moreover', 'nevertheless', 'using', 'used', 'study',
-                'paper', 'research', 'results', 'method', 'approach', 'based'
-            ])
+            if not frequencies:
+                return self._create_empty_chart("No text data available for word cloud")
             
             # Generate word cloud
             wc = WordCloud(
                 width=900,
                 height=500,
                 background_color='white',
-                stopwords=stopwords,
                 max_words=100,
                 relative_scaling=0.5,
                 colormap='viridis',
                 min_font_size=10
-            ).generate(combined_text)
+            ).generate_from_frequencies({
+                processor.word(token_id): count for token_id, count in frequencies.items()
+            })
             
             # Convert to image
             import matplotlib
@@ -495,10 +706,8 @@ class Visualizer:
             '''
             
             return html
-            
+        
         except Exception as e:
-            print(f"Error creating word cloud: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error creating word cloud: %s", e)
             return self._create_empty_chart(f"Error: {e}")
 
@@ -0,0 +1,375 @@
+"""
+Sintesa - Local HTTP Service
+Exposes the API methods as JSON over HTTP, so several clients share one warmed backend
+
+Usage:
+    python server.py --port 8765
+    
+    POST /session              -> {"session_id": "..."}
+    POST /api/<method>         body: JSON array of positional arguments,
+                               or JSON object of keyword arguments
+    GET  /health               -> worker and session counts
+    GET  /metrics              -> metrics in Prometheus text format
+
+Calls carry their session in the X-Session-Id header, from POST /session.
+A call without one runs in a throwaway session that is not kept, so its
+search results cannot be exported or charted by result id later. Sessions
+keep their own search results and share every component (caches, token
+tables, export jobs). A call the backend refuses as busy (e.g. start_export
+while too many export formats are pending) gets 503 with Retry-After.
+pywebview is never imported.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from http import HTTPStatus
+from typing import Dict, Any, Optional, Tuple
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+
+import config
+from app import API
+from modules import metrics
+
+logger = logging.getLogger('server')
+
+# Exposed API methods and the worker lane they run on: 'cpu' calls are
+# bounded by the worker count, 'io' calls mostly wait on the network or poll.
+# start_export only queues work for the export process pool, which bounds
+# its own backlog (EXPORT_MAX_PENDING) and answers busy when it is full
+EXPOSED_METHODS = {
+    'search_papers': 'io',
+    'start_export': 'io',
+    'get_export_job': 'io',
+    'get_app_info': 'io',
+    'get_source_info': 'io',
+    'get_metrics': 'io',
+    'generate_visualizations': 'cpu',
+    'get_paper_statistics': 'cpu',
+    'export_data': 'cpu'
+}
+
+# Largest accepted request body (result sets are posted back for charts and exports)
+MAX_BODY_BYTES = 256 * 1024 * 1024
+
+# Seconds an idle keep-alive connection stays open
+KEEP_ALIVE_TIMEOUT = 30
+
+# Retry-After seconds sent with 503 responses
+RETRY_AFTER_SECONDS = 1
+
+SESSION_HEADER = 'x-session-id'
+
+
+class ServiceBusy(Exception):
+    """A worker lane is full; the client should retry later"""
+
+
+class WorkerLane:
+    """
+    Thread pool with a bounded queue.
+    
+    At most max_workers calls run at once and max_queued more wait for a
+    worker; calls beyond that are refused with ServiceBusy instead of
+    piling up, so a burst of clients gets fast 503s rather than timeouts.
+    """
+    
+    def __init__(self, name: str, max_workers: int, max_queued: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_queued
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'{name}-worker')
+    
+    async def run(self, func, *args):
+        """Run func in the pool; only called from the event loop thread"""
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            raise ServiceBusy(self.name)
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            'workers': self.max_workers,
+            'pending': self.pending,
+            'capacity': self.capacity,
+            'rejected': self.rejected
+        }
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SessionStore:
+    """Per-client API instances sharing the components of one root API"""
+    
+    def __init__(self, root: API, max_sessions: int, idle_timeout: float):
+        self.root = root
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()
+    
+    def create(self) -> Tuple[str, API]:
+        self._expire()
+        session_id = uuid.uuid4().hex
+        session = API(shared_with=self.root)
+        self._sessions[session_id] = [session, time.monotonic()]
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session_id, session
+    
+    def get(self, session_id: str) -> Optional[API]:
+        self._expire()
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        entry[1] = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return entry[0]
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def _expire(self):
+        """Drop sessions idle for longer than idle_timeout (least recently used first)"""
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if last_used >= cutoff:
+                break
+            del self._sessions[session_id]
+
+
+class APIServer:
+    """
+    asyncio HTTP/1.1 server calling API methods in worker threads.
+    
+    The event loop only parses requests and writes responses; API calls
+    and JSON encoding run on the worker lanes, so one slow chart or export
+    never blocks other clients' polls.
+    """
+    
+    def __init__(self, api: Optional[API] = None, host: str = config.SERVER_HOST,
+                 port: int = config.SERVER_PORT, workers: int = config.SERVER_WORKERS,
+                 max_queued: int = config.SERVER_MAX_QUEUED,
+                 max_sessions: int = config.SERVER_MAX_SESSIONS,
+                 session_idle_seconds: float = config.SERVER_SESSION_IDLE_MINUTES * 60):
+        """
+        Args:
+            api: Root API whose components all sessions share (default: a new
+                API; pass one built with stubbed components for tests)
+            host: Listen address
+            port: Listen port (0 picks a free port, see self.port once started)
+            workers: Threads for chart, statistics and export calls
+            max_queued: Calls waiting per lane before clients get 503
+            max_sessions: Client sessions kept; the least recently used go first
+            session_idle_seconds: Idle time after which a session expires
+        """
+        self.api = api or API()
+        self.host = host
+        self.port = port
+        self.sessions = SessionStore(self.api, max_sessions, session_idle_seconds)
+        self.lanes = {
+            'cpu': WorkerLane('cpu', workers, max_queued),
+            'io': WorkerLane('io', max(4, workers * 2), max_queued)
+        }
+        self._server = None
+    
+    async def start(self):
+        """Start listening; self.port holds the bound port afterwards"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Listening on http://%s:%d", self.host, self.port)
+        return self._server
+    
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+    
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        for lane in self.lanes.values():
+            lane.shutdown()
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                if isinstance(request, int):
+                    # Malformed or oversized request: answer and drop the connection
+                    error = {'success': False, 'error': HTTPStatus(request).phrase}
+                    await self._write_response(writer, request, error, {}, False)
+                    break
+                
+                method, path, headers, body = request
+                status, payload, extra_headers = await self._dispatch(method, path, headers, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._write_response(writer, status, payload, extra_headers, keep_alive)
+                if not keep_alive:
+                    break
+        except Exception as e:
+            logger.error("Connection error: %s", e)
+        finally:
+            writer.close()
+    
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Parse one request: (method, path, headers, body), None at EOF or an error status"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST
+        if length > MAX_BODY_BYTES:
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), path.split('?', 1)[0], headers, body
+    
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload,
+                              extra_headers: Dict[str, str], keep_alive: bool):
+        body = payload if isinstance(payload, bytes) else _encode(payload)
+        status = HTTPStatus(status)
+        headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Content-Length': len(body),
+            'Connection': 'keep-alive' if keep_alive else 'close'
+        }
+        headers.update(extra_headers)
+        head = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        head.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+    
+    async def _dispatch(self, method: str, path: str, headers: Dict[str, str], body: bytes):
+        """Route a request: (status, payload or encoded body, extra headers)"""
+        if path == '/health':
+            return HTTPStatus.OK, self._health(), {}
+        if path == '/metrics':
+            text = metrics.REGISTRY.to_prometheus().encode('utf-8')
+            return HTTPStatus.OK, text, {'Content-Type': 'text/plain; version=0.0.4'}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'success': False, 'error': 'Use POST'}, {'Allow': 'POST'}
+        if path == '/session':
+            session_id, _ = self.sessions.create()
+            return HTTPStatus.OK, {'success': True, 'session_id': session_id}, {'X-Session-Id': session_id}
+        
+        name = path[len('/api/'):] if path.startswith('/api/') else None
+        lane = self.lanes.get(EXPOSED_METHODS.get(name))
+        if lane is None:
+            return HTTPStatus.NOT_FOUND, {'success': False, 'error': f'Unknown endpoint: {path}'}, {}
+        
+        session_id = headers.get(SESSION_HEADER)
+        if session_id:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return HTTPStatus.NOT_FOUND, {'success': False, 'error': 'Unknown or expired session'}, {}
+            session_headers = {'X-Session-Id': session_id}
+        else:
+            # One-off call: stored sessions are not evicted by session-less clients
+            session = API(shared_with=self.api)
+            session_headers = {}
+        
+        try:
+            arguments = json.loads(body) if body else []
+            args, kwargs = (arguments, {}) if isinstance(arguments, list) else ([], arguments)
+            if not isinstance(kwargs, dict):
+                raise TypeError("body must be a JSON array or object")
+            call = getattr(session, name)
+            inspect.signature(call).bind(*args, **kwargs)
+        except (ValueError, TypeError) as e:
+            return HTTPStatus.BAD_REQUEST, {'success': False, 'error': f'Invalid arguments: {e}'}, session_headers
+        
+        try:
+            busy, encoded = await lane.run(_call_and_encode, call, args, kwargs)
+        except ServiceBusy:
+            busy, encoded = True, {'success': False, 'error': 'Server busy, retry shortly'}
+        if busy:
+            session_headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+            return HTTPStatus.SERVICE_UNAVAILABLE, encoded, session_headers
+        return HTTPStatus.OK, encoded, session_headers
+    
+    def _health(self) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'sessions': len(self.sessions),
+            'lanes': {name: lane.stats() for name, lane in self.lanes.items()}
+        }
+
+
+def _call_and_encode(call, args, kwargs) -> Tuple[bool, bytes]:
+    """Worker side of a call: run it and encode the result off the event loop"""
+    result = call(*args, **kwargs)
+    # API methods flag refusals for lack of capacity with 'busy'
+    busy = isinstance(result, dict) and result.get('busy', False)
+    return busy, _encode(result)
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def main():
+    """Service entry point"""
+    multiprocessing.freeze_support()
+    
+    parser = argparse.ArgumentParser(description="Sintesa local HTTP/JSON service")
+    parser.add_argument('--host', default=config.SERVER_HOST, help="Listen address")
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT, help="Listen port")
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS,
+                        help="Threads for chart, statistics and export calls")
+    parser.add_argument('--max-queued', type=int, default=config.SERVER_MAX_QUEUED,
+                        help="Calls queued per lane before clients get 503")
+    args = parser.parse_args()
+    metrics.configure_logging(config.LOG_LEVEL, config.LOG_FORMAT)
+    
+    api = API()
+    server = APIServer(api, host=args.host, port=args.port, workers=args.workers,
+                       max_queued=args.max_queued)
+    
+    # Load components while the first clients connect
+    threading.Thread(target=api._warm_up, name='warm-up', daemon=True).start()
+    
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Stopped")
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,9 +5,14 @@
 
 // Global state
 let currentPapers = [];
+let currentResultId = null;
 let currentStep = 1;
 let searchHistory = [];
 
+// Background export jobs
+const BUNDLE_FORMATS = ['csv', 'excel', 'json', 'pdf'];
+const EXPORT_POLL_INTERVAL_MS = 500;
+
 // Initialize app
 document.addEventListener('DOMContentLoaded', () => {
     console.log('[Init] Sintesa loading...');
@@ -250,6 +255,7 @@ async function handleSearch() {
         
         if (result.success) {
             currentPapers = result.papers;
+            currentResultId = result.result_id;
             displayPapers(result.papers);
             showStatus('search-status', `Found ${result.count} papers`, 'success');
             
@@ -378,6 +384,11 @@ async function handleVisualization() {
     }
 }
 
+// Charts come either as HTML snippets or as Plotly figure JSON
+function isFigureSpec(content) {
+    return typeof content === 'string' && content.trimStart().startsWith('{');
+}
+
 function displayVisualizations(vizData) {
     console.log('[Viz] Displaying visualizations:', vizData);
     console.log('[Viz] Available keys:', Object.keys(vizData));
@@ -393,6 +404,20 @@ function displayVisualizations(vizData) {
         // Clear existing content
         element.innerHTML = '';
         
+        // Figure JSON spec: hand it straight to Plotly.newPlot
+        if (isFigureSpec(content)) {
+            try {
+                const figure = JSON.parse(content);
+                console.log(`[Viz] Plotting ${elementId}: ${content.length} chars of figure JSON`);
+                Plotly.newPlot(element, figure.data || [], figure.layout || {}, { responsive: true });
+                return true;
+            } catch (error) {
+                console.error(`[Viz] ERROR plotting ${elementId}:`, error);
+                element.innerHTML = `<p style="text-align: center; padding: 40px; color: #e74c3c;">Visualization error: ${error.message}</p>`;
+                return false;
+            }
+        }
+        
         if (content && content.length > 100) {
             console.log(`[Viz] Rendering ${elementId}: ${content.length} chars`);
             
@@ -463,7 +488,8 @@ function displayVisualizations(vizData) {
         { key: 'years', id: 'viz-years', fallback: 'No year data available' },
         { key: 'citations', id: 'viz-citations', fallback: 'No citation data available' },
         { key: 'timeline', id: 'viz-timeline', fallback: 'No timeline data available' },
-        { key: 'sources', id: 'viz-sources', fallback: 'No source data available' }
+        { key: 'sources', id: 'viz-sources', fallback: 'No source data available' },
+        { key: 'trends', id: 'viz-trends', fallback: 'No keyword trend data available' }
     ];
     
     let successCount = 0;
@@ -501,19 +527,34 @@ async function handleExport(format) {
     }
     
     try {
-        console.log('[Export] Exporting to', format);
+        const bundle = format === 'bundle';
+        const formats = bundle ? BUNDLE_FORMATS : [format];
+        console.log('[Export] Exporting to', formats.join(', '));
         
-        const result = await pywebview.api.export_data(format, currentPapers);
+        const started = await pywebview.api.start_export(currentResultId, formats, {}, bundle);
+        if (!started.success) {
+            showStatus('export-status', `Error: ${started.error}`, 'error');
+            console.error('[Export] [ERROR] Error:', started.error);
+            return;
+        }
         
-        if (result.success) {
-            showStatus('export-status', `Successfully exported to: ${result.filepath}`, 'success');
-            console.log('[Export] [OK] Exported to:', result.filepath);
+        showStatus('export-status', `Exporting to ${formats.join(', ')}...`, 'info');
+        const job = await waitForExportJob(started.job_id);
+        
+        const failed = Object.entries(job.results).filter(([, r]) => r.status === 'failed');
+        if (job.status === 'done') {
+            const filepath = job.bundle_path || job.results[formats[0]].filepath
+                || Object.values(job.results).find(r => r.filepath).filepath;
+            const warning = failed.length ? ` (failed: ${failed.map(([f]) => f).join(', ')})` : '';
+            showStatus('export-status', `Successfully exported to: ${filepath}${warning}`, 'success');
+            console.log('[Export] [OK] Exported to:', filepath);
             
             // Show confirmation dialog
-            showExportConfirmation(result.filepath);
+            showExportConfirmation(filepath);
         } else {
-            showStatus('export-status', `Error: ${result.error}`, 'error');
-            console.error('[Export] [ERROR] Error:', result.error);
+            const error = job.error || failed.map(([f, r]) => `${f}: ${r.error}`).join('; ');
+            showStatus('export-status', `Error: ${error}`, 'error');
+            console.error('[Export] [ERROR] Error:', error);
         }
     } catch (error) {
         console.error('[Export] [ERROR] Exception:', error);
@@ -521,6 +562,24 @@ async function handleExport(format) {
     }
 }
 
+// Poll a background export job until every format has finished
+async function waitForExportJob(jobId) {
+    while (true) {
+        const result = await pywebview.api.get_export_job(jobId);
+        if (!result.success) {
+            throw new Error(result.error);
+        }
+        
+        const job = result.job;
+        if (job.status !== 'running') {
+            return job;
+        }
+        
+        showStatus('export-status', `Exporting... ${job.completed}/${job.total} formats done`, 'info');
+        await new Promise(resolve => setTimeout(resolve, EXPORT_POLL_INTERVAL_MS));
+    }
+}
+
 // Utility Functions
 function showStatus(elementId, message, type) {
     const statusElement = document.getElementById(elementId);